@@ -0,0 +1,94 @@
+# analyse_archives.py
+# -------------------------------------------------------------
+# Ré-analyse d'enregistrements après un incident (mode enquête)
+# Sans affichage, plus vite que le temps réel, incidents écrits
+# dans un arbre de logs séparé (logs_enquete/<analyse>/<date>/<zone>.log)
+# Lancement : cd src/AeroGuard_AI && python analyse_archives.py videos/
+#             --depuis "2025-12-10 08:00" --jusqua "2025-12-10 12:00" --pas 3
+# -------------------------------------------------------------
+
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from detection.reanalyse import AnalyseDifferee, inventorier, planifier, trier_journaux
+from utils.configuration import DOSSIER_VIDEOS, parametres_detecteur
+from utils.journalisation import Journalisation
+
+DOSSIER_ENQUETES = "logs_enquete"
+
+
+def lire_date(texte, fin_de_periode=False):
+    """
+    'AAAA-MM-JJ' ou 'AAAA-MM-JJ HH:MM[:SS]' -> timestamp.
+    Une date seule en fin de période couvre toute la journée.
+    """
+    for format_date in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            moment = datetime.strptime(texte, format_date)
+        except ValueError:
+            continue
+        if fin_de_periode and format_date == "%Y-%m-%d":
+            moment += timedelta(days=1)
+        return moment.timestamp()
+    raise argparse.ArgumentTypeError(f"Date invalide : {texte} (attendu AAAA-MM-JJ [HH:MM[:SS]])")
+
+
+def lire_date_fin(texte):
+    return lire_date(texte, fin_de_periode=True)
+
+
+def formater_duree(secondes):
+    heures, reste = divmod(int(secondes), 3600)
+    return f"{heures}h{reste // 60:02d}m{reste % 60:02d}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ré-analyse d'archives vidéo AeroGuard (mode enquête)")
+    parser.add_argument("sources", nargs="*", default=[DOSSIER_VIDEOS],
+                        help="Fichiers vidéo ou dossiers d'enregistrements (parcourus récursivement)")
+    parser.add_argument("--depuis", type=lire_date, help="Début de la période (AAAA-MM-JJ [HH:MM[:SS]])")
+    parser.add_argument("--jusqua", type=lire_date_fin, help="Fin de la période (AAAA-MM-JJ [HH:MM[:SS]])")
+    parser.add_argument("--zones", nargs="+", help="Zones à ré-analyser (défaut : toutes)")
+    parser.add_argument("--pas", type=int, default=1, help="Une image analysée sur pas (1 = toutes)")
+    parser.add_argument("--processus", type=int, help="Processus d'analyse (défaut : cœurs / 2)")
+    parser.add_argument("--segment", type=float, default=600.0,
+                        help="Durée des segments répartis entre processus, en secondes (0 = un par fichier)")
+    parser.add_argument("--sortie", default=DOSSIER_ENQUETES, help="Racine des logs d'enquête")
+    args = parser.parse_args()
+
+    if args.jusqua is not None and args.depuis is not None and args.jusqua <= args.depuis:
+        parser.error("--jusqua doit être postérieur à --depuis")
+    if args.pas < 1:
+        parser.error("--pas doit être supérieur ou égal à 1")
+
+    enregistrements = inventorier(args.sources, args.depuis, args.jusqua, args.zones)
+    if not enregistrements:
+        print("[ERREUR] Aucun enregistrement ne correspond à la période demandée.")
+        return
+
+    print(f"[INFO] {len(enregistrements)} enregistrement(s) retenu(s) :")
+    for enregistrement in enregistrements:
+        print(f"  - {enregistrement.zone:<25} {datetime.fromtimestamp(enregistrement.debut):%Y-%m-%d %H:%M:%S} "
+              f"({formater_duree(enregistrement.duree)}) {enregistrement.chemin}")
+
+    segments = planifier(enregistrements, args.depuis, args.jusqua, args.segment)
+
+    # Un dossier par analyse : deux enquêtes sur la même période ne se mélangent pas
+    dossier_sortie = os.path.join(args.sortie, datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+    journal = Journalisation(dossier_sortie, base_incidents=os.path.join(dossier_sortie, "incidents.db"))
+    try:
+        analyse = AnalyseDifferee(parametres_detecteur(), journal, args.processus, args.pas)
+        bilan = analyse.executer(segments)
+    finally:
+        journal.fermer()
+    trier_journaux(dossier_sortie)
+
+    print(f"\n[RAPPORT] {formater_duree(bilan['secondes_video'])} de vidéo analysés en "
+          f"{formater_duree(bilan['duree'])} ({bilan['acceleration']:.1f}x le temps réel)")
+    print(f"  = {bilan['images']} images analysées | {bilan['incidents']} incident(s)")
+    print(f"  = Logs d'enquête : {dossier_sortie}")
+
+
+if __name__ == "__main__":
+    main()
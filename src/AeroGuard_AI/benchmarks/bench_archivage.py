@@ -0,0 +1,155 @@
+# benchmarks/bench_archivage.py
+# -------------------------------------------------------------
+# Compaction des logs en Parquet : place sur disque et durée des
+# requêtes historiques (une zone / toutes les zones et un type d'objet,
+# sur toute la période) en texte contre archives compactées
+# Lancement : cd src/AeroGuard_AI && python benchmarks/bench_archivage.py --jours 90 --incidents 20000
+# -------------------------------------------------------------
+
+import argparse
+import ast
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.archivage import NOM_ARCHIVE, compacter_jour  # noqa: E402
+from utils.journalisation import formater_ligne, nom_fichier_zone  # noqa: E402
+
+ZONES = ["CAM_piste_decolage", "CAM_piste_aterisage", "Parking_Avion", "Taxiway_Sud", "Hangar_Nord"]
+OBJETS = ["person", "truck", "car", "dog", "bird"]
+
+
+def generer_logs(dossier, nb_jours, incidents_par_jour, graine=0):
+    """
+    Arbre logs/<date>/<zone>.log synthétique au format du journal.
+    """
+    hasard = random.Random(graine)
+    premier_jour = datetime(2025, 1, 1)
+    for jour in range(nb_jours):
+        minuit = premier_jour + timedelta(days=jour)
+        dossier_jour = os.path.join(dossier, minuit.strftime("%Y-%m-%d"))
+        os.makedirs(dossier_jour)
+        lignes = {zone: [] for zone in ZONES}
+        for horodatage in sorted(hasard.uniform(0, 86399) for _ in range(incidents_par_jour)):
+            debut = minuit.timestamp() + horodatage
+            zone = hasard.choice(ZONES)
+            niveau = hasard.choices(["FAIBLE", "MOYEN", "ÉLEVÉ"], weights=[1, 3, 2])[0]
+            objets = [hasard.choice(OBJETS) for _ in range(hasard.randint(1, 4))]
+            fin = debut + hasard.uniform(0.5, 60.0)
+            preuve = f"{zone}_{int(debut)}.mp4" if niveau == "ÉLEVÉ" and hasard.random() < 0.3 else None
+            lignes[zone].append(formater_ligne((debut, zone, objets, hasard.randint(1, 20), niveau, fin, preuve)))
+        for zone, contenu in lignes.items():
+            with open(os.path.join(dossier_jour, nom_fichier_zone(zone)), "w", encoding="utf-8") as f:
+                f.write("\n".join(contenu) + "\n")
+
+
+def taille_dossier(dossier):
+    return sum(os.path.getsize(os.path.join(racine, f)) for racine, _, fichiers in os.walk(dossier) for f in fichiers)
+
+
+def requete_texte(dossier, zone=None, objet=None):
+    """
+    Ce que faisait la navigation : relire les fichiers texte jour par jour
+    (celui de la zone, ou tous pour une recherche multi-zones).
+    """
+    total = 0
+    for date in sorted(os.listdir(dossier)):
+        dossier_jour = os.path.join(dossier, date)
+        noms = [nom_fichier_zone(zone)] if zone is not None else sorted(os.listdir(dossier_jour))
+        for nom in noms:
+            chemin = os.path.join(dossier_jour, nom)
+            if not os.path.exists(chemin):
+                continue
+            with open(chemin, "r", encoding="utf-8") as f:
+                for ligne in f:
+                    if "NIVEAU=ÉLEVÉ" not in ligne:
+                        continue
+                    if objet is not None:
+                        objets = ligne.split("OBJETS=", 1)[1].split(" |", 1)[0]
+                        if objet not in ast.literal_eval(objets):
+                            continue
+                    total += 1
+    return total
+
+
+def requete_parquet(dossier, zone=None, objet=None):
+    """
+    Même requête sur les archives : seules les colonnes utiles sont lues, filtres appliqués à la lecture.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    chemins = [os.path.join(dossier, date, NOM_ARCHIVE) for date in sorted(os.listdir(dossier))]
+    filtre = ds.field("niveau") == "ÉLEVÉ"
+    if zone is not None:
+        filtre = filtre & (ds.field("zone") == zone)
+    if objet is None:
+        return ds.dataset(chemins, format="parquet").count_rows(filter=filtre)
+    table = ds.dataset(chemins, format="parquet").to_table(columns=["objets"], filter=filtre)
+
+    # Incidents dont la liste d'objets contient l'objet : sur les valeurs aplaties, sans boucle Python
+    objets = table.column("objets").combine_chunks()
+    parents = pc.list_parent_indices(objets)
+    return len(pc.unique(pc.filter(parents, pc.equal(pc.list_flatten(objets), objet))))
+
+
+def mesurer(fonction, *args, repetitions=3):
+    meilleur, resultat = float("inf"), None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction(*args)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return resultat, meilleur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la compaction des logs AeroGuard")
+    parser.add_argument("--jours", type=int, default=90)
+    parser.add_argument("--incidents", type=int, default=20000, help="Incidents par jour (toutes zones)")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    # Requêtes historiques : une zone (navigation), puis toutes les zones avec un type d'objet (recherche)
+    requetes = [(f"ÉLEVÉ {ZONES[0]}", ZONES[0], None), ("ÉLEVÉ avec truck", None, "truck")]
+    with tempfile.TemporaryDirectory(prefix="aeroguard_archivage_") as dossier:
+        print(f"[INFO] Génération de {args.jours} jours x {args.incidents} incidents...")
+        generer_logs(dossier, args.jours, args.incidents)
+        octets_texte = taille_dossier(dossier)
+        mesures_texte = [mesurer(requete_texte, dossier, zone, objet) for _, zone, objet in requetes]
+
+        debut = time.perf_counter()
+        for date in sorted(os.listdir(dossier)):
+            compacter_jour(os.path.join(dossier, date))
+        duree_compaction = time.perf_counter() - debut
+
+        octets_parquet = taille_dossier(dossier)
+        mesures_parquet = [mesurer(requete_parquet, dossier, zone, objet) for _, zone, objet in requetes]
+
+    print(f"\n{'':<24} {'Texte':>10} {'Parquet':>10} {'Gain':>7}")
+    print(f"{'Disque':<24} {octets_texte / 1e6:>8.1f}Mo {octets_parquet / 1e6:>8.1f}Mo "
+          f"{octets_texte / octets_parquet:>6.1f}x")
+    resultats = []
+    for (nom, _, _), (attendu, duree_texte), (obtenu, duree_parquet) in zip(requetes, mesures_texte, mesures_parquet):
+        if obtenu != attendu:
+            print(f"[ERREUR] {nom} : texte {attendu}, Parquet {obtenu}")
+        print(f"{nom:<24} {duree_texte * 1000:>8.0f}ms {duree_parquet * 1000:>8.0f}ms "
+              f"{duree_texte / duree_parquet:>6.1f}x")
+        resultats.append({"requete": nom, "resultat": attendu, "texte_s": duree_texte, "parquet_s": duree_parquet})
+    print(f"\nCompaction : {duree_compaction:.1f} s pour {args.jours} jours")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"jours": args.jours, "incidents_par_jour": args.incidents,
+                       "octets_texte": octets_texte, "octets_parquet": octets_parquet,
+                       "compaction_s": duree_compaction, "requetes": resultats}, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés : {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_demarrage.py
+# -------------------------------------------------------------
+# Démarrage du menu : durée et mémoire de « import main » (mesurées dans
+# un interpréteur neuf), comparées à l'import de la pile vision.
+# Échoue si OpenCV, PyTorch ou ultralytics sont importés avec le menu
+# Lancement : cd src/AeroGuard_AI && python benchmarks/bench_demarrage.py --repetitions 5
+# -------------------------------------------------------------
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules qui ne doivent être chargés qu'au lancement d'une surveillance
+MODULES_LOURDS = ("cv2", "torch", "ultralytics", "numpy")
+
+# Exécuté dans un interpréteur neuf : durée de l'import, RSS avant/après, modules lourds chargés
+_SONDE = """
+import json, os, sys, time
+def rss():
+    # Mémoire résidente (Linux) ; 0 ailleurs
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+rss_avant = rss()
+debut = time.perf_counter()
+{code}
+duree = time.perf_counter() - debut
+print(json.dumps({{"duree_s": duree, "rss_avant": rss_avant, "rss_apres": rss(),
+                  "lourds": [m for m in {lourds!r} if m in sys.modules]}}))
+"""
+
+SCENARIOS = {
+    "menu": "import main",
+    "vision": "import main\nimport detection.detection_video",
+}
+
+
+def mesurer(code, repetitions):
+    """
+    Lance repetitions interpréteurs et retourne leurs mesures (répertoire courant = src/AeroGuard_AI).
+    """
+    mesures = []
+    for _ in range(repetitions):
+        sortie = subprocess.run([sys.executable, "-c", _SONDE.format(code=code, lourds=MODULES_LOURDS)],
+                                cwd=RACINE, capture_output=True, text=True, check=True)
+        mesures.append(json.loads(sortie.stdout.strip().splitlines()[-1]))
+    return mesures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage du menu AeroGuard")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--sans-vision", action="store_true", help="Ne mesure pas l'import de la pile vision")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    resultats = {}
+    print(f"{'Scénario':<10} {'Médiane':>10} {'Min':>10} {'Mémoire':>10}   Modules lourds")
+    for nom, code in SCENARIOS.items():
+        if nom == "vision" and args.sans_vision:
+            continue
+        try:
+            mesures = mesurer(code, max(1, args.repetitions))
+        except subprocess.CalledProcessError as e:
+            print(f"[ERREUR] Scénario '{nom}' impossible :\n{e.stderr.strip()}")
+            continue
+        durees = [m["duree_s"] for m in mesures]
+        memoire = statistics.median(m["rss_apres"] - m["rss_avant"] for m in mesures)
+        lourds = mesures[-1]["lourds"]
+        resultats[nom] = {"duree_mediane_s": statistics.median(durees), "duree_min_s": min(durees),
+                          "memoire_octets": memoire, "modules_lourds": lourds}
+        print(f"{nom:<10} {statistics.median(durees) * 1000:>8.0f}ms {min(durees) * 1000:>8.0f}ms "
+              f"{memoire / 1e6:>8.1f}Mo   {', '.join(lourds) or '-'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés : {args.json}")
+
+    # Garde-fou : le menu ne doit pas importer la pile vision
+    lourds_menu = resultats.get("menu", {}).get("modules_lourds")
+    if lourds_menu is None:
+        sys.exit(1)
+    if lourds_menu:
+        print(f"\n[ERREUR] 'import main' charge la pile vision : {', '.join(lourds_menu)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# benchmarks/bench_pipeline.py
+# -------------------------------------------------------------
+# Benchmark reproductible de la chaîne de détection (sans affichage) :
+# débit, latence par image (p50/p95/p99), temps par étape, RSS, CPU
+# Lancement : cd src/AeroGuard_AI && python benchmarks/bench_pipeline.py --synthetiques 3 --json bench.json
+# -------------------------------------------------------------
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.backends import preparer_modele  # noqa: E402
+from detection.detection_video import ETAPES, DetecteurVideo  # noqa: E402
+from utils.calcul_risque import CalculRisque  # noqa: E402
+from utils.journalisation import Journalisation  # noqa: E402
+from utils.zones import charger_zones  # noqa: E402
+
+EXTENSIONS_VIDEO = (".mp4", ".avi", ".mkv")
+
+# Étapes rapportées : décodage et rendu mesurés ici, les autres par traiter_frame
+ETAPES_RAPPORT = ("decodage",) + ETAPES + ("rendu",)
+
+
+def generer_clip_synthetique(chemin, nb_images=300, fps=25, largeur=1280, hauteur=720, graine=0):
+    """
+    Clip déterministe : fond texturé fixe + rectangles en mouvement.
+    Les mêmes paramètres produisent toujours la même vidéo (comparaisons dans le temps).
+    """
+    rng = np.random.default_rng(graine)
+    fond = cv2.GaussianBlur(rng.integers(0, 256, (hauteur, largeur, 3), dtype=np.uint8), (0, 0), 5)
+
+    nb_objets = 6
+    positions = rng.uniform([0, 0], [largeur - 120, hauteur - 80], size=(nb_objets, 2))
+    vitesses = rng.uniform(-8, 8, size=(nb_objets, 2))
+    tailles = rng.integers([40, 60], [120, 200], size=(nb_objets, 2))
+    couleurs = rng.integers(0, 256, size=(nb_objets, 3)).tolist()
+
+    video = cv2.VideoWriter(chemin, cv2.VideoWriter_fourcc(*"mp4v"), fps, (largeur, hauteur))
+    for _ in range(nb_images):
+        frame = fond.copy()
+        for (x, y), (w, h), couleur in zip(positions.astype(int).tolist(), tailles.tolist(), couleurs):
+            cv2.rectangle(frame, (x, y), (x + w, y + h), couleur, -1)
+        video.write(frame)
+
+        # Rebond sur les bords
+        positions += vitesses
+        hors_cadre = (positions < 0) | (positions > [largeur - 120, hauteur - 80])
+        vitesses[hors_cadre] *= -1
+        np.clip(positions, 0, [largeur - 120, hauteur - 80], out=positions)
+    video.release()
+
+
+def preparer_clips(args, dossier_temp):
+    """
+    Liste (nom, chemin) des clips à mesurer : vidéos du dossier et/ou clips synthétiques.
+    """
+    clips = []
+    if args.videos:
+        for nom in sorted(os.listdir(args.videos)):
+            if nom.lower().endswith(EXTENSIONS_VIDEO):
+                clips.append((nom, os.path.join(args.videos, nom)))
+
+    for i in range(args.synthetiques):
+        chemin = os.path.join(dossier_temp, f"synthetique_{i}.mp4")
+        generer_clip_synthetique(chemin, args.images_synthetiques, graine=args.graine + i)
+        clips.append((os.path.basename(chemin), chemin))
+    return clips
+
+
+class EchantillonneurProcessus:
+    """
+    Relève le RSS du processus en arrière-plan (pic) et le temps CPU consommé.
+    """
+
+    def __init__(self, periode=0.05):
+        self.processus = psutil.Process()
+        self.periode = periode
+        self.rss_pic = 0
+        self._arret = threading.Event()
+        self._thread = threading.Thread(target=self._boucle, name="echantillonneur", daemon=True)
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            self.rss_pic = max(self.rss_pic, self.processus.memory_info().rss)
+            self._arret.wait(self.periode)
+
+    def __enter__(self):
+        self._cpu_debut = self.processus.cpu_times()
+        self._debut = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._arret.set()
+        self._thread.join()
+        self.rss_pic = max(self.rss_pic, self.processus.memory_info().rss)
+        cpu_fin = self.processus.cpu_times()
+        self.duree = time.perf_counter() - self._debut
+        self.cpu_secondes = (cpu_fin.user - self._cpu_debut.user) + (cpu_fin.system - self._cpu_debut.system)
+
+
+def mesurer_clip(detecteur, nom_camera, chemin, max_images, rendu):
+    """
+    Rejoue la boucle d'analyser_video sans fenêtre, en chronométrant chaque étape.
+    Retourne un tableau (nb_images, len(ETAPES_RAPPORT)) de durées en secondes.
+    """
+    flux = cv2.VideoCapture(chemin)
+    if not flux.isOpened():
+        print(f"[ERREUR] Impossible d'ouvrir la vidéo : {chemin}")
+        return np.zeros((0, len(ETAPES_RAPPORT)))
+
+    ctx = detecteur.contexte(nom_camera)
+    lignes = []
+    try:
+        while max_images is None or len(lignes) < max_images:
+            debut = time.perf_counter()
+            succes, frame = flux.read()
+            decodage = time.perf_counter() - debut
+            if not succes:
+                break
+
+            score, niveau, objets_dangereux = detecteur.traiter_frame(nom_camera, frame)
+
+            # Rendu équivalent à celui de l'afficheur (dessin seul, sans imshow)
+            debut = time.perf_counter()
+            if rendu:
+                apercu = frame.copy()
+                detecteur._dessiner_boites(apercu, ctx.detections)
+                detecteur._dessiner_hud(apercu, niveau, len(objets_dangereux))
+            duree_rendu = time.perf_counter() - debut
+
+            lignes.append([decodage] + [ctx.durees[etape] for etape in ETAPES] + [duree_rendu])
+    finally:
+        flux.release()
+        detecteur.cloturer_camera(nom_camera)
+    return np.array(lignes, dtype=np.float64).reshape(-1, len(ETAPES_RAPPORT))
+
+
+def resumer(durees, duree_murale):
+    """
+    Débit, percentiles de latence et temps moyen par étape (millisecondes).
+    """
+    if len(durees) == 0:
+        return {"images": 0}
+
+    latences = durees.sum(axis=1) * 1000
+    p50, p95, p99 = np.percentile(latences, [50, 95, 99])
+    return {
+        "images": int(len(durees)),
+        "img_par_s": len(durees) / duree_murale if duree_murale > 0 else 0.0,
+        "latence_ms": {"moyenne": float(latences.mean()), "p50": float(p50), "p95": float(p95),
+                       "p99": float(p99), "max": float(latences.max())},
+        "etapes_ms": {etape: float(durees[:, i].mean() * 1000) for i, etape in enumerate(ETAPES_RAPPORT)},
+    }
+
+
+def executer(detecteur, clips, args):
+    """
+    Mesure chaque clip (args.cameras clips en parallèle, un thread par caméra comme le superviseur).
+    """
+    resultats = {}
+    if args.lot > 1:
+        detecteur.activer_inference_par_lots(args.lot, args.attente_lot_ms)
+
+    def travail(nom, chemin):
+        debut = time.perf_counter()
+        durees = mesurer_clip(detecteur, nom, chemin, args.max_images, not args.sans_rendu)
+        resultats[nom] = (durees, time.perf_counter() - debut)
+
+    try:
+        for i in range(0, len(clips), args.cameras):
+            threads = [threading.Thread(target=travail, args=clip, name=f"bench-{clip[0]}")
+                       for clip in clips[i:i + args.cameras]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        detecteur.desactiver_inference_par_lots()
+    return resultats
+
+
+def afficher_resume(nom, resume):
+    if resume["images"] == 0:
+        print(f"{nom:<28} aucune image")
+        return
+    latence = resume["latence_ms"]
+    print(f"{nom:<28} {resume['images']:>6} img | {resume['img_par_s']:7.1f} img/s | "
+          f"p50 {latence['p50']:6.1f} ms | p95 {latence['p95']:6.1f} ms | p99 {latence['p99']:6.1f} ms")
+    print("    " + " | ".join(f"{etape} {ms:.2f}" for etape, ms in resume["etapes_ms"].items()) + " (ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la chaîne de détection AeroGuard")
+    parser.add_argument("--poids", default="models/yolov8s.pt", help="Poids PyTorch de référence")
+    parser.add_argument("--backend", default="pytorch", help="pytorch, onnx ou openvino")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--peripherique", default="cpu")
+    parser.add_argument("--videos", help="Dossier de vidéos enregistrées à mesurer")
+    parser.add_argument("--synthetiques", type=int, default=0, help="Nombre de clips synthétiques générés")
+    parser.add_argument("--images-synthetiques", type=int, default=300, help="Images par clip synthétique")
+    parser.add_argument("--graine", type=int, default=0, help="Graine des clips synthétiques")
+    parser.add_argument("--max-images", type=int, help="Limite d'images par clip")
+    parser.add_argument("--cameras", type=int, default=1, help="Clips traités en parallèle")
+    parser.add_argument("--lot", type=int, default=1, help="Taille de lot max (> 1 : inférence par lots)")
+    parser.add_argument("--attente-lot-ms", type=float, default=15)
+    parser.add_argument("--filtre-mouvement", action="store_true", help="Active le filtre de mouvement")
+    parser.add_argument("--zones", help="Fichier de zones JSON (config/zones.json)")
+    parser.add_argument("--sans-rendu", action="store_true", help="Ne mesure pas le dessin de l'aperçu")
+    parser.add_argument("--etiquette", default="", help="Libellé libre enregistré dans le JSON")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="aeroguard_bench_") as dossier_temp:
+        clips = preparer_clips(args, dossier_temp)
+        if not clips:
+            print("[ERREUR] Aucun clip : utilisez --videos et/ou --synthetiques N")
+            return
+
+        chemin_modele = preparer_modele(args.poids, args.backend, args.int8)
+        # Journal réel (asynchrone) écrit dans un dossier jetable
+        journal = Journalisation(os.path.join(dossier_temp, "logs"))
+        detecteur = DetecteurVideo(chemin_modele, CalculRisque(), journal, args.peripherique,
+                                   {} if args.filtre_mouvement else None, None,
+                                   charger_zones(args.zones) if args.zones else None, args.imgsz)
+
+        print(f"[INFO] {len(clips)} clip(s) | moteur {args.backend}{' int8' if args.int8 else ''} | "
+              f"imgsz {args.imgsz} | caméras {args.cameras} | lot {args.lot}")
+        try:
+            with EchantillonneurProcessus() as processus:
+                resultats = executer(detecteur, clips, args)
+        finally:
+            journal.fermer()
+
+    rapport_clips = {nom: resumer(durees, duree) for nom, (durees, duree) in resultats.items()}
+    toutes = np.concatenate([durees for durees, _ in resultats.values()])
+    rapport_global = resumer(toutes, processus.duree)
+
+    print()
+    for nom, resume in rapport_clips.items():
+        afficher_resume(nom, resume)
+    afficher_resume("= GLOBAL", rapport_global)
+    print(f"RSS pic : {processus.rss_pic / 1e6:.0f} Mo | CPU : {processus.cpu_secondes:.1f} s "
+          f"({processus.cpu_secondes / processus.duree:.2f} cœur(s) en moyenne)")
+
+    if args.json:
+        sortie = {
+            "etiquette": args.etiquette,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": {"plateforme": platform.platform(), "processeur": platform.processor(),
+                        "coeurs": os.cpu_count(), "python": platform.python_version()},
+            "configuration": {"poids": args.poids, "moteur": args.backend, "int8": args.int8,
+                              "imgsz": args.imgsz, "peripherique": args.peripherique,
+                              "cameras": args.cameras, "lot": args.lot, "attente_lot_ms": args.attente_lot_ms,
+                              "filtre_mouvement": args.filtre_mouvement, "zones": args.zones,
+                              "rendu": not args.sans_rendu, "graine": args.graine},
+            "global": rapport_global,
+            "clips": rapport_clips,
+            "processus": {"rss_pic_mo": processus.rss_pic / 1e6, "cpu_s": processus.cpu_secondes,
+                          "duree_s": processus.duree,
+                          "coeurs_moyens": processus.cpu_secondes / processus.duree if processus.duree else 0.0},
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sortie, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés : {args.json}")
+
+
+if __name__ == "__main__":
+    main()
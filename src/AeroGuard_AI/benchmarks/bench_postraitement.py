@@ -0,0 +1,131 @@
+# benchmarks/bench_postraitement.py
+# -------------------------------------------------------------
+# Micro-benchmark : boucle Python par boîte vs post-traitement vectorisé
+# Lancement : cd src/AeroGuard_AI && python benchmarks/bench_postraitement.py
+# -------------------------------------------------------------
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.postraitement import extraire_detections  # noqa: E402
+from utils.calcul_risque import CalculRisque  # noqa: E402
+
+# Sous-ensemble des classes COCO utilisées par le modèle YOLOv8
+NOMS_CLASSES = {0: "person", 1: "bicycle", 2: "car", 3: "motorcycle", 7: "truck", 14: "bird",
+                15: "cat", 16: "dog", 24: "backpack", 26: "handbag", 28: "suitcase", 56: "chair"}
+
+
+class _BoitesNumpy:
+    """
+    Émulation minimale de ultralytics Boxes (utilisée si ultralytics/torch sont absents).
+    """
+
+    def __init__(self, donnees):
+        self.data = donnees
+        self.xyxy = donnees[:, :4]
+        self.conf = donnees[:, 4]
+        self.cls = donnees[:, 5]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for i in range(len(self.data)):
+            boite = _BoitesNumpy(self.data[i:i + 1])
+            # Comme un tensor torch à un élément, cls accepte int()
+            boite.cls = self.data[i, 5]
+            yield boite
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self
+
+
+class _Resultat:
+    def __init__(self, boites):
+        self.boxes = boites
+
+
+def generer_resultat(nb_boites, graine=0):
+    """
+    Résultat YOLO synthétique : nb_boites boîtes aléatoires dans une image 1920x1080.
+    """
+    rng = np.random.default_rng(graine)
+    x1 = rng.uniform(0, 1800, nb_boites)
+    y1 = rng.uniform(0, 1000, nb_boites)
+    donnees = np.stack([
+        x1, y1, x1 + rng.uniform(10, 120, nb_boites), y1 + rng.uniform(10, 80, nb_boites),
+        rng.uniform(0.1, 1.0, nb_boites),
+        rng.choice(list(NOMS_CLASSES), nb_boites),
+    ], axis=1).astype(np.float32)
+
+    try:
+        import torch
+        from ultralytics.engine.results import Boxes
+        return _Resultat(Boxes(torch.from_numpy(donnees), (1080, 1920))), "ultralytics"
+    except ImportError:
+        return _Resultat(_BoitesNumpy(donnees)), "émulation NumPy"
+
+
+def postraitement_boucle(resultats, risque):
+    """
+    Ancienne version (analyser_video d'origine) : conversion boîte par boîte + dict par objet.
+    """
+    objets_dangereux = []
+    for box in resultats.boxes:
+        classe_id = int(box.cls)
+        nom_objet = NOMS_CLASSES[classe_id]
+        confiance = float(box.conf[0])
+        if confiance < 0.4:
+            continue
+        x1, y1, x2, y2 = map(int, box.xyxy[0])
+        if risque.est_dangereux(nom_objet):
+            objets_dangereux.append(nom_objet)
+    return risque.calculer_risque(objets_dangereux)
+
+
+def postraitement_vectorise(resultats, risque):
+    """
+    Nouvelle version : une conversion NumPy, un masque, une somme.
+    """
+    detections = extraire_detections(resultats)
+    dangereuses = detections.filtrer(risque.masque_dangereux(detections.classes))
+    return risque.calculer_risque_classes(dangereuses.classes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du post-traitement des détections")
+    parser.add_argument("--boites", type=int, nargs="+", default=[5, 20, 50, 100, 300])
+    parser.add_argument("--repetitions", type=int, default=2000)
+    args = parser.parse_args()
+
+    risque = CalculRisque()
+    risque.indexer_classes(NOMS_CLASSES)
+
+    print(f"{'Boîtes':>7} | {'Boucle (µs)':>12} | {'Vectorisé (µs)':>15} | {'Gain':>6}")
+    print("-" * 50)
+    for nb_boites in args.boites:
+        resultats, source = generer_resultat(nb_boites)
+
+        # Les deux versions doivent produire le même score
+        assert postraitement_boucle(resultats, risque) == postraitement_vectorise(resultats, risque)
+
+        t_boucle = timeit.timeit(lambda: postraitement_boucle(resultats, risque), number=args.repetitions)
+        t_vecto = timeit.timeit(lambda: postraitement_vectorise(resultats, risque), number=args.repetitions)
+        us_boucle = t_boucle / args.repetitions * 1e6
+        us_vecto = t_vecto / args.repetitions * 1e6
+        print(f"{nb_boites:>7} | {us_boucle:>12.1f} | {us_vecto:>15.1f} | x{us_boucle / us_vecto:>4.1f}")
+
+    print(f"\nBoîtes : {source}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_processus.py
+# -------------------------------------------------------------
+# Passage à l'échelle de la supervision multi-processus :
+# débit agrégé pour 1, 2, ... N processus sur les mêmes clips
+# Lancement : cd src/AeroGuard_AI && python benchmarks/bench_processus.py --processus 1 2 4 8 --cameras 8
+# -------------------------------------------------------------
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pipeline import generer_clip_synthetique  # noqa: E402
+from detection.backends import preparer_modele  # noqa: E402
+from detection.processus import SuperviseurProcessus  # noqa: E402
+from utils.journalisation import Journalisation  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Passage à l'échelle multi-processus AeroGuard")
+    parser.add_argument("--poids", default="models/yolov8s.pt")
+    parser.add_argument("--backend", default="pytorch")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--processus", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--cameras", type=int, default=8, help="Clips synthétiques traités simultanément")
+    parser.add_argument("--images", type=int, default=200, help="Images par clip")
+    parser.add_argument("--filtre-mouvement", action="store_true")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    chemin_modele = preparer_modele(args.poids, args.backend)
+    config = {
+        "detecteur": {"chemin_modele": chemin_modele, "taille_image": args.imgsz,
+                      "filtre_mouvement": {} if args.filtre_mouvement else None},
+        "preuves": None,
+    }
+
+    resultats = []
+    with tempfile.TemporaryDirectory(prefix="aeroguard_processus_") as dossier_temp:
+        sources = []
+        for i in range(args.cameras):
+            chemin = os.path.join(dossier_temp, f"camera_{i}.mp4")
+            generer_clip_synthetique(chemin, args.images, graine=i)
+            sources.append((f"camera_{i}", chemin))
+
+        for nb_processus in args.processus:
+            journal = Journalisation(os.path.join(dossier_temp, f"logs_{nb_processus}"))
+            try:
+                superviseur = SuperviseurProcessus(config, sources, journal, nb_processus,
+                                                   mode_lecture="fichier", intervalle_rapport=3600)
+                total, fps = superviseur.executer()
+            finally:
+                journal.fermer()
+            resultats.append({"processus": nb_processus, "images": total, "img_par_s": fps})
+
+    reference = resultats[0]["img_par_s"] / resultats[0]["processus"] if resultats[0]["img_par_s"] else 0.0
+    print(f"\n{'Processus':>9} {'img/s':>8} {'Accélération':>13} {'Efficacité':>11}")
+    for resultat in resultats:
+        acceleration = resultat["img_par_s"] / reference if reference else 0.0
+        resultat["acceleration"] = acceleration
+        resultat["efficacite"] = acceleration / resultat["processus"]
+        print(f"{resultat['processus']:>9} {resultat['img_par_s']:>8.1f} {acceleration:>12.2f}x "
+              f"{resultat['efficacite']:>10.0%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"coeurs": os.cpu_count(), "cameras": args.cameras, "imgsz": args.imgsz,
+                       "resultats": resultats}, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés : {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# benchmarks/bench_tuilage.py
+# -------------------------------------------------------------
+# Inférence tuilée : débit (img/s) contre rappel, en particulier
+# sur les petits objets, par rapport à une inférence pleine résolution
+# Lancement : cd src/AeroGuard_AI && python benchmarks/bench_tuilage.py --video videos/CAM_4k.mp4
+#             --regions 0 0.3 1 0.6
+# -------------------------------------------------------------
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.detection_video import ContexteCamera, DetecteurVideo  # noqa: E402
+from detection.postraitement import extraire_detections  # noqa: E402
+from detection.suivi import matrice_iou  # noqa: E402
+from detection.tuilage import ConfigurationTuilage  # noqa: E402
+from utils.calcul_risque import CalculRisque  # noqa: E402
+from utils.journalisation import Journalisation  # noqa: E402
+
+
+def lire_images(chemin_video, max_images, pas):
+    """
+    Charge une image sur pas (les images voisines sont presque identiques).
+    """
+    flux = cv2.VideoCapture(chemin_video)
+    images = []
+    index = 0
+    while len(images) < max_images:
+        succes, frame = flux.read()
+        if not succes:
+            break
+        if index % pas == 0:
+            images.append(frame)
+        index += 1
+    flux.release()
+    return images
+
+
+def apparier(reference, candidat, seuil_iou=0.5):
+    """
+    Masque des détections de référence retrouvées par le candidat
+    (même classe, IoU >= seuil, appariement glouton par IoU décroissante).
+    """
+    trouvees = np.zeros(len(reference), dtype=bool)
+    if len(reference) == 0 or len(candidat) == 0:
+        return trouvees
+
+    iou = matrice_iou(reference.boites, candidat.boites)
+    iou[reference.classes[:, None] != candidat.classes[None, :]] = 0.0
+    lignes, colonnes = np.nonzero(iou >= seuil_iou)
+    prises = set()
+    for ordre in np.argsort(-iou[lignes, colonnes], kind="stable"):
+        ligne, colonne = lignes[ordre], colonnes[ordre]
+        if trouvees[ligne] or colonne in prises:
+            continue
+        trouvees[ligne] = True
+        prises.add(colonne)
+    return trouvees
+
+
+def executer_configuration(detecteur, ctx, images):
+    """
+    Retourne (détections par image, images/seconde) pour une configuration.
+    """
+    detections = []
+    debut = time.perf_counter()
+    for frame in images:
+        if ctx.tuilage is not None:
+            resultats, tuiles = detecteur._inferer_tuiles(frame, ctx)
+            detections.append(ctx.tuilage.fusionner([extraire_detections(r) for r in resultats], tuiles))
+        else:
+            detections.append(extraire_detections(detecteur._inferer(frame, ctx.taille_image)))
+    duree = time.perf_counter() - debut
+    return detections, len(images) / duree if duree > 0 else 0.0
+
+
+def evaluer(reference, candidat, aire_petits):
+    """
+    Rappel global, rappel sur les petits objets et précision par rapport à la référence.
+    """
+    trouvees = petits = petits_trouves = total_ref = total_cand = 0
+    for ref, cand in zip(reference, candidat):
+        masque = apparier(ref, cand)
+        aires = (ref.boites[:, 2] - ref.boites[:, 0]) * (ref.boites[:, 3] - ref.boites[:, 1])
+        est_petit = aires < aire_petits
+
+        trouvees += int(masque.sum())
+        petits += int(est_petit.sum())
+        petits_trouves += int((masque & est_petit).sum())
+        total_ref += len(ref)
+        total_cand += len(cand)
+
+    return {
+        "rappel": trouvees / total_ref if total_ref else 1.0,
+        "rappel_petits": petits_trouves / petits if petits else 1.0,
+        "precision": trouvees / total_cand if total_cand else 1.0,
+        "detections": total_cand,
+        "reference": total_ref,
+        "petits_reference": petits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'inférence tuilée AeroGuard")
+    parser.add_argument("--video", required=True, help="Vidéo haute résolution (4K)")
+    parser.add_argument("--poids", default="models/yolov8s.pt")
+    parser.add_argument("--peripherique", default="cpu")
+    parser.add_argument("--max-images", type=int, default=50)
+    parser.add_argument("--pas", type=int, default=10, help="Une image analysée sur pas")
+    parser.add_argument("--taille-tuile", type=int, default=640)
+    parser.add_argument("--recouvrement", type=float, default=0.2)
+    parser.add_argument("--regions", type=float, nargs="+",
+                        help="Rectangles normalisés x1 y1 x2 y2 [x1 y1 x2 y2 ...] pour le tuilage limité")
+    parser.add_argument("--aire-petits", type=int, default=48 * 48, help="Aire (px²) d'un petit objet")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    images = lire_images(args.video, args.max_images, args.pas)
+    if not images:
+        print(f"[ERREUR] Impossible de lire la vidéo : {args.video}")
+        return
+    hauteur, largeur = images[0].shape[:2]
+
+    # Référence : le modèle voit l'image à sa résolution native (multiple de 32)
+    taille_native = int(np.ceil(max(largeur, hauteur) / 32) * 32)
+
+    regions = None
+    if args.regions:
+        if len(args.regions) % 4:
+            print("[ERREUR] --regions attend des groupes de 4 valeurs")
+            return
+        regions = [args.regions[i:i + 4] for i in range(0, len(args.regions), 4)]
+
+    configurations = [
+        ("plein cadre 640", 640, None),
+        ("plein cadre 1280", 1280, None),
+        ("tuilé image entière", 640, ConfigurationTuilage(None, args.taille_tuile, args.recouvrement)),
+    ]
+    if regions:
+        configurations.append(("tuilé régions", 640,
+                               ConfigurationTuilage(regions, args.taille_tuile, args.recouvrement)))
+
+    with tempfile.TemporaryDirectory(prefix="aeroguard_tuilage_") as dossier_temp:
+        journal = Journalisation(dossier_temp)
+        detecteur = DetecteurVideo(args.poids, CalculRisque(), journal, args.peripherique)
+
+        print(f"[INFO] {len(images)} images {largeur}x{hauteur} | référence imgsz {taille_native}")
+        reference, fps_ref = executer_configuration(detecteur, ContexteCamera("reference", taille_image=taille_native),
+                                                    images)
+
+        print(f"\n{'Configuration':<22} {'Tuiles':>6} {'img/s':>7} {'Rappel':>7} {'Petits':>7} {'Précision':>10}")
+        print(f"{'référence native':<22} {'-':>6} {fps_ref:>7.2f} {1.0:>7.3f} {1.0:>7.3f} {1.0:>10.3f}")
+        resultats = [{"configuration": "référence native", "imgsz": taille_native, "img_par_s": fps_ref}]
+
+        for nom, taille_image, tuilage in configurations:
+            ctx = ContexteCamera(nom, taille_image=taille_image, tuilage=tuilage)
+            detections, fps = executer_configuration(detecteur, ctx, images)
+            nb_tuiles = len(tuilage.tuiles(largeur, hauteur)) if tuilage is not None else 0
+            mesures = evaluer(reference, detections, args.aire_petits)
+            print(f"{nom:<22} {nb_tuiles:>6} {fps:>7.2f} {mesures['rappel']:>7.3f} "
+                  f"{mesures['rappel_petits']:>7.3f} {mesures['precision']:>10.3f}")
+            resultats.append({"configuration": nom, "imgsz": taille_image, "tuiles": nb_tuiles,
+                              "img_par_s": fps, **mesures})
+
+        journal.fermer()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"video": args.video, "resolution": [largeur, hauteur], "regions": regions,
+                       "taille_tuile": args.taille_tuile, "recouvrement": args.recouvrement,
+                       "resultats": resultats}, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés : {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/comparer_backends.py
+# -------------------------------------------------------------
+# Compare les moteurs d'inférence (ONNX Runtime, OpenVINO, int8)
+# au modèle PyTorch de référence : débit + accord des détections
+# Lancement : cd src/AeroGuard_AI && python benchmarks/comparer_backends.py --videos videos
+# -------------------------------------------------------------
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.backends import preparer_modele  # noqa: E402
+from detection.postraitement import extraire_detections  # noqa: E402
+from detection.registre_modeles import obtenir_modele  # noqa: E402
+from detection.suivi import matrice_iou  # noqa: E402
+
+EXTENSIONS_VIDEO = (".mp4", ".avi", ".mkv")
+
+
+def lire_images(chemin_video, max_images):
+    """
+    Charge les images en mémoire : chaque moteur voit exactement les mêmes entrées
+    et le décodage n'entre pas dans la mesure.
+    """
+    flux = cv2.VideoCapture(chemin_video)
+    images = []
+    while len(images) < max_images:
+        succes, frame = flux.read()
+        if not succes:
+            break
+        images.append(frame)
+    flux.release()
+    return images
+
+
+def executer_moteur(chemin_modele, images, taille_image, peripherique):
+    """
+    Retourne (détections par image, images/seconde) pour un modèle.
+    """
+    entree = obtenir_modele(chemin_modele, peripherique, taille_image=taille_image)
+    detections = []
+    debut = time.perf_counter()
+    for frame in images:
+        resultat = entree.modele(frame, verbose=False, device=peripherique, imgsz=taille_image)[0]
+        detections.append(extraire_detections(resultat))
+    duree = time.perf_counter() - debut
+    return detections, len(images) / duree if duree > 0 else 0.0
+
+
+def accord_detections(reference, candidat, seuil_iou=0.5):
+    """
+    Appariement glouton (même classe, IoU >= seuil) entre deux listes de détections.
+    Retourne (appariées, nb_reference, nb_candidat).
+    """
+    if len(reference) == 0 or len(candidat) == 0:
+        return 0, len(reference), len(candidat)
+
+    iou = matrice_iou(reference.boites, candidat.boites)
+    iou[reference.classes[:, None] != candidat.classes[None, :]] = 0.0
+
+    appariees = 0
+    lignes, colonnes = np.nonzero(iou >= seuil_iou)
+    ordre = np.argsort(-iou[lignes, colonnes], kind="stable")
+    prises_ref, prises_cand = set(), set()
+    for ligne, colonne in zip(lignes[ordre], colonnes[ordre]):
+        if ligne in prises_ref or colonne in prises_cand:
+            continue
+        prises_ref.add(ligne)
+        prises_cand.add(colonne)
+        appariees += 1
+    return appariees, len(reference), len(candidat)
+
+
+def comparer(detections_ref, detections_cand):
+    """
+    Précision / rappel / F1 du moteur candidat par rapport à la référence PyTorch.
+    """
+    total_app = total_ref = total_cand = 0
+    for ref, cand in zip(detections_ref, detections_cand):
+        app, n_ref, n_cand = accord_detections(ref, cand)
+        total_app += app
+        total_ref += n_ref
+        total_cand += n_cand
+
+    precision = total_app / total_cand if total_cand else 1.0
+    rappel = total_app / total_ref if total_ref else 1.0
+    f1 = 2 * precision * rappel / (precision + rappel) if precision + rappel else 0.0
+    return {"precision": precision, "rappel": rappel, "f1": f1,
+            "detections_reference": total_ref, "detections_candidat": total_cand}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison des moteurs d'inférence AeroGuard")
+    parser.add_argument("--poids", default="models/yolov8s.pt", help="Poids PyTorch de référence")
+    parser.add_argument("--videos", default="videos", help="Dossier des vidéos enregistrées")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "openvino"])
+    parser.add_argument("--int8", action="store_true", help="Ajoute les variantes quantifiées int8")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640])
+    parser.add_argument("--max-images", type=int, default=300, help="Images par vidéo")
+    parser.add_argument("--peripherique", default="cpu")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    videos = sorted(f for f in os.listdir(args.videos) if f.lower().endswith(EXTENSIONS_VIDEO))
+    if not videos:
+        print(f"[ERREUR] Aucune vidéo dans {args.videos}")
+        return
+
+    candidats = [(backend, False) for backend in args.backends]
+    if args.int8:
+        candidats += [(backend, True) for backend in args.backends]
+
+    resultats = []
+    for nom_video in videos:
+        images = lire_images(os.path.join(args.videos, nom_video), args.max_images)
+        print(f"\n=== {nom_video} ({len(images)} images) ===")
+        print(f"{'Moteur':<16} {'imgsz':>6} {'img/s':>8} {'x réf':>7} {'Précision':>10} {'Rappel':>8} {'F1':>6}")
+
+        for taille_image in args.imgsz:
+            det_ref, fps_ref = executer_moteur(args.poids, images, taille_image, args.peripherique)
+            print(f"{'pytorch (réf.)':<16} {taille_image:>6} {fps_ref:>8.1f} {1.0:>7.2f}")
+            resultats.append({"video": nom_video, "moteur": "pytorch", "int8": False,
+                              "imgsz": taille_image, "fps": fps_ref})
+
+            for backend, int8 in candidats:
+                nom_moteur = backend + (" int8" if int8 else "")
+                try:
+                    chemin = preparer_modele(args.poids, backend, int8)
+                    det_cand, fps_cand = executer_moteur(chemin, images, taille_image, args.peripherique)
+                except Exception as e:
+                    print(f"{nom_moteur:<16} {taille_image:>6} indisponible : {e}")
+                    continue
+
+                accord = comparer(det_ref, det_cand)
+                print(f"{nom_moteur:<16} {taille_image:>6} {fps_cand:>8.1f} {fps_cand / fps_ref:>7.2f} "
+                      f"{accord['precision']:>10.3f} {accord['rappel']:>8.3f} {accord['f1']:>6.3f}")
+                resultats.append({"video": nom_video, "moteur": backend, "int8": int8,
+                                  "imgsz": taille_image, "fps": fps_cand, **accord})
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés : {args.json}")
+
+
+if __name__ == "__main__":
+    main()
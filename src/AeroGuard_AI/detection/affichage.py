@@ -0,0 +1,75 @@
+# detection/affichage.py
+# -------------------------------------------------------------
+# Rendu de l'aperçu dans un thread séparé, à cadence plafonnée
+# -------------------------------------------------------------
+
+import threading
+import time
+
+import cv2
+
+
+class AfficheurAsynchrone:
+    def __init__(self, detecteur, fps_max=15):
+        """
+        Prépare le thread d'affichage.
+        :param detecteur: DetecteurVideo (fournit le dessin des boîtes et du HUD)
+        :param fps_max: Cadence maximale de rafraîchissement de l'aperçu
+        """
+        self.detecteur = detecteur
+        self.periode = 1.0 / fps_max if fps_max > 0 else 0.0
+
+        # Dernière image publiée par caméra : les images intermédiaires sont abandonnées
+        self._dernieres = {}
+        self._verrou = threading.Lock()
+
+        self._arret = threading.Event()
+        # Positionné quand l'opérateur appuie sur 'q' dans une fenêtre
+        self.arret_demande = threading.Event()
+
+        self.nb_rendues = 0
+        self._thread = threading.Thread(target=self._boucle, name="afficheur", daemon=True)
+
+    def demarrer(self):
+        self._thread.start()
+        return self
+
+    def publier(self, camera_nom, frame, detections, niveau, nombre_objets):
+        """
+        Appelé par la boucle de détection : simple dépôt, aucun dessin ni appel GUI.
+        """
+        with self._verrou:
+            self._dernieres[camera_nom] = (frame, detections, niveau, nombre_objets)
+
+    def _boucle(self):
+        # Toutes les fonctions GUI d'OpenCV sont appelées depuis ce seul thread
+        while not self._arret.is_set():
+            debut = time.perf_counter()
+
+            with self._verrou:
+                a_rendre = self._dernieres
+                self._dernieres = {}
+
+            for camera_nom, (frame, detections, niveau, nombre_objets) in a_rendre.items():
+                self.detecteur._dessiner_boites(frame, detections)
+                self.detecteur._dessiner_hud(frame, niveau, nombre_objets)
+                cv2.imshow(f"ANAC MONITORING - {camera_nom}", frame)
+                self.nb_rendues += 1
+
+            # Quitter avec 'q'
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                self.arret_demande.set()
+
+            restant = self.periode - (time.perf_counter() - debut)
+            if restant > 0:
+                time.sleep(restant)
+
+        cv2.destroyAllWindows()
+
+    def fermer(self):
+        """
+        Arrête le rendu et ferme les fenêtres.
+        """
+        self._arret.set()
+        if self._thread.is_alive():
+            self._thread.join()
@@ -0,0 +1,70 @@
+# detection/backends.py
+# -------------------------------------------------------------
+# Moteurs d'inférence CPU : PyTorch (.pt), ONNX Runtime, OpenVINO
+# + variante quantifiée int8. Les exports sont créés une fois à côté des poids.
+# -------------------------------------------------------------
+
+import os
+import shutil
+
+BACKENDS = ("pytorch", "onnx", "openvino")
+
+
+def chemin_export(chemin_pt, backend, int8=False):
+    """
+    Chemin du modèle exporté pour un moteur donné.
+    Ex: models/yolov8s.pt -> models/yolov8s_int8.onnx
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Moteur d'inférence inconnu : {backend} (choix : {', '.join(BACKENDS)})")
+
+    base = os.path.splitext(chemin_pt)[0] + ("_int8" if int8 else "")
+    if backend == "onnx":
+        return base + ".onnx"
+    if backend == "openvino":
+        return base + "_openvino_model"
+    if int8:
+        raise ValueError("La quantification int8 nécessite le moteur 'onnx' ou 'openvino'.")
+    return chemin_pt
+
+
+def _quantifier_onnx(chemin_fp32, chemin_int8):
+    """
+    Quantification dynamique int8 des poids (ONNX Runtime), sans jeu de calibration.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(chemin_fp32, chemin_int8, weight_type=QuantType.QUInt8)
+
+
+def preparer_modele(chemin_pt, backend="pytorch", int8=False):
+    """
+    Retourne le chemin du modèle à charger pour le moteur choisi,
+    en l'exportant depuis les poids PyTorch s'il n'existe pas encore.
+    """
+    cible = chemin_export(chemin_pt, backend, int8)
+    if os.path.exists(cible):
+        return cible
+
+    from ultralytics import YOLO
+
+    print(f"[INIT] Export du modèle pour le moteur {backend}{' int8' if int8 else ''} : {cible}")
+    modele = YOLO(chemin_pt)
+
+    if backend == "onnx":
+        # Forme dynamique : lots multi-caméras et taille d'image par caméra
+        chemin_fp32 = chemin_export(chemin_pt, "onnx")
+        if not os.path.exists(chemin_fp32):
+            sortie = modele.export(format="onnx", dynamic=True, simplify=True)
+            if os.path.abspath(sortie) != os.path.abspath(chemin_fp32):
+                shutil.move(sortie, chemin_fp32)
+        if int8:
+            _quantifier_onnx(chemin_fp32, cible)
+
+    elif backend == "openvino":
+        # int8 OpenVINO : quantification post-entraînement calibrée (NNCF)
+        sortie = modele.export(format="openvino", dynamic=True, int8=int8)
+        if os.path.abspath(sortie) != os.path.abspath(cible):
+            shutil.move(sortie, cible)
+
+    return cible
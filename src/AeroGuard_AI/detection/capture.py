@@ -0,0 +1,127 @@
+# detection/capture.py
+# -------------------------------------------------------------
+# Lecture des sources vidéo : thread de capture à file bornée
+# (la plus ancienne image est abandonnée) pour les flux en direct,
+# lecture image par image pour les fichiers enregistrés
+# -------------------------------------------------------------
+
+import collections
+import os
+import threading
+import time
+
+import cv2
+
+MODES = ("auto", "direct", "fichier")
+
+# Délais d'ouverture et de lecture d'un flux en direct : une source réseau muette
+# fait échouer read() au lieu de bloquer le thread de capture indéfiniment
+DELAI_OUVERTURE_MS = 10000
+DELAI_LECTURE_MS = 5000
+
+
+class LecteurFlux:
+    def __init__(self, source, mode="auto", taille_file=2, metriques=None):
+        """
+        Ouvre une source vidéo.
+        :param source: Chemin de fichier, URL RTSP/HTTP ou index de caméra USB
+        :param mode: 'direct' : un thread lit en continu, l'analyse prend toujours l'image la plus récente ;
+                     'fichier' : chaque image est lue à la demande, aucune n'est perdue ;
+                     'auto' : 'fichier' pour un fichier existant, 'direct' sinon
+        :param taille_file: Images gardées en attente en mode direct (au-delà, la plus ancienne est perdue)
+        :param metriques: MetriquesCamera où compter les images abandonnées, ou None
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode de lecture inconnu : {mode}")
+        if mode == "auto":
+            mode = "fichier" if isinstance(source, str) and os.path.isfile(source) else "direct"
+
+        self.source = source
+        self.mode = mode
+        self.metriques = metriques
+        self.nb_lues = 0
+        self.nb_abandonnees = 0
+
+        if mode == "direct" and hasattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC"):
+            self.flux = cv2.VideoCapture(source, cv2.CAP_ANY,
+                                         [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, DELAI_OUVERTURE_MS,
+                                          cv2.CAP_PROP_READ_TIMEOUT_MSEC, DELAI_LECTURE_MS])
+        else:
+            self.flux = cv2.VideoCapture(source)
+        # Cadence annoncée par la source (0 si inconnue)
+        self.fps = (self.flux.get(cv2.CAP_PROP_FPS) or 0.0) if self.flux.isOpened() else 0.0
+
+        self._thread = None
+        if mode == "direct" and self.flux.isOpened():
+            # Le tampon interne du décodeur ajouterait sa propre latence
+            self.flux.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self._file = collections.deque(maxlen=max(1, taille_file))
+            self._condition = threading.Condition()
+            self._fin = False
+            self._arret = threading.Event()
+            self._thread = threading.Thread(target=self._boucle_capture, name=f"capture-{source}", daemon=True)
+            self._thread.start()
+
+    def est_ouvert(self):
+        return self.flux.isOpened()
+
+    def _boucle_capture(self):
+        """
+        Thread de capture : lit sans attendre l'analyse, horodate chaque image à sa réception.
+        Seul à utiliser la source (VideoCapture n'est pas thread-safe) : il la libère en sortant.
+        """
+        try:
+            while not self._arret.is_set():
+                succes, frame = self.flux.read()
+                horodatage = time.time()
+                if not succes:
+                    break
+                with self._condition:
+                    if len(self._file) == self._file.maxlen:
+                        # deque bornée : l'ajout élimine l'image la plus ancienne
+                        self.nb_abandonnees += 1
+                        if self.metriques is not None:
+                            self.metriques.incrementer("images_abandonnees")
+                    self._file.append((frame, horodatage))
+                    self.nb_lues += 1
+                    self._condition.notify()
+        finally:
+            self.flux.release()
+            with self._condition:
+                self._fin = True
+                self._condition.notify_all()
+
+    def lire(self):
+        """
+        Retourne (succès, image, horodatage de capture).
+        En mode direct, bloque jusqu'à la prochaine image disponible.
+        """
+        if self._thread is None:
+            # Fichier : l'image « arrive » quand on la demande, décodage compris dans son âge
+            horodatage = time.time()
+            succes, frame = self.flux.read()
+            if not succes:
+                return False, None, None
+            self.nb_lues += 1
+            return True, frame, horodatage
+
+        with self._condition:
+            while not self._file and not self._fin:
+                self._condition.wait(0.5)
+            if not self._file:
+                return False, None, None
+            frame, horodatage = self._file.popleft()
+        return True, frame, horodatage
+
+    def fermer(self):
+        """
+        Arrête le thread de capture (qui libère la source), ou libère directement la source en mode fichier.
+        """
+        if self._thread is None:
+            self.flux.release()
+            return
+        self._arret.set()
+        # Lecture bornée par DELAI_LECTURE_MS : au-delà, le thread finit seul et libère la source
+        self._thread.join(timeout=DELAI_LECTURE_MS / 1000.0 + 1.0)
+        if self._thread.is_alive():
+            print(f"[ATTENTION] Capture {self.source} encore bloquée : source libérée à la fin de la lecture")
@@ -3,8 +3,67 @@
 # Analyse vidéo avec YOLO + affichage HUD dynamique + alertes
 # -------------------------------------------------------------
 
+import threading
+import time
+
 import cv2
-from ultralytics import YOLO
+import numpy as np
+
+from detection.affichage import AfficheurAsynchrone
+from detection.capture import LecteurFlux
+from detection.filtre_mouvement import FiltreMouvement
+from detection.ordonnanceur_lots import OrdonnanceurLots
+from detection.postraitement import Detections, extraire_detections
+from detection.registre_modeles import obtenir_modele
+from detection.suivi import AgregateurIncidents, SuiviIoU
+from utils.metriques import registre_metriques
+
+# Étapes chronométrées dans traiter_frame (le décodage et le rendu sont mesurés par l'appelant)
+ETAPES = ("filtre", "inference", "postraitement", "risque", "journal", "preuve")
+
+
+class ContexteCamera:
+    """
+    État propre à une caméra (le détecteur et son modèle sont partagés).
+    """
+
+    def __init__(self, nom, filtre_mouvement=None, config_incidents=None, zones=None, taille_image=640,
+                 capture_preuve=None, metriques=None, tuilage=None):
+        self.nom = nom
+        self.filtre = filtre_mouvement
+
+        # Compteurs et histogrammes de la caméra (MetriquesCamera du registre)
+        self.metriques = metriques
+
+        # Tampon circulaire des dernières secondes (clips de preuve), ou None
+        self.preuve = capture_preuve
+
+        # Taille d'entrée du modèle (imgsz) propre à la caméra
+        self.taille_image = taille_image
+
+        # Zones de la caméra (ZonesCamera), rastérisées à la première image
+        self.zones = zones
+
+        # Inférence tuilée haute résolution (ConfigurationTuilage), ou None
+        self.tuilage = tuilage
+
+        # Suivi des objets et regroupement des images à risque en incidents
+        self.suivi = SuiviIoU()
+        self.incidents = AgregateurIncidents(**(config_incidents or {}))
+
+        # Résultat de la dernière image analysée, reporté sur les images ignorées
+        self.detections = Detections.vide()
+        self.pistes_dangereuses = []
+        self.objets_dangereux = []
+        self.score = 0
+        self.niveau = "FAIBLE"
+
+        # Durées (secondes) des étapes de la dernière image traitée (benchmarks, métriques)
+        self.durees = dict.fromkeys(ETAPES, 0.0)
+        # Secondes entre la capture de la dernière image et la décision (score/niveau/log)
+        self.age = 0.0
+        # True si la dernière image est passée par le modèle (False : filtre de mouvement)
+        self.analysee = False
 
 
 class DetecteurVideo:
@@ -25,16 +84,110 @@ class DetecteurVideo:
         "ÉLEVÉ": (0, 0, 200)  # Rouge vif
     }
 
-    def __init__(self, chemin_modele, calculateur_risque, journal, peripherique="cpu"):
+    def __init__(self, chemin_modele, calculateur_risque, journal, peripherique="cpu", filtre_mouvement=None,
+                 config_incidents=None, zones=None, taille_image=640, tailles_cameras=None, preuves=None,
+                 metriques=None, tuilage=None):
         """
         Initialise le détecteur avec le modèle YOLO et les gestionnaires de risques/logs.
+        :param filtre_mouvement: Paramètres de FiltreMouvement (dict) pour ignorer les images
+                                 statiques, ou None pour analyser toutes les images
+        :param config_incidents: Paramètres d'AgregateurIncidents (dict), ex: {"delai_fermeture": 3.0}
+        :param zones: dict {nom_camera: ZonesCamera} pour pondérer le risque selon la position
+        :param taille_image: Taille d'entrée du modèle (imgsz) par défaut
+        :param tailles_cameras: dict {nom_camera: imgsz} pour les caméras qui en demandent une autre
+        :param preuves: EncodeurPreuves pour enregistrer un clip MP4 à chaque incident ÉLEVÉ, ou None
+        :param metriques: RegistreMetriques (par défaut celui du processus, exposé par ServeurMetriques)
+        :param tuilage: dict {nom_camera: ConfigurationTuilage} pour les caméras haute résolution
+                        dont les objets lointains doivent être cherchés par tuiles
         """
-        print(f"[INIT] Chargement du modèle YOLO : {chemin_modele}")
-        self.modele = YOLO(chemin_modele)
+        # Modèle chargé une seule fois par processus (registre partagé entre sessions)
+        # chemin_modele peut désigner un .pt, un .onnx ou un dossier OpenVINO (voir detection/backends.py)
+        self.entree_modele = obtenir_modele(chemin_modele, peripherique, taille_image=taille_image)
+        self.modele = self.entree_modele.modele
         self.risque = calculateur_risque
         self.journal = journal
         self.peripherique = peripherique
 
+        # Poids de risque indexés par id de classe (calcul vectorisé)
+        self.risque.indexer_classes(self.modele.names)
+
+        # Le modèle est partagé entre toutes les caméras et sessions :
+        # le verrou du registre sérialise les appels d'inférence (YOLO n'est pas thread-safe)
+        self._verrou_modele = self.entree_modele.verrou
+
+        # Ordonnanceur d'inférence par lots (optionnel, multi-caméras)
+        self.ordonnanceur = None
+
+        # État par caméra (filtre de mouvement, suivi, incident en cours)
+        self.config_mouvement = filtre_mouvement
+        self.config_incidents = config_incidents
+        self.zones = zones or {}
+        self.taille_image = taille_image
+        self.tailles_cameras = tailles_cameras or {}
+        self.preuves = preuves
+        self.tuilage = tuilage or {}
+        self.contextes = {}
+        self._verrou_contextes = threading.Lock()
+
+        # Métriques : profondeur des files lue à chaque export
+        self.metriques = metriques if metriques is not None else registre_metriques()
+        self.metriques.definir_jauge("file_inference", "Images en attente de lot d'inférence",
+                                     lambda: self.ordonnanceur.profondeur_file() if self.ordonnanceur else 0)
+        self.metriques.definir_jauge("file_journal", "Incidents en attente d'écriture",
+                                     self.journal.profondeur_file)
+
+    def contexte(self, camera_nom):
+        """
+        Retourne (en le créant si besoin) l'état associé à une caméra.
+        """
+        with self._verrou_contextes:
+            if camera_nom not in self.contextes:
+                filtre = FiltreMouvement(**self.config_mouvement) if self.config_mouvement is not None else None
+                self.contextes[camera_nom] = ContexteCamera(
+                    camera_nom, filtre, self.config_incidents, self.zones.get(camera_nom),
+                    self.tailles_cameras.get(camera_nom, self.taille_image),
+                    self.preuves.nouvelle_capture() if self.preuves is not None else None,
+                    self.metriques.camera(camera_nom), self.tuilage.get(camera_nom))
+            return self.contextes[camera_nom]
+
+    def cloturer_camera(self, camera_nom):
+        """
+        Fin de flux : journalise l'incident encore ouvert sur la caméra.
+        """
+        ctx = self.contexte(camera_nom)
+        if ctx.preuve is not None:
+            ctx.preuve.terminer()
+
+        incident = ctx.incidents.cloturer()
+        if incident is not None:
+            self.journal.enregistrer_incident(camera_nom, incident)
+            ctx.metriques.incrementer("incidents_journalises")
+
+    def oublier_camera(self, camera_nom):
+        """
+        Supprime l'état d'une caméra (suivi, filtre, incident) : la prochaine image repart de zéro.
+        À appeler après cloturer_camera, par exemple entre deux enregistrements d'une même zone.
+        """
+        with self._verrou_contextes:
+            self.contextes.pop(camera_nom, None)
+
+    def activer_inference_par_lots(self, taille_lot_max=8, attente_max_ms=10):
+        """
+        Regroupe les images de toutes les caméras en lots avant l'appel au modèle.
+        """
+        if self.ordonnanceur is None:
+            self.ordonnanceur = OrdonnanceurLots(self.modele, self.peripherique, taille_lot_max,
+                                                 attente_max_ms, verrou=self._verrou_modele)
+        return self.ordonnanceur
+
+    def desactiver_inference_par_lots(self):
+        """
+        Arrête l'ordonnanceur et revient à une inférence image par image.
+        """
+        if self.ordonnanceur is not None:
+            self.ordonnanceur.fermer()
+            self.ordonnanceur = None
+
     def _dessiner_hud(self, frame, niveau, nombre_objets):
         """
         Méthode privée pour dessiner le bandeau d'alerte en haut de l'image.
@@ -67,71 +220,222 @@ class DetecteurVideo:
         # 4. Écrire le texte en BLANC
         cv2.putText(frame, texte, (pos_x, pos_y), font, scale, (255, 255, 255), thickness)
 
-    def analyser_video(self, camera_nom, chemin_video):
+    def _inferer(self, frame, taille_image=640):
         """
-        Boucle principale de lecture et de traitement vidéo.
+        Lance le modèle YOLO sur une image (accès protégé par le verrou partagé).
+        Si l'ordonnanceur est actif, l'image rejoint le prochain lot multi-caméras.
         """
-        flux = cv2.VideoCapture(chemin_video)
+        if self.ordonnanceur is not None:
+            return self.ordonnanceur.inferer(frame, taille_image)
 
-        if not flux.isOpened():
-            print(f"[ERREUR] Impossible d'ouvrir la vidéo : {chemin_video}")
-            return
+        with self._verrou_modele:
+            return self.modele(frame, verbose=False, device=self.peripherique, imgsz=taille_image)[0]
+
+    def _inferer_lot(self, frames, tailles):
+        """
+        Plusieurs images en un minimum de passages du modèle (une par taille d'entrée).
+        Avec l'ordonnanceur, les images rejoignent les lots des autres caméras.
+        """
+        if self.ordonnanceur is not None:
+            futurs = [self.ordonnanceur.soumettre(frame, taille) for frame, taille in zip(frames, tailles)]
+            return [futur.result() for futur in futurs]
 
-        print(f"[INFO] Démarrage analyse caméra : {camera_nom}")
-        print("[INFO] Appuyez sur 'q' pour quitter l'affichage.")
+        resultats = [None] * len(frames)
+        groupes = {}
+        for index, taille in enumerate(tailles):
+            groupes.setdefault(taille, []).append(index)
+        with self._verrou_modele:
+            for taille, indices in groupes.items():
+                sorties = self.modele([frames[i] for i in indices], verbose=False, device=self.peripherique,
+                                      imgsz=taille)
+                for i, sortie in zip(indices, sorties):
+                    resultats[i] = sortie
+        return resultats
 
-        while True:
-            succes, frame = flux.read()
-            if not succes:
-                print("[INFO] Fin du flux vidéo.")
-                break
+    def _inferer_tuiles(self, frame, ctx):
+        """
+        Inférence tuilée : toutes les tuiles des régions configurées (+ l'image entière
+        si vue_globale) en un seul lot. Retourne (résultats YOLO, tuiles) ; la fusion
+        par NMS inter-tuiles est faite par ConfigurationTuilage.fusionner.
+        """
+        tuilage = ctx.tuilage
+        hauteur, largeur = frame.shape[:2]
+        tuiles = tuilage.tuiles(largeur, hauteur)
 
-            # --- 1. DÉTECTION IA ---
-            resultats = self.modele(frame, verbose=False, device=self.peripherique)[0]
-            objets_dangereux = []
+        # Vues sur l'image (aucune copie) ; YOLO redimensionne chaque tuile à taille_tuile
+        images = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tuiles]
+        tailles = [tuilage.taille_tuile] * len(images)
+        if tuilage.vue_globale:
+            images.append(frame)
+            tailles.append(ctx.taille_image)
 
-            # --- 2. DESSIN DES BOITES (Objets) ---
-            for box in resultats.boxes:
-                classe_id = int(box.cls)
-                nom_objet = self.modele.names[classe_id]
-                confiance = float(box.conf[0])
+        return self._inferer_lot(images, tailles), tuiles
 
-                # Filtrage confiance faible
-                if confiance < 0.4:
-                    continue
+    def _dessiner_boites(self, frame, detections):
+        """
+        Dessine la boîte et le label de chaque détection.
+        """
+        noms = self.modele.names
+        for classe_id, (x1, y1, x2, y2) in zip(detections.classes.tolist(), detections.boites.tolist()):
+            nom_objet = noms[classe_id]
 
-                # Coordonnées
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
+            # Couleur objet
+            couleur = self.COULEURS_OBJETS.get(nom_objet, (200, 200, 200))
 
-                # Couleur objet
-                couleur = self.COULEURS_OBJETS.get(nom_objet, (200, 200, 200))
+            # Dessin Boite + Label
+            cv2.rectangle(frame, (x1, y1), (x2, y2), couleur, 2)
+            cv2.putText(frame, f"{nom_objet}", (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, couleur, 2)
 
-                # Dessin Boite + Label
-                cv2.rectangle(frame, (x1, y1), (x2, y2), couleur, 2)
-                cv2.putText(frame, f"{nom_objet}", (x1, y1 - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, couleur, 2)
+    def traiter_frame(self, camera_nom, frame, horodatage=None):
+        """
+        Applique la chaîne de décision sur une image : détection, suivi, risque et logs.
+        Aucun dessin ici : le rendu est délégué à AfficheurAsynchrone.
+        Si le filtre de mouvement juge l'image statique, YOLO n'est pas appelé
+        et le résultat de la dernière image analysée est reporté.
+        :param horodatage: Instant de capture de l'image (time.time() par défaut) ;
+                           sert aussi à mesurer l'âge de l'image au moment de la décision
+        Retourne (score, niveau, objets_dangereux).
+        """
+        if horodatage is None:
+            horodatage = time.time()
+        ctx = self.contexte(camera_nom)
+        durees = ctx.durees
+        t0 = time.perf_counter()
 
-                # Vérification risque
-                if self.risque.est_dangereux(nom_objet):
-                    objets_dangereux.append(nom_objet)
+        # Horloge de l'image : le keep-alive suit aussi le temps vidéo d'une ré-analyse d'archives
+        analyser = ctx.filtre is None or ctx.filtre.doit_analyser(frame, horodatage)
+        ctx.analysee = analyser
+        t1 = time.perf_counter()
+        durees["filtre"] = t1 - t0
+
+        if analyser:
+            zones = ctx.zones
+            if zones is not None:
+                hauteur, largeur = frame.shape[:2]
+                if not zones.est_rasterise_pour(largeur, hauteur):
+                    # Une seule fois par flux (ou changement de résolution)
+                    zones.rasteriser(largeur, hauteur)
+
+            # --- 1. DÉTECTION IA (conversion NumPy unique + filtrage par masque) ---
+            if ctx.tuilage is not None:
+                # Les régions de tuilage remplacent le recadrage sur les zones
+                resultats, tuiles = self._inferer_tuiles(frame, ctx)
+                t2 = time.perf_counter()
+                ctx.detections = ctx.tuilage.fusionner([extraire_detections(r) for r in resultats], tuiles)
+            elif zones is not None and zones.rectangle_inference is not None:
+                # Inférence limitée au rectangle englobant les zones configurées
+                x1, y1, x2, y2 = zones.rectangle_inference
+                resultat = self._inferer(frame[y1:y2, x1:x2], ctx.taille_image)
+                t2 = time.perf_counter()
+                ctx.detections = extraire_detections(resultat)
+                ctx.detections.boites += np.array([x1, y1, x1, y1], dtype=np.int32)
+            else:
+                resultat = self._inferer(frame, ctx.taille_image)
+                t2 = time.perf_counter()
+                ctx.detections = extraire_detections(resultat)
+            durees["inference"] = t2 - t1
+
+            # --- 2. LOGIQUE MÉTIER (Calcul Risque vectorisé, pondéré par zone) + SUIVI ---
+            t3 = time.perf_counter()
+            dangereuses = ctx.detections.filtrer(self.risque.masque_dangereux(ctx.detections.classes))
+            facteurs = zones.facteurs(dangereuses.boites) if zones is not None else None
+            ctx.score, ctx.niveau = self.risque.calculer_risque_classes(dangereuses.classes, facteurs)
+            t4 = time.perf_counter()
+            durees["risque"] = t4 - t3
+
+            ids_pistes = ctx.suivi.mettre_a_jour(dangereuses.classes, dangereuses.boites)
+            noms = self.modele.names
+            ctx.pistes_dangereuses = [(id_piste, noms[classe_id]) for id_piste, classe_id
+                                      in zip(ids_pistes.tolist(), dangereuses.classes.tolist())]
+            ctx.objets_dangereux = [nom for _, nom in ctx.pistes_dangereuses]
+            t5 = time.perf_counter()
+            # Post-traitement : conversion NumPy + suivi des pistes
+            durees["postraitement"] = (t3 - t2) + (t5 - t4)
+        else:
+            durees["inference"] = durees["postraitement"] = durees["risque"] = 0.0
+            t5 = t1
+
+        score, niveau, objets_dangereux = ctx.score, ctx.niveau, ctx.objets_dangereux
+
+        # --- 3. ENREGISTREMENT LOGS (un incident par période de risque, pas une ligne par image) ---
+        incident_clos = ctx.incidents.mettre_a_jour(horodatage, ctx.pistes_dangereuses, score, niveau)
+        if incident_clos is not None:
+            self.journal.enregistrer_incident(camera_nom, incident_clos)
+            ctx.metriques.incrementer("incidents_journalises")
+        t6 = time.perf_counter()
+        durees["journal"] = t6 - t5
+
+        # --- 4. PREUVE VIDÉO (tampon circulaire, clip confié à un autre processus) ---
+        if ctx.preuve is not None:
+            ctx.preuve.ajouter(frame, horodatage)
+            if niveau == "ÉLEVÉ" and ctx.incidents.en_cours is not None:
+                ctx.preuve.declencher(camera_nom, ctx.incidents.en_cours)
+        durees["preuve"] = time.perf_counter() - t6
+        ctx.age = time.time() - horodatage
+        ctx.metriques.observer_image(durees, analyser, ctx.age)
+
+        return score, niveau, objets_dangereux
+
+    def analyser_video(self, camera_nom, chemin_video, afficher=True, fps_apercu=15, mode_lecture="auto",
+                       taille_file_capture=2):
+        """
+        Boucle principale de lecture et de traitement vidéo.
+        :param chemin_video: Fichier vidéo, URL de flux ou index de caméra USB
+        :param afficher: False pour le mode serveur (aucun dessin, aucune fenêtre)
+        :param fps_apercu: Cadence maximale de l'aperçu quand afficher=True
+        :param mode_lecture: 'direct', 'fichier' ou 'auto' (voir LecteurFlux)
+        :param taille_file_capture: Images en attente au maximum en mode direct
+        """
+        ctx = self.contexte(camera_nom)
+        flux = LecteurFlux(chemin_video, mode_lecture, taille_file_capture, ctx.metriques)
+
+        if not flux.est_ouvert():
+            print(f"[ERREUR] Impossible d'ouvrir la vidéo : {chemin_video}")
+            flux.fermer()
+            return
 
-            # --- 3. LOGIQUE MÉTIER (Calcul Risque) ---
-            score, niveau = self.risque.calculer_risque(objets_dangereux)
+        print(f"[INFO] Démarrage analyse caméra : {camera_nom} (lecture {flux.mode})")
+        ctx.metriques.fps_source = flux.fps
 
-            # --- 4. AFFICHAGE HUD (Interface Propre) ---
-            self._dessiner_hud(frame, niveau, len(objets_dangereux))
+        afficheur = None
+        if afficher:
+            # Le rendu tourne dans son propre thread : il ne ralentit jamais la détection
+            afficheur = AfficheurAsynchrone(self, fps_apercu).demarrer()
+            print("[INFO] Appuyez sur 'q' pour quitter l'affichage.")
+        else:
+            print("[INFO] Mode sans affichage — Ctrl+C pour arrêter.")
 
-            # --- 5. ENREGISTREMENT LOGS (Si nécessaire) ---
-            if niveau in ["MOYEN", "ÉLEVÉ"] and objets_dangereux:
-                # On logue uniquement si c'est pertinent pour éviter de spammer le fichier
-                self.journal.enregistrer(camera_nom, objets_dangereux, score, niveau)
+        try:
+            while afficheur is None or not afficheur.arret_demande.is_set():
+                succes, frame, horodatage = flux.lire()
+                if not succes:
+                    print("[INFO] Fin du flux vidéo.")
+                    break
 
-            # --- 6. RENDU ---
-            cv2.imshow(f"ANAC MONITORING - {camera_nom}", frame)
+                # --- 1 à 4. DÉTECTION, RISQUE, LOGS, PREUVE ---
+                score, niveau, objets_dangereux = self.traiter_frame(camera_nom, frame, horodatage)
 
-            # Quitter avec 'q'
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+                # --- 5. RENDU (dépôt de la dernière image pour l'aperçu) ---
+                if afficheur is not None:
+                    afficheur.publier(camera_nom, frame, ctx.detections, niveau, len(objets_dangereux))
+        except KeyboardInterrupt:
+            print("\n[INFO] Arrêt demandé par l'opérateur.")
+        finally:
+            flux.fermer()
+            self.cloturer_camera(camera_nom)
+            if afficheur is not None:
+                afficheur.fermer()
 
-        flux.release()
-        cv2.destroyAllWindows()
\ No newline at end of file
+        age = ctx.metriques.age_capture
+        print(f"[INFO] Âge des images à la décision : moyenne {age.moyenne() * 1000:.0f} ms | "
+              f"p95 ≤ {age.quantile(0.95) * 1000:.0f} ms")
+        if flux.nb_abandonnees:
+            print(f"[INFO] Images abandonnées (analyse plus lente que le flux) : "
+                  f"{flux.nb_abandonnees}/{flux.nb_lues}")
+        if ctx.filtre is not None:
+            print(f"[INFO] Filtre mouvement : {ctx.filtre.nb_ignorees}/{ctx.filtre.nb_images} images ignorées "
+                  f"({ctx.filtre.taux_ignore():.0%} d'inférences économisées)")
+        if ctx.preuve is not None:
+            print(f"[INFO] Tampon de preuves : {ctx.preuve.nbytes / 1e6:.1f} Mo "
+                  f"({ctx.preuve.capacite} images)")
@@ -0,0 +1,82 @@
+# detection/filtre_mouvement.py
+# -------------------------------------------------------------
+# Pré-filtre de mouvement : évite de lancer YOLO sur les images statiques
+# -------------------------------------------------------------
+
+import time
+
+import cv2
+
+
+class FiltreMouvement:
+    def __init__(self, seuil_mouvement=0.01, intervalle_keepalive=2.0, largeur_reduite=160, seuil_pixel=25):
+        """
+        Prépare le filtre (une instance par caméra).
+        :param seuil_mouvement: Part minimale de pixels modifiés (0-1) pour relancer l'IA
+        :param intervalle_keepalive: Délai maximum (secondes) sans analyse IA
+        :param largeur_reduite: Largeur de l'image réduite utilisée pour la différence
+        :param seuil_pixel: Écart de niveau de gris à partir duquel un pixel est « modifié »
+        """
+        self.seuil_mouvement = seuil_mouvement
+        self.intervalle_keepalive = intervalle_keepalive
+        self.largeur_reduite = largeur_reduite
+        self.seuil_pixel = seuil_pixel
+
+        # Image réduite de la dernière analyse IA (référence de comparaison)
+        self._reference = None
+        self._derniere_analyse = None
+
+        # Compteurs pour mesurer le CPU économisé
+        self.nb_images = 0
+        self.nb_analysees = 0
+        self.ratio_mouvement = 0.0
+
+    def _reduire(self, frame):
+        """
+        Image réduite en niveaux de gris, légèrement floutée pour ignorer le bruit capteur.
+        """
+        hauteur, largeur = frame.shape[:2]
+        hauteur_reduite = max(1, int(hauteur * self.largeur_reduite / largeur))
+        petite = cv2.resize(frame, (self.largeur_reduite, hauteur_reduite), interpolation=cv2.INTER_AREA)
+        gris = cv2.cvtColor(petite, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gris, (5, 5), 0)
+
+    def doit_analyser(self, frame, maintenant=None):
+        """
+        Retourne True si l'image doit passer par YOLO :
+        mouvement au-dessus du seuil ou keep-alive expiré.
+        """
+        if maintenant is None:
+            maintenant = time.monotonic()
+
+        self.nb_images += 1
+        reduite = self._reduire(frame)
+
+        if self._reference is None or reduite.shape != self._reference.shape:
+            analyser = True
+            self.ratio_mouvement = 1.0
+        else:
+            # On compare à la dernière image analysée : un mouvement lent finit par dépasser le seuil
+            difference = cv2.absdiff(reduite, self._reference)
+            _, masque = cv2.threshold(difference, self.seuil_pixel, 255, cv2.THRESH_BINARY)
+            self.ratio_mouvement = cv2.countNonZero(masque) / masque.size
+
+            keepalive_expire = maintenant - self._derniere_analyse >= self.intervalle_keepalive
+            analyser = self.ratio_mouvement >= self.seuil_mouvement or keepalive_expire
+
+        if analyser:
+            self._reference = reduite
+            self._derniere_analyse = maintenant
+            self.nb_analysees += 1
+
+        return analyser
+
+    @property
+    def nb_ignorees(self):
+        return self.nb_images - self.nb_analysees
+
+    def taux_ignore(self):
+        """
+        Part des images qui n'ont pas été envoyées à YOLO (0-1).
+        """
+        return self.nb_ignorees / self.nb_images if self.nb_images else 0.0
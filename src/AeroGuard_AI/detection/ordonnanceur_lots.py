@@ -0,0 +1,136 @@
+# detection/ordonnanceur_lots.py
+# -------------------------------------------------------------
+# Regroupe les images de plusieurs caméras en un seul appel YOLO
+# -------------------------------------------------------------
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class OrdonnanceurLots:
+    def __init__(self, modele, peripherique="cpu", taille_lot_max=8, attente_max_ms=10, verrou=None):
+        """
+        Prépare l'ordonnanceur d'inférence par lots.
+        :param modele: Instance YOLO partagée
+        :param taille_lot_max: Nombre maximum d'images par passage du modèle
+        :param attente_max_ms: Délai maximum d'attente pour compléter un lot (latence ajoutée)
+        :param verrou: Verrou protégeant le modèle (partagé avec DetecteurVideo)
+        """
+        self.modele = modele
+        self.peripherique = peripherique
+        self.taille_lot_max = max(1, int(taille_lot_max))
+        self.attente_max = max(0.0, attente_max_ms / 1000.0)
+        self._verrou = verrou if verrou is not None else threading.Lock()
+
+        self._file = queue.Queue()
+        self._arret = threading.Event()
+        # Test d'arrêt et dépôt en file atomiques vis-à-vis de fermer()
+        self._verrou_file = threading.Lock()
+
+        # Statistiques pour mesurer l'efficacité du regroupement
+        self.nb_lots = 0
+        self.nb_images = 0
+
+        self._thread = threading.Thread(target=self._boucle, name="ordonnanceur-lots", daemon=True)
+        self._thread.start()
+
+    def soumettre(self, frame, taille_image=640):
+        """
+        Dépose une image dans la file et retourne un Future qui recevra son résultat YOLO.
+        :param taille_image: Taille d'entrée du modèle (imgsz) propre à la caméra
+        """
+        futur = Future()
+        with self._verrou_file:
+            if self._arret.is_set():
+                futur.set_exception(RuntimeError("Ordonnanceur arrêté"))
+                return futur
+            self._file.put((frame, taille_image, futur))
+        return futur
+
+    def inferer(self, frame, taille_image=640):
+        """
+        Version bloquante : attend le résultat de l'image soumise.
+        Le résultat revient au thread de la caméra appelante (risque/logs/HUD).
+        """
+        return self.soumettre(frame, taille_image).result()
+
+    def _collecter_lot(self):
+        """
+        Attend une première image puis complète le lot jusqu'à taille_lot_max
+        ou jusqu'à l'expiration du délai attente_max.
+        """
+        try:
+            lot = [self._file.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        echeance = time.perf_counter() + self.attente_max
+        while len(lot) < self.taille_lot_max:
+            restant = echeance - time.perf_counter()
+            try:
+                if restant <= 0:
+                    # Délai écoulé : on prend seulement ce qui est déjà en file
+                    lot.append(self._file.get_nowait())
+                else:
+                    lot.append(self._file.get(timeout=restant))
+            except queue.Empty:
+                break
+        return lot
+
+    def _executer_lot(self, lot):
+        """
+        Un passage du modèle par taille d'image présente dans le lot
+        (en pratique un seul), puis redistribution des résultats.
+        """
+        groupes = {}
+        for frame, taille_image, futur in lot:
+            groupes.setdefault(taille_image, []).append((frame, futur))
+
+        for taille_image, groupe in groupes.items():
+            frames = [frame for frame, _ in groupe]
+            try:
+                with self._verrou:
+                    resultats = self.modele(frames, verbose=False, device=self.peripherique, imgsz=taille_image)
+            except Exception as e:
+                for _, futur in groupe:
+                    futur.set_exception(e)
+                continue
+
+            self.nb_lots += 1
+            self.nb_images += len(groupe)
+            for (_, futur), resultat in zip(groupe, resultats):
+                futur.set_result(resultat)
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            lot = self._collecter_lot()
+            if lot:
+                self._executer_lot(lot)
+
+        # Les images restantes ne seront pas traitées : on libère les appelants
+        while True:
+            try:
+                _, _, futur = self._file.get_nowait()
+            except queue.Empty:
+                break
+            futur.set_exception(RuntimeError("Ordonnanceur arrêté"))
+
+    def profondeur_file(self):
+        """
+        Images soumises en attente d'un lot.
+        """
+        return self._file.qsize()
+
+    def taille_lot_moyenne(self):
+        return self.nb_images / self.nb_lots if self.nb_lots else 0.0
+
+    def fermer(self):
+        """
+        Arrête le thread d'inférence.
+        Les images encore en file reçoivent une exception (aucun Future ne reste en attente).
+        """
+        with self._verrou_file:
+            self._arret.set()
+        self._thread.join()
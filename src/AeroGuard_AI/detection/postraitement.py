@@ -0,0 +1,60 @@
+# detection/postraitement.py
+# -------------------------------------------------------------
+# Conversion vectorisée des résultats YOLO (une seule fois par image)
+# -------------------------------------------------------------
+
+import numpy as np
+
+# Détections sous ce seuil de confiance ignorées
+SEUIL_CONFIANCE = 0.4
+
+
+class Detections:
+    """
+    Détections d'une image sous forme de tableaux NumPy alignés.
+    classes : (N,) entiers — index de classe du modèle
+    confiances : (N,) flottants
+    boites : (N, 4) entiers — x1, y1, x2, y2 en pixels
+    """
+
+    __slots__ = ("classes", "confiances", "boites")
+
+    def __init__(self, classes, confiances, boites):
+        self.classes = classes
+        self.confiances = confiances
+        self.boites = boites
+
+    def __len__(self):
+        return len(self.classes)
+
+    def filtrer(self, masque):
+        return Detections(self.classes[masque], self.confiances[masque], self.boites[masque])
+
+    @classmethod
+    def concatener(cls, parties):
+        return cls(np.concatenate([d.classes for d in parties]),
+                   np.concatenate([d.confiances for d in parties]),
+                   np.concatenate([d.boites for d in parties]))
+
+    @classmethod
+    def vide(cls):
+        return cls(np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32), np.empty((0, 4), dtype=np.int32))
+
+
+def extraire_detections(resultats, seuil_confiance=SEUIL_CONFIANCE):
+    """
+    Transfère le résultat YOLO en NumPy en un seul appel, puis filtre par masque booléen.
+    """
+    boites = resultats.boxes
+    if boites is None or len(boites) == 0:
+        return Detections.vide()
+
+    boites = boites.cpu().numpy()
+    confiances = boites.conf
+    masque = confiances >= seuil_confiance
+
+    return Detections(
+        boites.cls[masque].astype(np.intp),
+        confiances[masque],
+        boites.xyxy[masque].astype(np.int32),
+    )
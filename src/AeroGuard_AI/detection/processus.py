@@ -0,0 +1,453 @@
+# detection/processus.py
+# -------------------------------------------------------------
+# Supervision multi-processus : caméras réparties entre processus
+# de détection, images transmises par mémoire partagée (sans pickle),
+# incidents centralisés par le coordinateur, relance des processus tombés
+# -------------------------------------------------------------
+
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from detection.capture import LecteurFlux
+from utils.metriques import registre_metriques
+from utils.tampon_circulaire import attacher_memoire
+
+
+class JournalDistant:
+    """
+    Remplace Journalisation dans un processus de détection : les incidents partent
+    vers le coordinateur, seul à écrire dans logs/.
+    """
+
+    def __init__(self, file_resultats):
+        self.file_resultats = file_resultats
+
+    def enregistrer_incident(self, nom_zone, incident):
+        self.file_resultats.put(("incident", nom_zone, incident))
+
+    def profondeur_file(self):
+        return 0
+
+
+def _boucle_detection(index, config, file_taches, file_resultats, threads_calcul):
+    """
+    Processus de détection : son propre modèle et son propre DetecteurVideo
+    pour les caméras qui lui sont confiées.
+    """
+    # Pas de sur-souscription : chaque processus se limite à sa part des cœurs
+    cv2.setNumThreads(1)
+    try:
+        import torch
+
+        torch.set_num_threads(threads_calcul)
+    except ImportError:
+        pass
+
+    from detection.detection_video import DetecteurVideo
+    from utils.calcul_risque import CalculRisque
+    from utils.preuves import EncodeurPreuves
+
+    preuves = EncodeurPreuves(**config["preuves"]) if config.get("preuves") is not None else None
+    detecteur = DetecteurVideo(calculateur_risque=CalculRisque(), journal=JournalDistant(file_resultats),
+                               preuves=preuves, **config["detecteur"])
+    memoires = {}
+    file_resultats.put(("pret", index))
+
+    try:
+        while True:
+            tache = file_taches.get()
+            if tache is None:
+                break
+
+            if tache[0] == "cloturer":
+                detecteur.cloturer_camera(tache[1])
+                file_resultats.put(("cloture", tache[1]))
+                continue
+
+            _, camera, nom_memoire, emplacement, forme, horodatage = tache
+            memoire = memoires.get(nom_memoire)
+            if memoire is None:
+                memoire = memoires[nom_memoire] = attacher_memoire(nom_memoire)
+
+            # Vue sur l'emplacement : aucune copie de l'image
+            taille = int(np.prod(forme))
+            frame = np.ndarray(forme, dtype=np.uint8, buffer=memoire.buf, offset=emplacement * taille)
+            score, niveau, objets_dangereux = detecteur.traiter_frame(camera, frame, horodatage)
+            del frame
+
+            ctx = detecteur.contexte(camera)
+            file_resultats.put(("resultat", camera, emplacement, horodatage, score, niveau,
+                                len(objets_dangereux), dict(ctx.durees), ctx.analysee))
+    finally:
+        for memoire in memoires.values():
+            memoire.close()
+        if preuves is not None:
+            preuves.fermer()
+
+
+class _CameraPartagee:
+    """
+    Côté coordinateur : lecture d'une caméra et emplacements de mémoire partagée.
+    """
+
+    def __init__(self, nom, source, index_processus, nb_emplacements):
+        self.nom = nom
+        self.source = source
+        self.index_processus = index_processus
+        self.nb_emplacements = nb_emplacements
+
+        # Alloué à la première image (dimensions connues)
+        self.memoire = None
+        self.images = None
+
+        # Emplacements libres, et ceux en cours d'analyse (rendus si le processus tombe)
+        self.libres = queue.Queue()
+        for emplacement in range(nb_emplacements):
+            self.libres.put(emplacement)
+        self.en_cours = set()
+
+        self.cloturee = threading.Event()
+        self.stats = {"images": 0, "debut": None, "fin": None, "actif": False}
+
+    def allouer(self, frame):
+        hauteur, largeur = frame.shape[:2]
+        forme = (self.nb_emplacements, hauteur, largeur, 3)
+        self.memoire = shared_memory.SharedMemory(create=True, size=int(np.prod(forme)))
+        self.images = np.ndarray(forme, dtype=np.uint8, buffer=self.memoire.buf)
+
+    def ecrire(self, emplacement, frame):
+        """
+        Copie l'image dans l'emplacement (redimensionnée si la résolution du flux a changé).
+        """
+        destination = self.images[emplacement]
+        if frame.shape == destination.shape:
+            np.copyto(destination, frame)
+        else:
+            cv2.resize(frame, (destination.shape[1], destination.shape[0]), dst=destination)
+
+    def liberer(self):
+        if self.memoire is not None:
+            self.images = None
+            self.memoire.close()
+            self.memoire.unlink()
+            self.memoire = None
+
+
+class SuperviseurProcessus:
+    def __init__(self, config, sources, journal, nb_processus=2, emplacements_par_camera=4,
+                 mode_lecture="auto", taille_file_capture=2, threads_par_processus=None, intervalle_rapport=5.0):
+        """
+        Prépare la supervision répartie sur plusieurs processus.
+        :param config: {"detecteur": paramètres nommés de DetecteurVideo (sauf risque/journal/preuves),
+                        "preuves": paramètres d'EncodeurPreuves ou None} — doit être picklable
+        :param sources: Liste de tuples (nom_zone, source)
+        :param journal: Journalisation du coordinateur (seul processus qui écrit les incidents)
+        :param nb_processus: Processus de détection ; les caméras sont réparties à tour de rôle
+        :param emplacements_par_camera: Images d'une caméra en mémoire partagée (en lecture ou en analyse)
+        :param threads_par_processus: Threads de calcul du modèle par processus (défaut : cœurs / processus)
+        """
+        self.config = config
+        self.journal = journal
+        self.nb_processus = max(1, int(nb_processus))
+        self.mode_lecture = mode_lecture
+        self.taille_file_capture = taille_file_capture
+        self.threads_par_processus = threads_par_processus or max(1, multiprocessing.cpu_count() // self.nb_processus)
+        self.intervalle_rapport = intervalle_rapport
+
+        self.cameras = {
+            nom: _CameraPartagee(nom, source, i % self.nb_processus, emplacements_par_camera)
+            for i, (nom, source) in enumerate(sources)
+        }
+        self.metriques = registre_metriques()
+
+        # spawn : les processus ne doivent pas hériter des threads du coordinateur
+        self._contexte = multiprocessing.get_context("spawn")
+        # Files propres à chaque processus : un processus tué en pleine écriture
+        # ne peut bloquer que ses propres files, remplacées à la relance
+        self._processus = [None] * self.nb_processus
+        self._files_taches = [None] * self.nb_processus
+        self._files_resultats = [None] * self.nb_processus
+        self._prets = [threading.Event() for _ in range(self.nb_processus)]
+        self._verrou = threading.Lock()
+
+        self._arret = threading.Event()
+        self._fermeture = False
+        self._resultats_termines = False
+        self._threads = []
+        self._threads_resultats = []
+        self.nb_relances = 0
+
+    # --- Processus de détection ---
+
+    def _lancer_processus(self, index):
+        file_taches = self._contexte.Queue()
+        file_resultats = self._contexte.Queue()
+        self._prets[index].clear()
+        processus = self._contexte.Process(target=_boucle_detection, name=f"detection-{index}",
+                                           args=(index, self.config, file_taches, file_resultats,
+                                                 self.threads_par_processus))
+        processus.start()
+        self._files_taches[index] = file_taches
+        self._files_resultats[index] = file_resultats
+        self._processus[index] = processus
+
+        thread = threading.Thread(target=self._boucle_resultats, args=(index, file_resultats),
+                                  name=f"resultats-{index}", daemon=True)
+        self._threads_resultats.append(thread)
+        thread.start()
+
+    def _surveiller_processus(self):
+        """
+        Relance un processus de détection tombé. Ses images en cours sont perdues,
+        leurs emplacements rendus ; les caméras déjà terminées sont clôturées à nouveau.
+        """
+        for index, processus in enumerate(self._processus):
+            if processus is None or processus.is_alive() or self._fermeture:
+                continue
+
+            print(f"[ERREUR] Processus de détection {index} arrêté (code {processus.exitcode}) : relance")
+            with self._verrou:
+                self._lancer_processus(index)
+                for camera in self.cameras.values():
+                    if camera.index_processus != index:
+                        continue
+                    for emplacement in camera.en_cours:
+                        camera.libres.put(emplacement)
+                    camera.en_cours.clear()
+                    if camera.stats["fin"] is not None and not camera.cloturee.is_set():
+                        self._files_taches[index].put(("cloturer", camera.nom))
+            self.nb_relances += 1
+
+    def _envoyer(self, camera, tache):
+        with self._verrou:
+            if tache[0] == "image":
+                camera.en_cours.add(tache[3])
+            self._files_taches[camera.index_processus].put(tache)
+
+    # --- Coordinateur ---
+
+    def _boucle_camera(self, camera):
+        """
+        Thread de lecture : décode, copie l'image dans un emplacement libre et l'adresse
+        au processus de la caméra. En lecture directe, sans emplacement libre l'image est perdue.
+        """
+        metriques = self.metriques.camera(camera.nom)
+        lecteur = LecteurFlux(camera.source, self.mode_lecture, self.taille_file_capture, metriques)
+        stats = camera.stats
+
+        if not lecteur.est_ouvert():
+            print(f"[ERREUR] Impossible d'ouvrir la source : {camera.source}")
+            lecteur.fermer()
+            camera.cloturee.set()
+            return
+
+        stats["actif"] = True
+        stats["debut"] = time.perf_counter()
+        metriques.fps_source = lecteur.fps
+
+        try:
+            while not self._arret.is_set():
+                succes, frame, horodatage = lecteur.lire()
+                if not succes:
+                    print(f"[INFO] Fin du flux : {camera.nom}")
+                    break
+
+                if camera.memoire is None:
+                    camera.allouer(frame)
+
+                emplacement = None
+                if lecteur.mode == "direct":
+                    try:
+                        emplacement = camera.libres.get_nowait()
+                    except queue.Empty:
+                        metriques.incrementer("images_abandonnees")
+                        continue
+                else:
+                    # Fichier : aucune image perdue, on attend qu'un emplacement se libère
+                    while emplacement is None and not self._arret.is_set():
+                        try:
+                            emplacement = camera.libres.get(timeout=0.2)
+                        except queue.Empty:
+                            pass
+                    if emplacement is None:
+                        break
+
+                camera.ecrire(emplacement, frame)
+                self._envoyer(camera, ("image", camera.nom, camera.memoire.name, emplacement,
+                                       camera.images.shape[1:], horodatage))
+        except Exception as e:
+            print(f"[ERREUR] Caméra {camera.nom} : {e}")
+        finally:
+            lecteur.fermer()
+            stats["fin"] = time.perf_counter()
+            # L'incident éventuellement ouvert est clos par le processus de la caméra
+            self._envoyer(camera, ("cloturer", camera.nom))
+
+    def _boucle_resultats(self, index, file_resultats):
+        """
+        Thread du coordinateur (un par processus) : libère les emplacements analysés
+        et écrit les incidents. S'arrête quand sa file est remplacée (relance) ou à la fermeture.
+        """
+        while True:
+            try:
+                message = file_resultats.get(timeout=0.2)
+            except queue.Empty:
+                if self._resultats_termines or self._files_resultats[index] is not file_resultats:
+                    break
+                continue
+            genre = message[0]
+
+            if genre == "pret":
+                self._prets[index].set()
+
+            elif genre == "resultat":
+                _, nom, emplacement, horodatage, score, niveau, nb_objets, durees, analysee = message
+                camera = self.cameras[nom]
+                with self._verrou:
+                    # Message d'un processus relancé entre-temps : emplacement déjà rendu
+                    if emplacement not in camera.en_cours:
+                        continue
+                    camera.en_cours.discard(emplacement)
+                camera.libres.put(emplacement)
+                camera.stats["images"] += 1
+                self.metriques.camera(nom).observer_image(durees, analysee, time.time() - horodatage)
+
+            elif genre == "incident":
+                _, nom, incident = message
+                self.journal.enregistrer_incident(nom, incident)
+                self.metriques.camera(nom).incrementer("incidents_journalises")
+
+            elif genre == "cloture":
+                camera = self.cameras[message[1]]
+                camera.stats["actif"] = False
+                camera.cloturee.set()
+
+    def demarrer(self):
+        """
+        Lance les processus de détection, attend qu'ils soient prêts (modèle chargé), puis les caméras.
+        """
+        self._arret.clear()
+        self._fermeture = False
+        self._resultats_termines = False
+        for index in range(self.nb_processus):
+            self._lancer_processus(index)
+
+        # Chargement des modèles en parallèle
+        for pret in self._prets:
+            while not pret.wait(1.0):
+                if not all(p.is_alive() for p in self._processus):
+                    self._fermeture = True
+                    for processus in self._processus:
+                        processus.terminate()
+                    self._resultats_termines = True
+                    raise RuntimeError("Un processus de détection s'est arrêté au démarrage")
+        print(f"[INFO] {self.nb_processus} processus de détection prêts "
+              f"({self.threads_par_processus} thread(s) de calcul chacun)")
+
+        for camera in self.cameras.values():
+            thread = threading.Thread(target=self._boucle_camera, args=(camera,),
+                                      name=f"camera-{camera.nom}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def arreter(self, delai_cloture=10.0):
+        """
+        Arrête la lecture, attend la clôture des incidents ouverts puis les processus.
+        """
+        self._arret.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        echeance = time.perf_counter() + delai_cloture
+        for camera in self.cameras.values():
+            camera.cloturee.wait(max(0.0, echeance - time.perf_counter()))
+
+        self._fermeture = True
+        for file_taches in self._files_taches:
+            if file_taches is not None:
+                file_taches.put(None)
+        for processus in self._processus:
+            if processus is not None:
+                processus.join(timeout=delai_cloture)
+                if processus.is_alive():
+                    processus.terminate()
+
+        # Les processus sont arrêtés : les threads vident leurs files puis s'arrêtent
+        self._resultats_termines = True
+        for thread in self._threads_resultats:
+            thread.join()
+        self._threads_resultats = []
+
+        for camera in self.cameras.values():
+            camera.liberer()
+
+    def debit_agrege(self):
+        """
+        Retourne (images_totales, images/seconde agrégées) depuis le démarrage.
+        """
+        debuts = [c.stats["debut"] for c in self.cameras.values() if c.stats["debut"] is not None]
+        if not debuts:
+            return 0, 0.0
+        maintenant = time.perf_counter()
+        fins = [c.stats["fin"] if c.stats["fin"] is not None else maintenant for c in self.cameras.values()
+                if c.stats["debut"] is not None]
+        total = sum(c.stats["images"] for c in self.cameras.values())
+        duree = max(fins) - min(debuts)
+        return total, total / duree if duree > 0 else 0.0
+
+    def afficher_rapport(self):
+        maintenant = time.perf_counter()
+        print(f"\n[RAPPORT] Débit de la supervision ({self.nb_processus} processus)")
+        for camera in self.cameras.values():
+            stats = camera.stats
+            if stats["debut"] is None:
+                print(f"  - {camera.nom:<30} : non démarrée")
+                continue
+            duree = (stats["fin"] if stats["fin"] is not None else maintenant) - stats["debut"]
+            fps = stats["images"] / duree if duree > 0 else 0.0
+            metriques = self.metriques.camera(camera.nom)
+            ligne = (f"  - {camera.nom:<30} : {stats['images']:>7} images | {fps:6.1f} img/s | "
+                     f"processus {camera.index_processus} | "
+                     f"âge p95 {metriques.age_capture.quantile(0.95) * 1000:.0f} ms")
+            if metriques.compteurs["images_abandonnees"]:
+                ligne += f" | perdues {metriques.compteurs['images_abandonnees']}"
+            print(ligne)
+
+        total, fps_total = self.debit_agrege()
+        print(f"  = AGRÉGÉ ({len(self.cameras)} caméras) : {total} images | {fps_total:.1f} img/s")
+        if self.nb_relances:
+            print(f"  = RELANCES de processus : {self.nb_relances}")
+
+    def executer(self, duree_max=None):
+        """
+        Démarre la supervision et bloque jusqu'à la fin des flux, duree_max ou un Ctrl+C.
+        """
+        self.demarrer()
+        debut = time.perf_counter()
+        prochain_rapport = debut + self.intervalle_rapport
+
+        try:
+            while not all(camera.cloturee.is_set() for camera in self.cameras.values()):
+                time.sleep(0.2)
+                self._surveiller_processus()
+                maintenant = time.perf_counter()
+
+                if duree_max is not None and maintenant - debut >= duree_max:
+                    break
+                if maintenant >= prochain_rapport:
+                    self.afficher_rapport()
+                    prochain_rapport = maintenant + self.intervalle_rapport
+        except KeyboardInterrupt:
+            print("\n[INFO] Arrêt demandé par l'opérateur.")
+        finally:
+            self.arreter()
+
+        self.afficher_rapport()
+        return self.debit_agrege()
@@ -0,0 +1,383 @@
+# detection/reanalyse.py
+# -------------------------------------------------------------
+# Ré-analyse d'archives vidéo pour les enquêtes : sans affichage,
+# plus vite que le temps réel, segments répartis entre processus,
+# plage horaire, une image sur k, horodatage = temps de la vidéo
+# -------------------------------------------------------------
+
+import heapq
+import multiprocessing
+import os
+import queue
+import re
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+from tqdm import tqdm
+
+from detection.processus import JournalDistant
+
+EXTENSIONS_VIDEO = (".mp4", ".avi", ".mkv", ".mov", ".ts")
+
+# Début d'enregistrement dans le nom du fichier : 2025-12-10_08-00-00, 20251210_080000, 2025-12-10T08:00:00
+_MOTIF_DATE = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})[_T -]?(\d{2})[-:h]?(\d{2})[-:m]?(\d{2})")
+
+
+class Enregistrement:
+    def __init__(self, chemin, zone, debut, duree, fps):
+        """
+        :param debut: Instant (timestamp) de la première image
+        :param duree: Durée de la vidéo en secondes
+        """
+        self.chemin = chemin
+        self.zone = zone
+        self.debut = debut
+        self.duree = duree
+        self.fps = fps
+
+    @property
+    def fin(self):
+        return self.debut + self.duree
+
+
+def decrire_enregistrement(chemin):
+    """
+    Zone, début et durée d'un enregistrement, ou None si la vidéo est illisible.
+    La zone et l'heure de début viennent du nom (CAM_Nord_2025-12-10_08-00-00.mp4) ;
+    sans date dans le nom, la date de modification du fichier marque la fin de l'enregistrement.
+    """
+    flux = cv2.VideoCapture(chemin)
+    try:
+        if not flux.isOpened():
+            return None
+        fps = flux.get(cv2.CAP_PROP_FPS) or 0.0
+        nb_images = flux.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+    finally:
+        flux.release()
+    if fps <= 0 or nb_images <= 0:
+        return None
+    duree = nb_images / fps
+
+    nom = os.path.splitext(os.path.basename(chemin))[0]
+    correspondance = _MOTIF_DATE.search(nom)
+    if correspondance is not None:
+        try:
+            debut = datetime(*map(int, correspondance.groups())).timestamp()
+        except ValueError:
+            correspondance = None
+    if correspondance is not None:
+        # Fichier nommé par la date seule : la zone est le dossier (videos/Piste_Nord/2025-12-10_08-00-00.mp4)
+        zone = (nom[:correspondance.start()].rstrip("_- ")
+                or os.path.basename(os.path.dirname(os.path.abspath(chemin))))
+    else:
+        zone = nom
+        debut = os.path.getmtime(chemin) - duree
+
+    return Enregistrement(chemin, zone, debut, duree, fps)
+
+
+def inventorier(sources, depuis=None, jusqua=None, zones=None):
+    """
+    Enregistrements des fichiers et dossiers (parcourus récursivement) qui recouvrent la période.
+    :param depuis: Timestamp de début de la période, ou None
+    :param jusqua: Timestamp de fin de la période, ou None
+    :param zones: Noms de zones à garder, ou None pour toutes
+    """
+    chemins = []
+    for source in sources:
+        if os.path.isdir(source):
+            for dossier, _, fichiers in os.walk(source):
+                chemins += [os.path.join(dossier, f) for f in fichiers if f.lower().endswith(EXTENSIONS_VIDEO)]
+        elif os.path.isfile(source):
+            chemins.append(source)
+        else:
+            print(f"[ERREUR] Source introuvable : {source}")
+
+    enregistrements = []
+    for chemin in sorted(chemins):
+        enregistrement = decrire_enregistrement(chemin)
+        if enregistrement is None:
+            print(f"[ERREUR] Vidéo illisible ou de durée inconnue : {chemin}")
+            continue
+        if zones and enregistrement.zone not in zones:
+            continue
+        if depuis is not None and enregistrement.fin <= depuis:
+            continue
+        if jusqua is not None and enregistrement.debut >= jusqua:
+            continue
+        enregistrements.append(enregistrement)
+    return enregistrements
+
+
+def planifier(enregistrements, depuis=None, jusqua=None, duree_segment=600.0):
+    """
+    Découpe la période demandée de chaque enregistrement en segments indépendants.
+    Un incident à cheval sur deux segments est journalisé en deux lignes : des segments
+    longs (ou duree_segment=0, un segment par fichier) limitent ces coupures.
+    Retourne une liste de tuples (identifiant, chemin, zone, début de l'enregistrement,
+    début et fin du segment en secondes depuis le début de la vidéo).
+    """
+    segments = []
+    for enregistrement in enregistrements:
+        debut = max(0.0, depuis - enregistrement.debut) if depuis is not None else 0.0
+        fin = min(enregistrement.duree, jusqua - enregistrement.debut) if jusqua is not None \
+            else enregistrement.duree
+        pas = duree_segment if duree_segment and duree_segment > 0 else fin - debut
+        while debut < fin:
+            suivant = min(fin, debut + pas)
+            segments.append((len(segments), enregistrement.chemin, enregistrement.zone,
+                             enregistrement.debut, debut, suivant))
+            debut = suivant
+    return segments
+
+
+# --- Processus de ré-analyse ---
+
+# État d'un processus du pool (rempli par _initialiser_travailleur)
+_travailleur = {}
+
+
+def _initialiser_travailleur(config, file_messages, pas, threads_calcul):
+    cv2.setNumThreads(1)
+    try:
+        import torch
+
+        torch.set_num_threads(threads_calcul)
+    except ImportError:
+        pass
+
+    _travailleur["file"] = file_messages
+    _travailleur["pas"] = max(1, int(pas))
+    try:
+        from detection.detection_video import DetecteurVideo
+        from utils.calcul_risque import CalculRisque
+
+        _travailleur["detecteur"] = DetecteurVideo(calculateur_risque=CalculRisque(),
+                                                   journal=JournalDistant(file_messages), **config)
+    except Exception as e:
+        # Une exception ici ferait relancer le processus en boucle par le pool : on la signale à la première tâche
+        _travailleur["erreur"] = e
+
+
+def _analyser_segment(segment):
+    """
+    Analyse un segment sans affichage. Les images sautées (une sur pas) sont lues
+    avec grab() : ni décodage complet ni conversion.
+    Retourne (identifiant, images analysées).
+    """
+    identifiant, chemin, zone, origine, debut, fin = segment
+    file_messages = _travailleur["file"]
+    if "erreur" in _travailleur:
+        file_messages.put(("fin", identifiant, 0))
+        raise RuntimeError(f"Détecteur indisponible : {_travailleur['erreur']}")
+
+    detecteur = _travailleur["detecteur"]
+    pas = _travailleur["pas"]
+    nb_images = 0
+    position = debut
+    transmis = debut
+    prochain_signal = time.monotonic() + 0.5
+
+    flux = cv2.VideoCapture(chemin)
+    try:
+        if not flux.isOpened():
+            print(f"[ERREUR] Impossible d'ouvrir la vidéo : {chemin}")
+            return identifiant, 0
+        if debut > 0:
+            flux.set(cv2.CAP_PROP_POS_MSEC, debut * 1000.0)
+
+        index = 0
+        while True:
+            if index % pas:
+                if not flux.grab():
+                    break
+                index += 1
+                continue
+
+            succes, frame = flux.read()
+            if not succes:
+                break
+            index += 1
+            position = flux.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if position < debut:
+                # Recherche arrêtée sur l'image clé précédente
+                continue
+            if position >= fin:
+                break
+
+            detecteur.traiter_frame(zone, frame, origine + position)
+            nb_images += 1
+
+            if time.monotonic() >= prochain_signal:
+                file_messages.put(("progres", identifiant, position - transmis))
+                transmis = position
+                prochain_signal = time.monotonic() + 0.5
+    finally:
+        flux.release()
+        detecteur.cloturer_camera(zone)
+        # Le segment suivant confié à ce processus peut être d'une autre période de la même zone
+        detecteur.oublier_camera(zone)
+        # Reste du segment (fin de fichier comprise) : la progression atteint toujours 100 %
+        file_messages.put(("progres", identifiant, fin - transmis))
+        file_messages.put(("fin", identifiant, nb_images))
+
+    return identifiant, nb_images
+
+
+class AnalyseDifferee:
+    def __init__(self, config, journal, nb_travailleurs=None, pas=1, threads_par_travailleur=None):
+        """
+        Prépare une ré-analyse d'archives.
+        :param config: Paramètres nommés de DetecteurVideo (sauf risque/journal/preuves) — picklables
+        :param journal: Journalisation de destination (à part de logs/ : on ne mélange pas enquête et exploitation)
+        :param nb_travailleurs: Processus d'analyse (défaut : un par paire de cœurs)
+        :param pas: Une image analysée sur pas (1 = toutes)
+        :param threads_par_travailleur: Threads de calcul du modèle par processus (défaut : cœurs / processus)
+        """
+        self.config = config
+        self.journal = journal
+        self.nb_travailleurs = max(1, int(nb_travailleurs or multiprocessing.cpu_count() // 2))
+        self.pas = max(1, int(pas))
+        self.threads_par_travailleur = threads_par_travailleur or max(
+            1, multiprocessing.cpu_count() // self.nb_travailleurs)
+
+    def executer(self, segments):
+        """
+        Analyse les segments et écrit leurs incidents dans le journal.
+        Retourne un bilan {segments, images, incidents, secondes_video, duree, acceleration}.
+        """
+        total_video = sum(fin - debut for *_, debut, fin in segments)
+        bilan = {"segments": len(segments), "images": 0, "incidents": 0,
+                 "secondes_video": total_video, "duree": 0.0, "acceleration": 0.0}
+        if not segments:
+            return bilan
+
+        nb_travailleurs = min(self.nb_travailleurs, len(segments))
+        print(f"[INFO] {len(segments)} segment(s), {total_video / 3600:.2f} h de vidéo, "
+              f"{nb_travailleurs} processus, une image sur {self.pas}")
+
+        # spawn : comme la supervision multi-processus, aucun thread hérité
+        contexte = multiprocessing.get_context("spawn")
+        file_messages = contexte.Queue()
+        debut = time.perf_counter()
+        termines = 0
+
+        with contexte.Pool(nb_travailleurs, initializer=_initialiser_travailleur,
+                           initargs=(self.config, file_messages, self.pas, self.threads_par_travailleur)) as pool:
+            resultats = pool.map_async(_analyser_segment, segments, chunksize=1)
+            with tqdm(total=total_video, unit="s vidéo", desc="Ré-analyse", dynamic_ncols=True,
+                      bar_format="{l_bar}{bar}| {n:.0f}/{total:.0f} s [{elapsed}<{remaining}, {rate_fmt}{postfix}]") \
+                    as barre:
+                try:
+                    # Chaque segment termine par un message 'fin', après ses incidents (même file, même ordre)
+                    while termines < len(segments):
+                        try:
+                            message = file_messages.get(timeout=0.5)
+                        except queue.Empty:
+                            if resultats.ready() and not resultats.successful():
+                                break
+                            continue
+
+                        genre = message[0]
+                        if genre == "progres":
+                            barre.update(min(message[2], barre.total - barre.n))
+                        elif genre == "incident":
+                            _, zone, incident = message
+                            self.journal.enregistrer_incident(zone, incident)
+                            bilan["incidents"] += 1
+                            barre.set_postfix(incidents=bilan["incidents"], refresh=False)
+                        elif genre == "fin":
+                            termines += 1
+                            bilan["images"] += message[2]
+                except KeyboardInterrupt:
+                    print("\n[INFO] Arrêt demandé par l'opérateur : les segments en cours sont abandonnés.")
+                    pool.terminate()
+
+            if resultats.ready() and not resultats.successful():
+                try:
+                    resultats.get()
+                except Exception as e:
+                    print(f"[ERREUR] Ré-analyse interrompue : {e}")
+
+        bilan["duree"] = time.perf_counter() - debut
+        bilan["acceleration"] = total_video / bilan["duree"] if bilan["duree"] > 0 else 0.0
+        return bilan
+
+
+def _plages_croissantes(chemin):
+    """
+    Parcourt le fichier ligne à ligne et retourne les plages d'octets (debut, fin)
+    dont les lignes sont déjà dans l'ordre chronologique.
+    """
+    plages = []
+    debut = position = 0
+    precedente = None
+    with open(chemin, "rb") as f:
+        for ligne in f:
+            cle = ligne[:10]
+            if precedente is not None and cle < precedente:
+                plages.append((debut, position))
+                debut = position
+            precedente = cle
+            position += len(ligne)
+    plages.append((debut, position))
+    return plages
+
+
+def _lire_plage(chemin, debut, fin):
+    """
+    Lignes d'une plage d'octets, lues à la demande.
+    """
+    with open(chemin, "rb") as f:
+        f.seek(debut)
+        position = debut
+        while position < fin:
+            ligne = f.readline()
+            if not ligne:
+                break
+            position += len(ligne)
+            yield ligne if ligne.endswith(b"\n") else ligne + b"\n"
+
+
+def _fusionner(sources, sortie):
+    """
+    Fusion k-voies de plages triées (heapq.merge : à clé égale, l'ordre des sources est conservé).
+    """
+    with open(sortie, "wb") as f:
+        f.writelines(heapq.merge(*(_lire_plage(*source) for source in sources), key=lambda ligne: ligne[:10]))
+
+
+def trier_journaux(dossier_racine, fusion_max=32):
+    """
+    Les segments finissent dans le désordre : remet chaque fichier de zone dans l'ordre
+    chronologique (lignes « [HH:MM:SS] ... » d'un même jour, tri stable).
+    En flux : les suites de lignes déjà ordonnées sont fusionnées par groupes de fusion_max
+    (fichiers intermédiaires si besoin), sans jamais charger un fichier de zone en mémoire.
+    """
+    for dossier, _, fichiers in os.walk(dossier_racine):
+        for nom in fichiers:
+            if not nom.endswith(".log"):
+                continue
+            chemin = os.path.join(dossier, nom)
+            sources = [(chemin, debut, fin) for debut, fin in _plages_croissantes(chemin)]
+            if len(sources) <= 1:
+                continue
+
+            intermediaires = []
+            try:
+                while len(sources) > fusion_max:
+                    groupes = [sources[i:i + fusion_max] for i in range(0, len(sources), fusion_max)]
+                    sources = []
+                    for groupe in groupes:
+                        descripteur, temporaire = tempfile.mkstemp(suffix=".tri", dir=dossier)
+                        os.close(descripteur)
+                        intermediaires.append(temporaire)
+                        _fusionner(groupe, temporaire)
+                        sources.append((temporaire, 0, os.path.getsize(temporaire)))
+                _fusionner(sources, chemin + ".tri")
+                os.replace(chemin + ".tri", chemin)
+            finally:
+                for temporaire in intermediaires:
+                    os.remove(temporaire)
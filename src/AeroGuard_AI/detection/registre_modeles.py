@@ -0,0 +1,81 @@
+# detection/registre_modeles.py
+# -------------------------------------------------------------
+# Registre des modèles YOLO : un chargement + préchauffage par fichier
+# de poids, réutilisé par toutes les sessions de surveillance du processus
+# -------------------------------------------------------------
+
+import threading
+import time
+
+import numpy as np
+from ultralytics import YOLO
+
+_modeles = {}
+_verrou_registre = threading.Lock()
+
+
+class ModeleCharge:
+    """
+    Modèle chargé + verrou d'inférence partagé par tous les détecteurs qui l'utilisent.
+    """
+
+    def __init__(self, chemin, peripherique, modele, temps_chargement):
+        self.chemin = chemin
+        self.peripherique = peripherique
+        self.modele = modele
+        self.verrou = threading.Lock()
+        self.temps_chargement = temps_chargement
+        self.temps_prechauffage = None
+
+    def prechauffer(self, taille_image=640):
+        """
+        Passage sur une image noire : déclenche les initialisations paresseuses
+        (fusion des couches, allocation des tampons) avant la première vraie image.
+        """
+        image_vide = np.zeros((taille_image, taille_image, 3), dtype=np.uint8)
+        debut = time.perf_counter()
+        with self.verrou:
+            self.modele(image_vide, verbose=False, device=self.peripherique, imgsz=taille_image)
+        self.temps_prechauffage = time.perf_counter() - debut
+        return self.temps_prechauffage
+
+
+def obtenir_modele(chemin_modele, peripherique="cpu", prechauffer=True, taille_image=640, verbeux=True):
+    """
+    Retourne le modèle du registre, en le chargeant (et préchauffant) au premier appel.
+    :param verbeux: False pour un chargement silencieux (préchargement pendant que le menu attend une saisie)
+    """
+    cle = (chemin_modele, peripherique)
+    with _verrou_registre:
+        entree = _modeles.get(cle)
+        if entree is None:
+            if verbeux:
+                print(f"[INIT] Chargement du modèle YOLO : {chemin_modele}")
+            debut = time.perf_counter()
+            # task explicite : les exports ONNX/OpenVINO ne portent pas toujours la tâche
+            modele = YOLO(chemin_modele, task="detect")
+            entree = ModeleCharge(chemin_modele, peripherique, modele, time.perf_counter() - debut)
+            _modeles[cle] = entree
+
+            if prechauffer:
+                entree.prechauffer(taille_image)
+                if verbeux:
+                    print(f"[INIT] Modèle prêt : chargement {entree.temps_chargement:.2f} s | "
+                          f"préchauffage {entree.temps_prechauffage:.2f} s")
+    return entree
+
+
+def modeles_charges():
+    """
+    Liste des modèles présents dans le registre (pour les rapports).
+    """
+    with _verrou_registre:
+        return list(_modeles.values())
+
+
+def vider_registre():
+    """
+    Libère tous les modèles (ils seront rechargés au prochain appel).
+    """
+    with _verrou_registre:
+        _modeles.clear()
@@ -0,0 +1,160 @@
+# detection/suivi.py
+# -------------------------------------------------------------
+# Suivi d'objets entre images (IoU) + agrégation en incidents
+# -------------------------------------------------------------
+
+import numpy as np
+
+ORDRE_NIVEAUX = {"FAIBLE": 0, "MOYEN": 1, "ÉLEVÉ": 2}
+
+
+def matrice_iou(boites_a, boites_b):
+    """
+    Intersection sur union de toutes les paires de boîtes (x1, y1, x2, y2).
+    Retourne une matrice (len(boites_a), len(boites_b)).
+    """
+    a = boites_a[:, None, :].astype(np.float32)
+    b = boites_b[None, :, :].astype(np.float32)
+
+    largeur = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    hauteur = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    intersection = largeur * hauteur
+
+    aire_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    aire_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = aire_a + aire_b - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+class SuiviIoU:
+    def __init__(self, seuil_iou=0.3, absences_max=15):
+        """
+        Suivi léger : une détection prolonge la piste de même classe qui la recouvre le plus.
+        :param seuil_iou: Recouvrement minimum pour associer une détection à une piste
+        :param absences_max: Nombre d'analyses sans association avant d'abandonner une piste
+        """
+        self.seuil_iou = seuil_iou
+        self.absences_max = absences_max
+
+        # Pistes actives sous forme de tableaux alignés
+        self._ids = np.empty(0, dtype=np.int64)
+        self._classes = np.empty(0, dtype=np.intp)
+        self._boites = np.empty((0, 4), dtype=np.int32)
+        self._absences = np.empty(0, dtype=np.int32)
+        self._prochain_id = 1
+
+    def mettre_a_jour(self, classes, boites):
+        """
+        Associe les détections (classes (N,), boites (N, 4)) aux pistes existantes.
+        Retourne le tableau (N,) des ids de piste.
+        """
+        nb_detections = len(classes)
+        ids = np.zeros(nb_detections, dtype=np.int64)
+        associee = np.zeros(len(self._ids), dtype=bool)
+
+        if nb_detections and len(self._ids):
+            iou = matrice_iou(boites, self._boites)
+            # Association uniquement entre objets de même classe
+            iou[classes[:, None] != self._classes[None, :]] = 0.0
+
+            # Association gloutonne par recouvrement décroissant
+            lignes, colonnes = np.nonzero(iou >= self.seuil_iou)
+            ordre = np.argsort(-iou[lignes, colonnes], kind="stable")
+            for ligne, colonne in zip(lignes[ordre], colonnes[ordre]):
+                if ids[ligne] or associee[colonne]:
+                    continue
+                ids[ligne] = self._ids[colonne]
+                associee[colonne] = True
+
+        # Nouvelles pistes pour les détections non associées
+        nouvelles = ids == 0
+        nb_nouvelles = int(nouvelles.sum())
+        ids[nouvelles] = np.arange(self._prochain_id, self._prochain_id + nb_nouvelles)
+        self._prochain_id += nb_nouvelles
+
+        # Pistes non revues : vieillissement puis abandon
+        absences = self._absences[~associee] + 1
+        conservees = absences <= self.absences_max
+        anciennes = ~associee
+
+        self._ids = np.concatenate([ids, self._ids[anciennes][conservees]])
+        self._classes = np.concatenate([classes, self._classes[anciennes][conservees]])
+        self._boites = np.concatenate([boites, self._boites[anciennes][conservees]])
+        self._absences = np.concatenate([np.zeros(nb_detections, dtype=np.int32), absences[conservees]])
+
+        return ids
+
+
+class Incident:
+    """
+    Période continue de risque sur une caméra.
+    """
+
+    def __init__(self, debut, score, niveau):
+        self.debut = debut
+        self.fin = debut
+        self.score_max = score
+        self.niveau_max = niveau
+        self.pistes = {}  # id_piste -> nom_objet
+        self.preuve = None  # nom du clip vidéo associé (incident ÉLEVÉ)
+
+    def mettre_a_jour(self, horodatage, pistes, score, niveau):
+        self.fin = horodatage
+        if score > self.score_max:
+            self.score_max = score
+        if ORDRE_NIVEAUX.get(niveau, 0) > ORDRE_NIVEAUX.get(self.niveau_max, 0):
+            self.niveau_max = niveau
+        for id_piste, nom in pistes:
+            self.pistes.setdefault(id_piste, nom)
+
+    @property
+    def objets(self):
+        """
+        Un nom d'objet par piste impliquée (ordre d'apparition).
+        """
+        return [self.pistes[id_piste] for id_piste in sorted(self.pistes)]
+
+    @property
+    def duree(self):
+        return self.fin - self.debut
+
+
+class AgregateurIncidents:
+    def __init__(self, delai_fermeture=3.0, duree_max=300.0):
+        """
+        Regroupe les images à risque consécutives en un seul incident.
+        :param delai_fermeture: Secondes sans risque avant de clore l'incident
+        :param duree_max: Durée au-delà de laquelle un incident est émis puis relancé
+        """
+        self.delai_fermeture = delai_fermeture
+        self.duree_max = duree_max
+        self.en_cours = None
+        self.nb_incidents = 0
+
+    def mettre_a_jour(self, horodatage, pistes_dangereuses, score, niveau):
+        """
+        À appeler à chaque image. Retourne l'incident clos (à journaliser) ou None.
+        """
+        a_risque = niveau in ("MOYEN", "ÉLEVÉ") and bool(pistes_dangereuses)
+        clos = None
+
+        if self.en_cours is not None:
+            silence = horodatage - self.en_cours.fin
+            trop_long = horodatage - self.en_cours.debut >= self.duree_max
+            if (not a_risque and silence >= self.delai_fermeture) or (a_risque and trop_long):
+                clos = self.cloturer()
+
+        if a_risque:
+            if self.en_cours is None:
+                self.en_cours = Incident(horodatage, score, niveau)
+                self.nb_incidents += 1
+            self.en_cours.mettre_a_jour(horodatage, pistes_dangereuses, score, niveau)
+
+        return clos
+
+    def cloturer(self):
+        """
+        Clôt l'incident en cours (fin de flux) et le retourne.
+        """
+        incident, self.en_cours = self.en_cours, None
+        return incident
@@ -0,0 +1,205 @@
+# detection/superviseur.py
+# -------------------------------------------------------------
+# Supervision simultanée de plusieurs caméras (un thread par flux)
+# -------------------------------------------------------------
+
+import threading
+import time
+
+from detection.capture import LecteurFlux
+
+
+class SuperviseurCameras:
+    def __init__(self, detecteur, sources, intervalle_rapport=5.0, taille_lot_max=1, attente_lot_ms=10,
+                 afficheur=None, mode_lecture="auto", taille_file_capture=2):
+        """
+        Prépare la supervision multi-caméras.
+        :param detecteur: Instance DetecteurVideo partagée (un seul modèle pour toutes les caméras)
+        :param sources: Liste de tuples (nom_zone, source) — chemin vidéo, URL de flux ou index USB
+        :param intervalle_rapport: Période (secondes) d'affichage du débit agrégé
+        :param taille_lot_max: > 1 pour regrouper les images des caméras en un seul appel YOLO
+        :param attente_lot_ms: Latence maximale ajoutée pour compléter un lot
+        :param afficheur: AfficheurAsynchrone pour l'aperçu, ou None (mode sans affichage)
+        :param mode_lecture: 'direct', 'fichier' ou 'auto' (fichiers image par image, flux en direct
+                             par un thread de capture qui abandonne les images en retard)
+        :param taille_file_capture: Images en attente au maximum par caméra en mode direct
+        """
+        self.detecteur = detecteur
+        self.sources = sources
+        self.intervalle_rapport = intervalle_rapport
+        self.taille_lot_max = taille_lot_max
+        self.attente_lot_ms = attente_lot_ms
+        self.afficheur = afficheur
+        self.mode_lecture = mode_lecture
+        self.taille_file_capture = taille_file_capture
+
+        self._arret = threading.Event()
+        self._threads = []
+        self.ordonnanceur = None
+
+        # Compteurs par caméra (chaque thread n'écrit que dans sa propre entrée)
+        self.statistiques = {
+            nom: {"images": 0, "debut": None, "fin": None, "actif": False}
+            for nom, _ in sources
+        }
+
+    def _boucle_camera(self, nom_zone, source):
+        """
+        Thread de décodage + analyse d'une caméra.
+        """
+        stats = self.statistiques[nom_zone]
+        ctx = self.detecteur.contexte(nom_zone)
+        flux = LecteurFlux(source, self.mode_lecture, self.taille_file_capture, ctx.metriques)
+
+        if not flux.est_ouvert():
+            print(f"[ERREUR] Impossible d'ouvrir la source : {source}")
+            flux.fermer()
+            return
+
+        stats["actif"] = True
+        stats["debut"] = time.perf_counter()
+        ctx.metriques.fps_source = flux.fps
+
+        try:
+            while not self._arret.is_set():
+                succes, frame, horodatage = flux.lire()
+                if not succes:
+                    print(f"[INFO] Fin du flux : {nom_zone}")
+                    break
+
+                score, niveau, objets_dangereux = self.detecteur.traiter_frame(nom_zone, frame, horodatage)
+                stats["images"] += 1
+
+                # Le dessin et les fenêtres restent dans le thread de l'afficheur
+                if self.afficheur is not None:
+                    self.afficheur.publier(nom_zone, frame, ctx.detections, niveau, len(objets_dangereux))
+        except Exception as e:
+            print(f"[ERREUR] Caméra {nom_zone} : {e}")
+        finally:
+            stats["fin"] = time.perf_counter()
+            stats["actif"] = False
+            flux.fermer()
+            self.detecteur.cloturer_camera(nom_zone)
+
+    def demarrer(self):
+        """
+        Lance un thread de décodage par caméra (et l'afficheur s'il est fourni).
+        """
+        self._arret.clear()
+        if self.afficheur is not None:
+            self.afficheur.demarrer()
+
+        if self.taille_lot_max > 1:
+            self.ordonnanceur = self.detecteur.activer_inference_par_lots(self.taille_lot_max,
+                                                                          self.attente_lot_ms)
+
+        for nom_zone, source in self.sources:
+            thread = threading.Thread(target=self._boucle_camera, args=(nom_zone, source),
+                                      name=f"camera-{nom_zone}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def arreter(self):
+        """
+        Demande l'arrêt de toutes les caméras et attend la fin des threads.
+        """
+        self._arret.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        # Les caméras sont arrêtées : plus aucune image en attente de lot
+        self.detecteur.desactiver_inference_par_lots()
+
+        if self.afficheur is not None:
+            self.afficheur.fermer()
+
+    def debit_agrege(self):
+        """
+        Retourne (images_totales, images/seconde agrégées) depuis le démarrage.
+        """
+        total = 0
+        debut_global = None
+        fin_global = None
+        maintenant = time.perf_counter()
+
+        for stats in self.statistiques.values():
+            if stats["debut"] is None:
+                continue
+            total += stats["images"]
+            fin = stats["fin"] if stats["fin"] is not None else maintenant
+            debut_global = stats["debut"] if debut_global is None else min(debut_global, stats["debut"])
+            fin_global = fin if fin_global is None else max(fin_global, fin)
+
+        if debut_global is None or fin_global <= debut_global:
+            return total, 0.0
+        return total, total / (fin_global - debut_global)
+
+    def afficher_rapport(self):
+        """
+        Affiche le débit par caméra et le débit agrégé.
+        """
+        maintenant = time.perf_counter()
+        print("\n[RAPPORT] Débit de la supervision")
+        for nom, stats in self.statistiques.items():
+            if stats["debut"] is None:
+                print(f"  - {nom:<30} : non démarrée")
+                continue
+            duree = (stats["fin"] if stats["fin"] is not None else maintenant) - stats["debut"]
+            fps = stats["images"] / duree if duree > 0 else 0.0
+            etat = "actif" if stats["actif"] else "terminé"
+            ligne = f"  - {nom:<30} : {stats['images']:>7} images | {fps:6.1f} img/s | {etat}"
+
+            ctx = self.detecteur.contexte(nom)
+            ligne += (f" | inférence p95 {ctx.metriques.latence_inference.quantile(0.95) * 1000:.0f} ms"
+                      f" | âge p95 {ctx.metriques.age_capture.quantile(0.95) * 1000:.0f} ms")
+            if ctx.metriques.compteurs["images_abandonnees"]:
+                ligne += f" | perdues {ctx.metriques.compteurs['images_abandonnees']}"
+            if stats["actif"] and ctx.metriques.en_retard():
+                ligne += " | EN RETARD"
+            if ctx.filtre is not None:
+                ligne += f" | ignorées {ctx.filtre.taux_ignore():.0%}"
+            if ctx.preuve is not None:
+                ligne += f" | tampon {ctx.preuve.nbytes / 1e6:.0f} Mo"
+            print(ligne)
+
+        total, fps_total = self.debit_agrege()
+        print(f"  = AGRÉGÉ ({len(self.sources)} caméras) : {total} images | {fps_total:.1f} img/s")
+
+        # On garde la référence : les statistiques restent lisibles après l'arrêt
+        ordonnanceur = self.ordonnanceur
+        if ordonnanceur is not None:
+            print(f"  = LOTS : {ordonnanceur.nb_lots} passages YOLO | "
+                  f"taille moyenne {ordonnanceur.taille_lot_moyenne():.2f} / {ordonnanceur.taille_lot_max}")
+
+    def executer(self, duree_max=None):
+        """
+        Démarre toutes les caméras et bloque jusqu'à la fin des flux,
+        l'expiration de duree_max (secondes) ou un Ctrl+C.
+        """
+        self.demarrer()
+        debut = time.perf_counter()
+        prochain_rapport = debut + self.intervalle_rapport
+
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                time.sleep(0.2)
+                maintenant = time.perf_counter()
+
+                if duree_max is not None and maintenant - debut >= duree_max:
+                    break
+
+                if self.afficheur is not None and self.afficheur.arret_demande.is_set():
+                    print("\n[INFO] Arrêt demandé depuis l'aperçu.")
+                    break
+
+                if maintenant >= prochain_rapport:
+                    self.afficher_rapport()
+                    prochain_rapport = maintenant + self.intervalle_rapport
+        except KeyboardInterrupt:
+            print("\n[INFO] Arrêt demandé par l'opérateur.")
+        finally:
+            self.arreter()
+
+        self.afficher_rapport()
+        return self.debit_agrege()
@@ -0,0 +1,139 @@
+# detection/tuilage.py
+# -------------------------------------------------------------
+# Inférence tuilée haute résolution : tuiles recouvrantes dans
+# les régions configurées + fusion inter-tuiles par NMS
+# -------------------------------------------------------------
+
+import numpy as np
+
+from detection.postraitement import Detections
+
+
+def decouper_region(x1, y1, x2, y2, taille_tuile, recouvrement=0.2):
+    """
+    Tuiles carrées (x1, y1, x2, y2) couvrant la région, avec recouvrement entre voisines.
+    La dernière tuile de chaque ligne/colonne est alignée sur le bord de la région.
+    """
+    pas = max(1, int(taille_tuile * (1.0 - recouvrement)))
+
+    def positions(debut, fin):
+        if fin - debut <= taille_tuile:
+            return [debut]
+        valeurs = list(range(debut, fin - taille_tuile, pas))
+        valeurs.append(fin - taille_tuile)
+        return valeurs
+
+    return [(x, y, min(x + taille_tuile, x2), min(y + taille_tuile, y2))
+            for y in positions(y1, y2) for x in positions(x1, x2)]
+
+
+def nms_par_classe(detections, seuil_iou=0.5, seuil_ios=0.8):
+    """
+    Suppression des doublons entre tuiles (même classe uniquement), par confiance décroissante.
+    Une boîte est supprimée si elle recouvre une boîte gardée avec IoU >= seuil_iou,
+    ou si elle est presque entièrement contenue dedans (intersection / plus petite aire >= seuil_ios) :
+    c'est le cas des objets coupés au bord d'une tuile et vus en entier par la voisine.
+    """
+    n = len(detections)
+    if n <= 1:
+        return detections
+
+    ordre = np.argsort(-detections.confiances, kind="stable")
+    boites = detections.boites[ordre].astype(np.float32)
+    classes = detections.classes[ordre]
+
+    a = boites[:, None, :]
+    b = boites[None, :, :]
+    largeur = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    hauteur = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    intersection = largeur * hauteur
+    aires = (boites[:, 2] - boites[:, 0]) * (boites[:, 3] - boites[:, 1])
+    union = aires[:, None] + aires[None, :] - intersection
+    plus_petite = np.minimum(aires[:, None], aires[None, :])
+
+    iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+    ios = np.divide(intersection, plus_petite, out=np.zeros_like(intersection), where=plus_petite > 0)
+    doublons = ((iou >= seuil_iou) | (ios >= seuil_ios)) & (classes[:, None] == classes[None, :])
+
+    gardees = np.ones(n, dtype=bool)
+    for i in range(n):
+        if gardees[i]:
+            # Les boîtes moins confiantes recouvertes par i sont écartées
+            gardees[i + 1:] &= ~doublons[i, i + 1:]
+
+    return detections.filtrer(np.sort(ordre[gardees]))
+
+
+class ConfigurationTuilage:
+    def __init__(self, regions=None, taille_tuile=640, recouvrement=0.2, vue_globale=True,
+                 seuil_iou=0.5, seuil_ios=0.8):
+        """
+        :param regions: Rectangles [x1, y1, x2, y2] normalisés (0-1) à tuiler ;
+                        None pour tuiler toute l'image
+        :param taille_tuile: Côté des tuiles en pixels de l'image source (= imgsz des tuiles)
+        :param recouvrement: Fraction de recouvrement entre tuiles voisines
+        :param vue_globale: True pour ajouter un passage sur l'image entière (grands objets proches)
+        """
+        self.regions = regions
+        self.taille_tuile = int(taille_tuile)
+        self.recouvrement = recouvrement
+        self.vue_globale = vue_globale
+        self.seuil_iou = seuil_iou
+        self.seuil_ios = seuil_ios
+
+        # Tuiles en pixels, calculées une fois par résolution
+        self._tuiles = None
+        self._resolution = None
+
+    def tuiles(self, largeur, hauteur):
+        """
+        Liste des tuiles (x1, y1, x2, y2) en pixels pour cette résolution (mise en cache).
+        """
+        if self._resolution != (largeur, hauteur):
+            regions = self.regions or [[0.0, 0.0, 1.0, 1.0]]
+            tuiles = []
+            for rx1, ry1, rx2, ry2 in regions:
+                x1, x2 = int(rx1 * largeur), int(np.ceil(rx2 * largeur))
+                y1, y2 = int(ry1 * hauteur), int(np.ceil(ry2 * hauteur))
+                # Une région plus petite qu'une tuile est élargie (dans l'image) à une tuile entière
+                x1, x2 = self._elargir(x1, x2, largeur)
+                y1, y2 = self._elargir(y1, y2, hauteur)
+                tuiles += decouper_region(x1, y1, x2, y2, self.taille_tuile, self.recouvrement)
+            # Régions qui se chevauchent : tuiles identiques comptées une fois
+            self._tuiles = list(dict.fromkeys(tuiles))
+            self._resolution = (largeur, hauteur)
+        return self._tuiles
+
+    def _elargir(self, debut, fin, limite):
+        manque = self.taille_tuile - (fin - debut)
+        if manque <= 0:
+            return debut, fin
+        # Centrée sur la région, décalée si elle dépasse de l'image
+        debut = max(0, min(debut - manque // 2, limite - self.taille_tuile))
+        return debut, min(limite, debut + self.taille_tuile)
+
+    def fusionner(self, detections_tuiles, tuiles):
+        """
+        Replace les détections de chaque tuile dans le repère de l'image puis applique la NMS.
+        :param detections_tuiles: Detections par tuile (même ordre que tuiles), éventuellement
+                                  suivies de celles de la vue globale (déjà dans le repère image)
+        """
+        parties = []
+        for index, detections in enumerate(detections_tuiles):
+            if len(detections) == 0:
+                continue
+            if index < len(tuiles):
+                x1, y1 = tuiles[index][:2]
+                detections.boites += np.array([x1, y1, x1, y1], dtype=np.int32)
+            parties.append(detections)
+
+        if not parties:
+            return Detections.vide()
+        return nms_par_classe(Detections.concatener(parties), self.seuil_iou, self.seuil_ios)
+
+
+def configurer_tuilage(config_cameras):
+    """
+    Construit {nom_camera: ConfigurationTuilage} depuis {nom_camera: dict de paramètres}.
+    """
+    return {nom: ConfigurationTuilage(**parametres) for nom, parametres in (config_cameras or {}).items()}
@@ -6,27 +6,33 @@
 import os
 import sys
 import platform
-import cv2
-from datetime import datetime
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
 from colorama import init, Fore, Back, Style
 
 # Import des modules du projet
-from detection.detection_video import DetecteurVideo
-from utils.calcul_risque import CalculRisque
-from utils.journalisation import Journalisation
+# Seuls les modules légers (menu, logs, index) sont importés ici : la pile vision
+# (OpenCV, PyTorch, ultralytics) est importée par les fonctions de surveillance,
+# ou préchargée en arrière-plan une fois le menu affiché (PRECHARGEMENT_IA)
+from detection.backends import chemin_export
+from utils.archivage import NOM_ARCHIVE, chemin_archive, lire_archive, maintenir_archives
+from utils.base_incidents import BaseIncidents
+from utils.journalisation import Journalisation, formater_ligne, nom_fichier_zone
+from utils.lecture_logs import PagesFichier, PagesListe, dernieres_lignes, resumer_fichier
+from utils.metriques import ServeurMetriques, registre_metriques
+
+# Configuration globale (partagée avec analyse_archives.py)
+from utils.configuration import (
+    DOSSIER_VIDEOS, DOSSIER_LOGS, CHEMIN_MODELE, PERIPHERIQUE_IA, BACKEND_IA, INT8_IA, TAILLE_IMAGE_IA,
+    PRECHARGEMENT_IA, FLUX_CAMERAS, MODE_LECTURE, TAILLE_FILE_CAPTURE, TAILLE_LOT_MAX, ATTENTE_LOT_MS,
+    PROCESSUS_SUPERVISION, BASE_INCIDENTS, CONFIG_ARCHIVAGE, CONFIG_JOURNAL, CONFIG_PREUVES, CONFIG_METRIQUES,
+    AFFICHAGE_ACTIF, FPS_APERCU, parametres_detecteur
+)
 
 # Initialisation des couleurs
 init(autoreset=True)
 
-# -------------------------------------------------------------
-# Configuration Globale
-# -------------------------------------------------------------
-DOSSIER_VIDEOS = "videos"
-DOSSIER_LOGS = "logs"
-CHEMIN_MODELE = "models/yolov8s.pt"
-PERIPHERIQUE_IA = "cpu"
-
-
 # -------------------------------------------------------------
 # Utilitaires d'Affichage
 # -------------------------------------------------------------
@@ -53,6 +59,42 @@ def lister_videos():
     return sorted([f for f in os.listdir(DOSSIER_VIDEOS) if f.lower().endswith(('.mp4', '.avi', '.mkv'))])
 
 
+def creer_preuves():
+    """
+    Processus d'encodage des clips de preuve (None si désactivé).
+    """
+    from utils.preuves import EncodeurPreuves
+
+    return EncodeurPreuves(DOSSIER_LOGS, **CONFIG_PREUVES) if CONFIG_PREUVES is not None else None
+
+
+def creer_detecteur(journal, preuves=None):
+    """
+    Construit un détecteur avec la configuration globale (le modèle vient du registre).
+    """
+    from detection.detection_video import DetecteurVideo
+    from utils.calcul_risque import CalculRisque
+
+    attendre_prechargement()
+    return DetecteurVideo(calculateur_risque=CalculRisque(), journal=journal, preuves=preuves,
+                          **parametres_detecteur())
+
+
+def superviser_par_processus(sources, journal):
+    """
+    Supervision répartie : chaque processus charge son propre modèle.
+    """
+    from detection.processus import SuperviseurProcessus
+
+    config = {
+        "detecteur": parametres_detecteur(),
+        "preuves": dict(CONFIG_PREUVES, dossier_racine=DOSSIER_LOGS) if CONFIG_PREUVES is not None else None,
+    }
+    superviseur = SuperviseurProcessus(config, sources, journal, PROCESSUS_SUPERVISION,
+                                       mode_lecture=MODE_LECTURE, taille_file_capture=TAILLE_FILE_CAPTURE)
+    return superviseur.executer()
+
+
 def surveiller_camera():
     videos = lister_videos()
     afficher_entete_simple("MODULE SURVEILLANCE")
@@ -80,56 +122,138 @@ def surveiller_camera():
 
         print(f"\n{Fore.CYAN}Initialisation de la zone : {nom_zone}...{Style.RESET_ALL}")
 
+        journal = None
+        preuves = None
         try:
             # Création des instances
-            risque = CalculRisque()
-            journal = Journalisation(DOSSIER_LOGS)
-            detecteur = DetecteurVideo(CHEMIN_MODELE, risque, journal, PERIPHERIQUE_IA)
+            journal = Journalisation(DOSSIER_LOGS, **CONFIG_JOURNAL)
+            preuves = creer_preuves()
+            detecteur = creer_detecteur(journal, preuves)
 
-            detecteur.analyser_video(nom_zone, chemin_video)
+            detecteur.analyser_video(nom_zone, chemin_video, afficher=AFFICHAGE_ACTIF, fps_apercu=FPS_APERCU,
+                                     mode_lecture=MODE_LECTURE, taille_file_capture=TAILLE_FILE_CAPTURE)
         except Exception as e:
             print(f"{Fore.RED}Erreur critique lors de l'exécution : {e}{Style.RESET_ALL}")
             appui_pour_continuer()
+        finally:
+            # Les incidents et clips encore en file sont écrits avant de revenir au menu
+            if journal is not None:
+                journal.fermer()
+            if preuves is not None:
+                preuves.fermer()
+
+
+def lister_sources():
+    """
+    Retourne toutes les sources à superviser : vidéos du dossier + flux configurés.
+    Chaque source est un tuple (nom_zone, source).
+    """
+    sources = []
+    for nom_fichier in lister_videos():
+        nom_zone = os.path.splitext(nom_fichier)[0]
+        sources.append((nom_zone, os.path.join(DOSSIER_VIDEOS, nom_fichier)))
+
+    for nom_zone, url in FLUX_CAMERAS.items():
+        # Un index numérique désigne une caméra USB locale
+        sources.append((nom_zone, int(url) if str(url).isdigit() else url))
+
+    return sources
+
+
+def superviser_toutes_cameras():
+    sources = lister_sources()
+    afficher_entete_simple("SUPERVISION MULTI-CAMÉRAS")
+
+    if not sources:
+        print(f"{Fore.RED}❌ Aucune source trouvée (dossier '{DOSSIER_VIDEOS}' ou FLUX_CAMERAS).{Style.RESET_ALL}")
+        appui_pour_continuer()
+        return
+
+    print(f"{len(sources)} caméra(s) seront analysées simultanément :\n")
+    for nom_zone, source in sources:
+        print(f" {Fore.MAGENTA}•{Style.RESET_ALL} {nom_zone} {Fore.LIGHTBLACK_EX}({source}){Style.RESET_ALL}")
+    if PROCESSUS_SUPERVISION > 1:
+        print(f"\n{Fore.LIGHTBLACK_EX}{PROCESSUS_SUPERVISION} processus de détection, sans aperçu — "
+              f"Ctrl+C pour arrêter.{Style.RESET_ALL}\n")
+    elif AFFICHAGE_ACTIF:
+        print(f"\n{Fore.LIGHTBLACK_EX}Aperçu à {FPS_APERCU} img/s — 'q' ou Ctrl+C pour arrêter.{Style.RESET_ALL}\n")
+    else:
+        print(f"\n{Fore.LIGHTBLACK_EX}Mode sans affichage — Ctrl+C pour arrêter la supervision.{Style.RESET_ALL}\n")
+
+    journal = None
+    preuves = None
+    try:
+        journal = Journalisation(DOSSIER_LOGS, **CONFIG_JOURNAL)
+
+        if PROCESSUS_SUPERVISION > 1:
+            total, fps = superviser_par_processus(sources, journal)
+        else:
+            from detection.affichage import AfficheurAsynchrone
+            from detection.superviseur import SuperviseurCameras
+
+            # Un seul modèle partagé par toutes les caméras
+            preuves = creer_preuves()
+            detecteur = creer_detecteur(journal, preuves)
+
+            afficheur = AfficheurAsynchrone(detecteur, FPS_APERCU) if AFFICHAGE_ACTIF else None
+
+            superviseur = SuperviseurCameras(detecteur, sources,
+                                             taille_lot_max=TAILLE_LOT_MAX, attente_lot_ms=ATTENTE_LOT_MS,
+                                             afficheur=afficheur, mode_lecture=MODE_LECTURE,
+                                             taille_file_capture=TAILLE_FILE_CAPTURE)
+            total, fps = superviseur.executer()
+        print(f"\n{Fore.GREEN}Supervision terminée : {total} images analysées ({fps:.1f} img/s agrégées).{Style.RESET_ALL}")
+    except Exception as e:
+        print(f"{Fore.RED}Erreur critique lors de l'exécution : {e}{Style.RESET_ALL}")
+    finally:
+        if journal is not None:
+            journal.fermer()
+        if preuves is not None:
+            preuves.fermer()
+
+    appui_pour_continuer()
 
 
 # -------------------------------------------------------------
 # 2. Module Analyse des Logs (Navigation Date -> Zone -> Résumé)
 # -------------------------------------------------------------
 
-def analyser_fichier_zone(chemin_fichier_log, nom_zone, date_selectionnee):
+def analyser_fichier_zone(base, nom_zone, date_selectionnee):
     """
-    Lit un fichier log spécifique et affiche un résumé statistique.
+    Affiche le résumé statistique d'une zone pour une date (lu dans l'index des incidents).
     """
+    chemin_fichier_log = os.path.join(DOSSIER_LOGS, date_selectionnee, nom_fichier_zone(nom_zone))
+    # Jour passé compacté : le fichier texte est remplacé par l'archive Parquet du jour
+    compacte = not os.path.exists(chemin_fichier_log) and os.path.exists(
+        chemin_archive(DOSSIER_LOGS, date_selectionnee))
     afficher_entete_simple(f"RAPPORT : {nom_zone.upper()}")
     print(f"Date du rapport : {Fore.CYAN}{date_selectionnee}{Style.RESET_ALL}")
-    print(f"Fichier source  : {os.path.basename(chemin_fichier_log)}\n")
-
-    nb_total = 0
-    nb_eleve = 0
-    nb_moyen = 0
-    nb_faible = 0
-    derniers_incidents = []
+    print(f"Fichier source  : {NOM_ARCHIVE if compacte else os.path.basename(chemin_fichier_log)}\n")
 
     try:
-        with open(chemin_fichier_log, "r", encoding="utf-8") as f:
-            lignes = f.readlines()
-            nb_total = len(lignes)
-
-            for ligne in lignes:
-                if "NIVEAU=ÉLEVÉ" in ligne:
-                    nb_eleve += 1
-                elif "NIVEAU=MOYEN" in ligne:
-                    nb_moyen += 1
-                else:
-                    nb_faible += 1
-
-            # On garde les 5 derniers pour l'affichage
-            derniers_incidents = lignes[-5:] if nb_total > 5 else lignes
-
+        # Comptages tenus à jour à l'écriture et 5 dernières lignes par index : rien n'est relu
+        statistiques = base.statistiques(date_selectionnee, nom_zone)
+        derniers_incidents = [formater_ligne(inc) for inc in base.derniers(date_selectionnee, nom_zone, 5)]
     except Exception as e:
-        print(f"{Fore.RED}Erreur de lecture du fichier : {e}{Style.RESET_ALL}")
-        appui_pour_continuer()
-        return
+        # Index indisponible : résumé incrémental du fichier texte et lecture de sa fin uniquement
+        print(f"{Fore.YELLOW}Index indisponible ({e}) : lecture du fichier.{Style.RESET_ALL}\n")
+        try:
+            if compacte:
+                entrees = lire_archive(chemin_archive(DOSSIER_LOGS, date_selectionnee), nom_zone)
+                statistiques = Counter(entree[4] for entree in entrees)
+                derniers_incidents = [formater_ligne(entree) for entree in entrees[-5:]]
+            else:
+                statistiques = resumer_fichier(chemin_fichier_log)["niveaux"]
+                derniers_incidents = dernieres_lignes(chemin_fichier_log, 5)
+        except (OSError, ImportError) as e:
+            print(f"{Fore.RED}Erreur de lecture du fichier : {e}{Style.RESET_ALL}")
+            appui_pour_continuer()
+            return
+
+    nb_total = sum(statistiques.values())
+    nb_eleve = statistiques.get("ÉLEVÉ", 0)
+    nb_moyen = statistiques.get("MOYEN", 0)
+    nb_faible = nb_total - nb_eleve - nb_moyen
 
     # Affichage du Résumé
     print(f"{Back.WHITE}{Fore.BLACK} STATISTIQUES DE LA ZONE {Style.RESET_ALL}\n")
@@ -143,8 +267,7 @@ def analyser_fichier_zone(chemin_fichier_log, nom_zone, date_selectionnee):
         print("Aucun incident.")
     else:
         for inc in derniers_incidents:
-            # Nettoyage visuel de la ligne
-            print(inc.strip())
+            print(inc)
 
     # Menu contextuel
     print(f"\n{Fore.YELLOW}Options :{Style.RESET_ALL}")
@@ -153,43 +276,64 @@ def analyser_fichier_zone(chemin_fichier_log, nom_zone, date_selectionnee):
 
     choix = input("\nVotre choix > ")
     if choix == "1":
+        if compacte:
+            afficher_fichier_brut(chemin_archive(DOSSIER_LOGS, date_selectionnee), nom_zone)
+        else:
+            afficher_fichier_brut(chemin_fichier_log)
+
+
+def afficher_fichier_brut(chemin_fichier_log, nom_zone=None, lignes_par_page=40):
+    """
+    Affiche un fichier de log page par page (un log de plusieurs centaines de Mo n'est jamais chargé).
+    :param nom_zone: Pour une archive Parquet, zone dont les lignes sont reconstituées
+    """
+    try:
+        if nom_zone is not None:
+            pages = PagesListe([formater_ligne(entree) for entree in lire_archive(chemin_fichier_log, nom_zone)],
+                               lignes_par_page)
+        else:
+            pages = PagesFichier(chemin_fichier_log, lignes_par_page)
+    except (OSError, ImportError) as e:
+        print(f"{Fore.RED}Erreur de lecture du fichier : {e}{Style.RESET_ALL}")
+        appui_pour_continuer()
+        return
+
+    try:
         print("\n--- DÉBUT DU FICHIER ---")
-        try:
-            with open(chemin_fichier_log, "r", encoding="utf-8") as f:
-                print(f.read())
-        except:
-            pass
+        while True:
+            lignes = pages.page_suivante()
+            for ligne in lignes:
+                print(ligne)
+            if len(lignes) < lignes_par_page or pages.avancement() >= 1.0:
+                break
+            suite = input(f"{Fore.LIGHTBLACK_EX}-- {pages.avancement():.0%} -- "
+                          f"Entrée : page suivante | q : quitter > {Style.RESET_ALL}").strip().lower()
+            if suite == "q":
+                break
         print("--- FIN DU FICHIER ---")
-        appui_pour_continuer()
+    finally:
+        pages.fermer()
+    appui_pour_continuer()
 
 
-def choisir_zone_dans_date(date_dossier):
+def choisir_zone_dans_date(base, date_dossier):
     """
-    Liste les fichiers (zones) dans un dossier de date spécifique.
+    Liste les zones ayant des incidents à une date donnée.
     """
-    chemin_dossier = os.path.join(DOSSIER_LOGS, date_dossier)
-
     while True:
         afficher_entete_simple(f"ZONES DU {date_dossier}")
 
-        if not os.path.exists(chemin_dossier):
-            print(f"{Fore.RED}Le dossier {date_dossier} n'existe plus.{Style.RESET_ALL}")
-            appui_pour_continuer()
-            return
+        zones = base.zones(date_dossier)
 
-        # On ne prend que les fichiers .log
-        fichiers = [f for f in os.listdir(chemin_dossier) if f.endswith(".log")]
-
-        if not fichiers:
+        if not zones:
             print(f"{Fore.YELLOW}Aucune zone enregistrée pour cette date.{Style.RESET_ALL}")
             appui_pour_continuer()
             return
 
         print("Sélectionnez une zone à analyser :\n")
-        for i, fichier in enumerate(fichiers, 1):
-            # On enlève l'extension .log pour l'affichage
-            nom_zone = fichier.replace(".log", "")
-            print(f" {Fore.CYAN}[{i}]{Style.RESET_ALL} {nom_zone}")
+        for i, (nom_zone, nombre) in enumerate(zones, 1):
+            print(f" {Fore.CYAN}[{i}]{Style.RESET_ALL} {nom_zone} "
+                  f"{Fore.LIGHTBLACK_EX}({nombre} incidents){Style.RESET_ALL}")
 
         print(f"\n {Fore.RED}[0]{Style.RESET_ALL} Retour aux dates")
 
@@ -200,64 +344,154 @@ def choisir_zone_dans_date(date_dossier):
 
         if choix.isdigit():
             idx = int(choix) - 1
-            if 0 <= idx < len(fichiers):
-                fichier_choisi = fichiers[idx]
-                chemin_complet = os.path.join(chemin_dossier, fichier_choisi)
+            if 0 <= idx < len(zones):
                 # Appel de la fonction de résumé
-                analyser_fichier_zone(chemin_complet, fichier_choisi.replace(".log", ""), date_dossier)
+                analyser_fichier_zone(base, zones[idx][0], date_dossier)
 
 
-def navigation_historique():
+def lire_date_recherche(texte, fin_de_periode=False):
     """
-    Premier niveau : Liste les dossiers (Dates)
+    'AAAA-MM-JJ' ou 'AAAA-MM-JJ HH:MM' -> timestamp (None si vide ou invalide).
+    Une date seule en fin de période couvre toute la journée.
     """
-    while True:
-        afficher_entete_simple("ARCHIVES ET HISTORIQUE")
+    for format_date in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            moment = datetime.strptime(texte, format_date)
+        except ValueError:
+            continue
+        if fin_de_periode and format_date == "%Y-%m-%d":
+            moment += timedelta(days=1)
+        return moment.timestamp()
+    return None
 
-        if not os.path.exists(DOSSIER_LOGS):
-            print("Aucun dossier de logs trouvé.")
-            appui_pour_continuer()
-            return
 
-        # Liste des dossiers (Dates), triée par date décroissante (le plus récent en haut)
-        dossiers_dates = [d for d in os.listdir(DOSSIER_LOGS) if os.path.isdir(os.path.join(DOSSIER_LOGS, d))]
-        dossiers_dates.sort(reverse=True)
+def rechercher_incidents(base):
+    """
+    Recherche multi-dates par zone, niveau, type d'objet et période (requêtes indexées).
+    """
+    afficher_entete_simple("RECHERCHE AVANCÉE")
+    print(f"{Fore.LIGHTBLACK_EX}Laissez un champ vide pour ne pas filtrer.{Style.RESET_ALL}\n")
+    zone = input("Zone (ex: CAM_piste_decolage) > ").strip()
+    niveau = input("Niveau (FAIBLE / MOYEN / ÉLEVÉ) > ").strip().upper()
+    objet = input("Type d'objet (ex: person, truck) > ").strip()
+    depuis = input("Depuis (AAAA-MM-JJ [HH:MM]) > ").strip()
+    jusqua = input("Jusqu'à (AAAA-MM-JJ [HH:MM]) > ").strip()
+
+    total, incidents = base.rechercher(zone or None, niveau or None, objet or None,
+                                       lire_date_recherche(depuis), lire_date_recherche(jusqua, True))
+
+    print(f"\n{Back.WHITE}{Fore.BLACK} {total} INCIDENT(S) TROUVÉ(S) {Style.RESET_ALL}\n")
+    date_courante = None
+    for inc in incidents:
+        date_incident = datetime.fromtimestamp(inc[0]).strftime("%Y-%m-%d")
+        if date_incident != date_courante:
+            print(f"{Fore.CYAN}{date_incident}{Style.RESET_ALL}")
+            date_courante = date_incident
+        print(f"  {formater_ligne(inc)}")
+    if total > len(incidents):
+        print(f"\n{Fore.LIGHTBLACK_EX}... {total - len(incidents)} incident(s) plus ancien(s) "
+              f"non affiché(s).{Style.RESET_ALL}")
+    appui_pour_continuer()
 
-        if not dossiers_dates:
-            print(f"{Fore.YELLOW}Aucune archive disponible.{Style.RESET_ALL}")
-            appui_pour_continuer()
-            return
 
-        print("Sélectionnez une date :\n")
-        for i, date_dossier in enumerate(dossiers_dates, 1):
-            print(f" {Fore.GREEN}[{i}]{Style.RESET_ALL} {date_dossier}")
+def navigation_historique():
+    """
+    Premier niveau : Liste les dates (avec leur nombre d'incidents) et la recherche avancée
+    """
+    base = BaseIncidents(BASE_INCIDENTS)
+    try:
+        while True:
+            afficher_entete_simple("ARCHIVES ET HISTORIQUE")
 
-        print(f"\n {Fore.RED}[0]{Style.RESET_ALL} Retour Menu Principal")
+            # Dates triées par ordre décroissant (le plus récent en haut)
+            dates = base.dates()
 
-        choix = input(f"\n{Fore.YELLOW}Votre choix > {Style.RESET_ALL}").strip()
+            if not dates:
+                print(f"{Fore.YELLOW}Aucune archive disponible.{Style.RESET_ALL}")
+                appui_pour_continuer()
+                return
 
-        if choix == "0":
-            return
+            print("Sélectionnez une date :\n")
+            for i, (date_dossier, nombre) in enumerate(dates, 1):
+                print(f" {Fore.GREEN}[{i}]{Style.RESET_ALL} {date_dossier} "
+                      f"{Fore.LIGHTBLACK_EX}({nombre} incidents){Style.RESET_ALL}")
 
-        if choix.isdigit():
-            idx = int(choix) - 1
-            if 0 <= idx < len(dossiers_dates):
-                date_selectionnee = dossiers_dates[idx]
-                # On descend dans le dossier choisi
-                choisir_zone_dans_date(date_selectionnee)
+            print(f"\n {Fore.YELLOW}[R]{Style.RESET_ALL} Recherche avancée (zone, niveau, objet, période)")
+            print(f" {Fore.RED}[0]{Style.RESET_ALL} Retour Menu Principal")
+
+            choix = input(f"\n{Fore.YELLOW}Votre choix > {Style.RESET_ALL}").strip()
+
+            if choix == "0":
+                return
+
+            if choix.upper() == "R":
+                rechercher_incidents(base)
+            elif choix.isdigit():
+                idx = int(choix) - 1
+                if 0 <= idx < len(dates):
+                    # On descend dans la date choisie
+                    choisir_zone_dans_date(base, dates[idx][0])
+    finally:
+        base.fermer()
 
 
 def acces_rapide_aujourdhui():
-    """Raccourci pour aller directement dans le dossier du jour."""
+    """Raccourci pour aller directement aux zones du jour."""
     date_jour = datetime.now().strftime("%Y-%m-%d")
-    chemin = os.path.join(DOSSIER_LOGS, date_jour)
 
-    if os.path.exists(chemin):
-        choisir_zone_dans_date(date_jour)
-    else:
-        print(f"\n{Fore.YELLOW}Aucune donnée enregistrée pour aujourd'hui ({date_jour}).{Style.RESET_ALL}")
-        print("Lancez une surveillance pour créer des logs.")
-        appui_pour_continuer()
+    base = BaseIncidents(BASE_INCIDENTS)
+    try:
+        if base.zones(date_jour):
+            choisir_zone_dans_date(base, date_jour)
+        else:
+            print(f"\n{Fore.YELLOW}Aucune donnée enregistrée pour aujourd'hui ({date_jour}).{Style.RESET_ALL}")
+            print("Lancez une surveillance pour créer des logs.")
+            appui_pour_continuer()
+    finally:
+        base.fermer()
+
+
+def archiver_logs():
+    """
+    Compaction des jours passés et rétention (index mis à jour).
+    """
+    if CONFIG_ARCHIVAGE is None:
+        return
+    try:
+        base = BaseIncidents(BASE_INCIDENTS)
+        try:
+            bilan = maintenir_archives(DOSSIER_LOGS, base=base, **CONFIG_ARCHIVAGE)
+        finally:
+            base.fermer()
+    except Exception as e:
+        print(f"{Fore.RED}Archivage des logs impossible : {e}{Style.RESET_ALL}")
+        return
+    if bilan["jours_compactes"]:
+        print(f"[INIT] {bilan['jours_compactes']} jour(s) compacté(s) : {bilan['incidents']} incidents, "
+              f"{bilan['octets_avant'] / 1e6:.1f} Mo -> {bilan['octets_apres'] / 1e6:.1f} Mo")
+    if bilan["jours_supprimes"]:
+        print(f"[INIT] {bilan['jours_supprimes']} jour(s) supprimé(s) (rétention "
+              f"{CONFIG_ARCHIVAGE['jours_retention']} jours)")
+    if bilan["fichiers_conserves"]:
+        print(f"{Fore.YELLOW}[INIT] {bilan['fichiers_conserves']} fichier(s) de log gardé(s) en texte "
+              f"(lignes non reconnues, voir ci-dessus){Style.RESET_ALL}")
+
+
+def indexer_archives():
+    """
+    Indexe les logs écrits avant la mise en place de la base des incidents (une seule fois par fichier).
+    """
+    try:
+        base = BaseIncidents(BASE_INCIDENTS)
+        try:
+            nombre = base.importer_logs(DOSSIER_LOGS)
+        finally:
+            base.fermer()
+    except Exception as e:
+        print(f"{Fore.RED}Indexation des archives impossible : {e}{Style.RESET_ALL}")
+        return
+    if nombre:
+        print(f"[INIT] {nombre} incident(s) d'archives indexé(s) dans {BASE_INCIDENTS}")
 
 
 # -------------------------------------------------------------
@@ -267,9 +501,19 @@ def infos_systeme():
     afficher_entete_simple("INFORMATIONS SYSTÈME")
     print(f"OS           : {platform.system()} {platform.release()}")
     print(f"Python       : {sys.version.split()[0]}")
-    print(f"OpenCV       : {cv2.__version__}")
-    print(f"Modèle IA    : {CHEMIN_MODELE}")
+    # La pile vision n'est pas importée pour autant : ses versions ne s'affichent qu'une fois chargée
+    cv2 = sys.modules.get("cv2")
+    print(f"OpenCV       : {cv2.__version__ if cv2 is not None else 'non chargé'}")
+    print(f"Modèle IA    : {CHEMIN_MODELE} | moteur {BACKEND_IA}{' int8' if INT8_IA else ''} | "
+          f"imgsz {TAILLE_IMAGE_IA} | {etat_prechargement()}")
+    # (None aussi tant que le préchargement n'a pas fini d'importer le registre)
+    modeles_charges = getattr(sys.modules.get("detection.registre_modeles"), "modeles_charges", None)
+    for entree in modeles_charges() if modeles_charges is not None else []:
+        prechauffage = f"{entree.temps_prechauffage:.2f} s" if entree.temps_prechauffage is not None else "-"
+        print(f"  ↳ en mémoire : {entree.chemin} ({entree.peripherique}) | "
+              f"chargement {entree.temps_chargement:.2f} s | préchauffage {prechauffage}")
     print(f"Dossier Logs : {os.path.abspath(DOSSIER_LOGS)}")
+    print(f"Index        : {os.path.abspath(BASE_INCIDENTS)}")
     print(f"\n{Fore.BLUE}Développé pour le projet ANAC{Style.RESET_ALL}")
     appui_pour_continuer()
 
@@ -277,22 +521,124 @@ def infos_systeme():
 # -------------------------------------------------------------
 # MENU PRINCIPAL
 # -------------------------------------------------------------
+# État du préchargement (thread lancé par demarrer_prechargement)
+_prechargement = {"thread": None, "erreur": None}
+
+
+def _precharger_ia():
+    """
+    Importe la pile vision puis charge et préchauffe le modèle, sans rien afficher :
+    la première image d'une caméra en alerte n'attend pas l'initialisation de YOLO.
+    """
+    try:
+        from detection.registre_modeles import obtenir_modele
+        import detection.detection_video  # noqa: F401
+
+        # Un export ONNX/OpenVINO à créer affiche sa progression : il reste au premier plan
+        chemin_modele = chemin_export(CHEMIN_MODELE, BACKEND_IA, INT8_IA)
+        if os.path.exists(chemin_modele):
+            obtenir_modele(chemin_modele, PERIPHERIQUE_IA, taille_image=TAILLE_IMAGE_IA, verbeux=False)
+    except Exception as e:
+        _prechargement["erreur"] = e
+
+
+def demarrer_prechargement():
+    """
+    Lance le préchargement de l'IA en arrière-plan (une seule fois).
+    """
+    if not PRECHARGEMENT_IA or _prechargement["thread"] is not None:
+        return
+    _prechargement["thread"] = threading.Thread(target=_precharger_ia, name="prechargement_ia", daemon=True)
+    _prechargement["thread"].start()
+
+
+def attendre_prechargement():
+    """
+    Avant de construire un détecteur : attend la fin du préchargement en cours.
+    En cas d'échec, le modèle est rechargé au premier plan et l'erreur y est affichée.
+    """
+    thread = _prechargement["thread"]
+    if thread is not None and thread.is_alive():
+        print(f"{Fore.LIGHTBLACK_EX}Chargement de l'IA en cours...{Style.RESET_ALL}")
+        thread.join()
+    if _prechargement["erreur"] is not None:
+        print(f"{Fore.RED}Préchargement de l'IA impossible : {_prechargement['erreur']}{Style.RESET_ALL}")
+        _prechargement["erreur"] = None
+
+
+def etat_prechargement():
+    thread = _prechargement["thread"]
+    if thread is None and not PRECHARGEMENT_IA:
+        return "IA chargée à la demande"
+    if thread is None or thread.is_alive():
+        return "IA en chargement"
+    if _prechargement["erreur"] is not None:
+        return "IA : échec du préchargement"
+    return "IA prête"
+
+
+def demarrer_metriques():
+    """
+    Lance le point d'accès des métriques (None si désactivé ou port occupé).
+    """
+    if CONFIG_METRIQUES is None:
+        return None
+    try:
+        return ServeurMetriques(registre_metriques(), **CONFIG_METRIQUES).demarrer()
+    except OSError as e:
+        print(f"{Fore.RED}Métriques indisponibles (port {CONFIG_METRIQUES['port']}) : {e}{Style.RESET_ALL}")
+        return None
+
+
+def afficher_tableau_cameras():
+    """
+    Dernier état connu de chaque caméra (compteurs cumulés depuis le lancement).
+    """
+    cameras = registre_metriques().cameras
+    if not cameras:
+        return
+
+    print(f"{Fore.LIGHTBLACK_EX}{'Caméra':<24} {'Images':>8} {'IA':>5} {'Perdues':>8} {'p95 IA':>8} "
+          f"{'img/s':>7} {'Incidents':>10}{Style.RESET_ALL}")
+    for nom, cam in cameras.items():
+        compteurs = cam.compteurs
+        part_ia = compteurs["images_inferees"] / compteurs["images_decodees"] if compteurs["images_decodees"] else 0.0
+        p95 = cam.latence_inference.quantile(0.95) * 1000
+        couleur = Fore.RED if cam.en_retard() else Fore.WHITE
+        print(f"{couleur}{nom[:24]:<24} {compteurs['images_decodees']:>8} {part_ia:>5.0%} "
+              f"{compteurs['images_abandonnees']:>8} {p95:>6.0f}ms {cam.fps_traitement:>7.1f} "
+              f"{compteurs['incidents_journalises']:>10}{Style.RESET_ALL}")
+    print()
+
+
 def main():
+    # Indexation avant compaction : l'index couvre les jours dont le texte va disparaître
+    indexer_archives()
+    archiver_logs()
+    serveur_metriques = demarrer_metriques()
+
     while True:
         afficher_entete_simple("CENTRE DE CONTRÔLE ANAC")
 
         # Dashboard minimaliste intégré au menu
         date_str = datetime.now().strftime("%d/%m/%Y")
-        print(f"{Fore.CYAN}📅 Date : {date_str}  |  🚀 Statut : PRÊT{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}📅 Date : {date_str}  |  🚀 Statut : PRÊT  |  🧠 {etat_prechargement()}{Style.RESET_ALL}")
+        if serveur_metriques is not None:
+            print(f"{Fore.LIGHTBLACK_EX}📈 Métriques : {serveur_metriques.adresse}{Style.RESET_ALL}")
         print("──────────────────────────────────────────────────────────────────\n")
+        afficher_tableau_cameras()
 
         print(f" {Fore.MAGENTA}1️⃣   Surveiller une caméra (Zone){Style.RESET_ALL}")
         print(f" {Fore.GREEN}2️⃣   Rapports d'aujourd'hui (Accès Rapide){Style.RESET_ALL}")
         print(f" {Fore.BLUE}3️⃣   Explorer les Archives (Par Date & Zone){Style.RESET_ALL}")
         print(f" {Fore.WHITE}4️⃣   Informations Système{Style.RESET_ALL}")
+        print(f" {Fore.MAGENTA}5️⃣   Supervision multi-caméras (Toutes les zones){Style.RESET_ALL}")
         print(" ─────────────────────────────────")
         print(f" {Fore.RED}0️⃣   Quitter le système{Style.RESET_ALL}")
 
+        # Le menu est à l'écran : la pile vision se charge pendant que l'opérateur choisit
+        demarrer_prechargement()
+
         choix = input(f"\n{Fore.BLUE}ANAC > {Style.RESET_ALL}").strip()
 
         if choix == "1":
@@ -303,8 +649,12 @@ def main():
             navigation_historique()
         elif choix == "4":
             infos_systeme()
+        elif choix == "5":
+            superviser_toutes_cameras()
         elif choix == "0":
             print(f"\n{Fore.RED}Fermeture du système... À bientôt.{Style.RESET_ALL}")
+            if serveur_metriques is not None:
+                serveur_metriques.fermer()
             break
 
 
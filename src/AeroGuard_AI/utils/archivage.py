@@ -0,0 +1,215 @@
+# utils/archivage.py
+# -------------------------------------------------------------
+# Cycle de vie des logs : les jours passés sont compactés en un fichier
+# Parquet par jour (colonnes typées, compression zstd), les jours trop
+# anciens sont supprimés (logs, clips de preuve et index)
+# pyarrow est optionnel : sans lui, seule la rétention s'applique
+# -------------------------------------------------------------
+
+import os
+import shutil
+from datetime import datetime, timedelta
+
+from utils.base_incidents import lire_ligne
+from utils.lecture_logs import SUFFIXE_RESUME
+
+# Fichier d'un jour compacté : logs/<date>/incidents.parquet
+NOM_ARCHIVE = "incidents.parquet"
+
+
+def _pyarrow():
+    """
+    Import à la demande : pyarrow n'est nécessaire qu'à la compaction et à la relecture des archives.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pa, pq
+
+
+def _schema(pa):
+    return pa.schema([
+        ("debut", pa.timestamp("ms")),
+        ("fin", pa.timestamp("ms")),
+        ("zone", pa.string()),
+        ("niveau", pa.string()),
+        ("score", pa.float64()),
+        ("objets", pa.list_(pa.string())),
+        ("preuve", pa.string()),
+    ])
+
+
+def chemin_archive(dossier_logs, date):
+    return os.path.join(dossier_logs, date, NOM_ARCHIVE)
+
+
+def lire_archive(chemin, zone=None):
+    """
+    Entrées d'un jour compacté au format du journal (horodatage, zone, objets, score, niveau, fin, preuve),
+    dans l'ordre chronologique. Le filtre sur la zone est appliqué à la lecture.
+    """
+    _, pq = _pyarrow()
+    table = pq.read_table(chemin, filters=[("zone", "=", zone)] if zone is not None else None)
+    colonnes = {nom: table.column(nom).to_pylist() for nom in table.column_names}
+
+    def horodatage(valeur):
+        return valeur.timestamp() if valeur is not None else None
+
+    def nombre(score):
+        # Score entier (sans facteur de zone) rendu tel qu'il a été journalisé
+        return int(score) if float(score).is_integer() else score
+
+    return [(horodatage(debut), str(zone_ligne), list(objets or []), nombre(score), str(niveau), horodatage(fin),
+             preuve)
+            for debut, fin, zone_ligne, niveau, score, objets, preuve
+            in zip(colonnes["debut"], colonnes["fin"], colonnes["zone"], colonnes["niveau"],
+                   colonnes["score"], colonnes["objets"], colonnes["preuve"])]
+
+
+def compacter_jour(dossier_jour):
+    """
+    Remplace les fichiers .log d'un jour par une archive Parquet (fusionnée avec l'archive existante).
+    Un fichier dont une ligne n'est pas reconnue reste en texte, en entier (aucune ligne perdue) ;
+    les autres ne sont supprimés qu'après relecture du nombre de lignes écrites.
+    Retourne (incidents archivés, octets avant, octets après, fichiers gardés en texte).
+    """
+    pa, pq = _pyarrow()
+    minuit = datetime.strptime(os.path.basename(os.path.normpath(dossier_jour)), "%Y-%m-%d")
+    archive = os.path.join(dossier_jour, NOM_ARCHIVE)
+
+    fichiers = sorted(f for f in os.listdir(dossier_jour) if f.endswith(".log"))
+    if not fichiers:
+        return 0, 0, 0, []
+
+    entrees = lire_archive(archive) if os.path.exists(archive) else []
+    octets_avant = os.path.getsize(archive) if os.path.exists(archive) else 0
+    compactes, conserves = [], []
+    for nom in fichiers:
+        chemin = os.path.join(dossier_jour, nom)
+        entrees_fichier = []
+        non_reconnues = 0
+        with open(chemin, "r", encoding="utf-8", errors="replace") as f:
+            for ligne in f:
+                entree = lire_ligne(ligne, minuit)
+                if entree is not None:
+                    entrees_fichier.append(entree)
+                elif ligne.strip():
+                    non_reconnues += 1
+        if non_reconnues:
+            print(f"[ATTENTION] {os.path.basename(os.path.normpath(dossier_jour))}/{nom} : "
+                  f"{non_reconnues} ligne(s) non reconnue(s), fichier gardé en texte")
+            conserves.append(nom)
+            continue
+        octets_avant += os.path.getsize(chemin)
+        compactes.append(nom)
+        entrees.extend(entrees_fichier)
+    if not compactes:
+        return 0, 0, 0, conserves
+    entrees.sort(key=lambda entree: entree[0])
+
+    def instant(valeur):
+        return datetime.fromtimestamp(valeur) if valeur is not None else None
+
+    # Heures locales naïves, comme l'affichage des logs
+    table = pa.table({
+        "debut": [instant(e[0]) for e in entrees],
+        "fin": [instant(e[5]) for e in entrees],
+        "zone": [e[1] for e in entrees],
+        "niveau": [e[4] for e in entrees],
+        "score": [float(e[3]) for e in entrees],
+        "objets": [list(e[2]) for e in entrees],
+        "preuve": [e[6] for e in entrees],
+    }, schema=_schema(pa))
+
+    temporaire = archive + ".tmp"
+    pq.write_table(table, temporaire, compression="zstd")
+    if pq.read_metadata(temporaire).num_rows != len(entrees):
+        os.remove(temporaire)
+        raise IOError(f"Archive incomplète : {temporaire}")
+    os.replace(temporaire, archive)
+
+    for nom in compactes:
+        os.remove(os.path.join(dossier_jour, nom))
+        annexe = os.path.join(dossier_jour, nom + SUFFIXE_RESUME)
+        if os.path.exists(annexe):
+            os.remove(annexe)
+
+    return len(entrees), octets_avant, os.path.getsize(archive), conserves
+
+
+def maintenir_archives(dossier_logs, jours_texte=7, jours_retention=None, base=None):
+    """
+    Compacte les jours plus anciens que jours_texte et supprime ceux plus anciens que jours_retention.
+    Le jour courant n'est jamais touché (le journal y écrit). Avec pyarrow, un jour expiré dont des logs
+    n'ont pas pu être compactés n'est pas supprimé : il est signalé et gardé.
+    :param jours_texte: Jours gardés en fichiers texte (0 = tous les jours passés sont compactés)
+    :param jours_retention: Jours conservés au total, ou None pour tout garder
+    :param base: BaseIncidents où supprimer aussi les incidents expirés, ou None
+    Retourne un bilan {jours_compactes, incidents, octets_avant, octets_apres, jours_supprimes,
+    fichiers_conserves, jours_conserves}.
+    """
+    bilan = {"jours_compactes": 0, "incidents": 0, "octets_avant": 0, "octets_apres": 0, "jours_supprimes": 0,
+             "fichiers_conserves": 0, "jours_conserves": []}
+    if not os.path.isdir(dossier_logs):
+        return bilan
+
+    aujourdhui = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    limite_texte = (aujourdhui - timedelta(days=max(1, jours_texte))).strftime("%Y-%m-%d")
+    limite_retention = (aujourdhui - timedelta(days=jours_retention)).strftime("%Y-%m-%d") \
+        if jours_retention is not None else None
+
+    try:
+        _pyarrow()
+        pyarrow_absent = False
+    except ImportError:
+        print("[ERREUR] pyarrow est requis pour compacter les logs (pip install pyarrow) : "
+              "les jours passés restent en texte.")
+        pyarrow_absent = True
+
+    for date in sorted(os.listdir(dossier_logs)):
+        dossier_jour = os.path.join(dossier_logs, date)
+        if not os.path.isdir(dossier_jour):
+            continue
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            continue
+
+        if limite_retention is not None and date < limite_retention:
+            # Logs encore en texte : compactés d'abord, le jour n'est supprimé que si tout est passé
+            # (une ligne non reconnue ou une erreur de compaction ne doit pas disparaître avec lui)
+            if not pyarrow_absent and any(nom.endswith(".log") for nom in os.listdir(dossier_jour)):
+                try:
+                    conserves = compacter_jour(dossier_jour)[3]
+                    echec = bool(conserves)
+                except Exception as e:
+                    print(f"[ERREUR] Compaction impossible pour {date} : {e}")
+                    conserves, echec = [], True
+                if echec:
+                    print(f"[ATTENTION] {date} expiré mais non compacté : jour conservé")
+                    bilan["fichiers_conserves"] += len(conserves)
+                    bilan["jours_conserves"].append(date)
+                    continue
+            # Rétention : logs, archive et clips de preuve du jour
+            shutil.rmtree(dossier_jour)
+            bilan["jours_supprimes"] += 1
+            continue
+
+        if date <= limite_texte and not pyarrow_absent:
+            try:
+                nombre, avant, apres, conserves = compacter_jour(dossier_jour)
+            except Exception as e:
+                print(f"[ERREUR] Compaction impossible pour {date} : {e}")
+                continue
+            bilan["fichiers_conserves"] += len(conserves)
+            if avant:
+                bilan["jours_compactes"] += 1
+                bilan["incidents"] += nombre
+                bilan["octets_avant"] += avant
+                bilan["octets_apres"] += apres
+
+    if base is not None and limite_retention is not None:
+        # L'index des jours expirés mais conservés reste en place, celui des jours supprimés disparaît
+        base.supprimer_avant(limite_retention, bilan["jours_conserves"])
+
+    return bilan
@@ -0,0 +1,273 @@
+# utils/base_incidents.py
+# -------------------------------------------------------------
+# Index SQLite (mode WAL) des incidents, en complément des fichiers
+# logs/<date>/<zone>.log : comptages par jour/zone, derniers incidents
+# et recherches multi-dates par index plutôt que par relecture des fichiers
+# -------------------------------------------------------------
+
+import ast
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+
+from utils.journalisation import nom_fichier_zone
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id      INTEGER PRIMARY KEY,
+    debut   REAL NOT NULL,
+    fin     REAL,
+    date    TEXT NOT NULL,
+    zone    TEXT NOT NULL,
+    niveau  TEXT NOT NULL,
+    score   REAL NOT NULL,
+    objets  TEXT NOT NULL,
+    preuve  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_date_zone ON incidents (date, zone, debut);
+CREATE INDEX IF NOT EXISTS idx_incidents_zone ON incidents (zone, debut);
+CREATE INDEX IF NOT EXISTS idx_incidents_niveau ON incidents (niveau, debut);
+CREATE INDEX IF NOT EXISTS idx_incidents_debut ON incidents (debut);
+
+-- Un type d'objet par incident (recherche « tous les incidents avec un camion »)
+CREATE TABLE IF NOT EXISTS incidents_objets (
+    objet       TEXT NOT NULL,
+    incident_id INTEGER NOT NULL,
+    PRIMARY KEY (objet, incident_id)
+) WITHOUT ROWID;
+
+-- Comptages tenus à jour à l'insertion : les listes par jour et par zone ne parcourent rien
+CREATE TABLE IF NOT EXISTS resume (
+    date    TEXT NOT NULL,
+    zone    TEXT NOT NULL,
+    niveau  TEXT NOT NULL,
+    nombre  INTEGER NOT NULL,
+    PRIMARY KEY (date, zone, niveau)
+) WITHOUT ROWID;
+"""
+
+_COLONNES = "debut, fin, zone, niveau, score, objets, preuve"
+
+# Ligne écrite par Journalisation (FIN/DUREE pour un incident, PREUVE pour un clip)
+_MOTIF_LIGNE = re.compile(
+    r"^\[(\d{2}:\d{2}:\d{2})\] ZONE=(.*?) \| NIVEAU=(\S+) \| SCORE=(-?\d+(?:\.\d+)?) \| OBJETS=(\[.*?\])"
+    r"(?: \| FIN=\d{2}:\d{2}:\d{2} \| DUREE=([\d.]+)s)?(?: \| PREUVE=(\S+))?\s*$"
+)
+
+
+class BaseIncidents:
+    def __init__(self, chemin, synchrone=False):
+        """
+        Ouvre (ou crée) la base. Plusieurs lecteurs peuvent l'ouvrir pendant que le journal écrit (WAL).
+        :param chemin: Fichier SQLite (ex: logs/incidents.db)
+        :param synchrone: True pour un fsync à chaque validation (équivalent de l'option fsync du journal)
+        """
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+
+        self.chemin = chemin
+        # Un seul écrivain (le thread du journal), protégé par le verrou de Journalisation
+        self.connexion = sqlite3.connect(chemin, timeout=10.0, check_same_thread=False)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute(f"PRAGMA synchronous={'FULL' if synchrone else 'NORMAL'}")
+        self.connexion.executescript(_SCHEMA)
+
+    # --- Écriture ---
+
+    def ajouter_lot(self, entrees):
+        """
+        Insère un lot d'entrées du journal (horodatage, zone, objets, score, niveau, fin, preuve)
+        en une seule transaction.
+        """
+        comptes = Counter()
+        with self.connexion:
+            for horodatage, zone, objets, score, niveau, fin, preuve in entrees:
+                date = time.strftime("%Y-%m-%d", time.localtime(horodatage))
+                curseur = self.connexion.execute(
+                    "INSERT INTO incidents (debut, fin, date, zone, niveau, score, objets, preuve) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (horodatage, fin, date, zone, niveau, score, json.dumps(list(objets)), preuve))
+                self.connexion.executemany(
+                    "INSERT OR IGNORE INTO incidents_objets (objet, incident_id) VALUES (?, ?)",
+                    [(objet, curseur.lastrowid) for objet in set(objets)])
+                comptes[(date, zone, niveau)] += 1
+
+            self.connexion.executemany(
+                "INSERT INTO resume (date, zone, niveau, nombre) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (date, zone, niveau) DO UPDATE SET nombre = nombre + excluded.nombre",
+                [(*cle, nombre) for cle, nombre in comptes.items()])
+
+    def supprimer_avant(self, date, conserves=()):
+        """
+        Rétention : supprime les incidents des jours antérieurs à date ('AAAA-MM-JJ').
+        :param conserves: Jours expirés gardés sur disque, dont l'index reste en place
+        """
+        filtre = "date < ?" + (f" AND date NOT IN ({', '.join('?' * len(conserves))})" if conserves else "")
+        parametres = (date, *conserves)
+        with self.connexion:
+            self.connexion.execute(
+                f"DELETE FROM incidents_objets WHERE incident_id IN (SELECT id FROM incidents WHERE {filtre})",
+                parametres)
+            self.connexion.execute(f"DELETE FROM incidents WHERE {filtre}", parametres)
+            self.connexion.execute(f"DELETE FROM resume WHERE {filtre}", parametres)
+
+    def importer_logs(self, dossier_logs):
+        """
+        Reprise de l'existant : indexe les fichiers logs/<date>/<zone>.log (et les zones
+        des jours compactés) qui n'ont encore aucun incident en base pour cette date
+        (les fichiers déjà couverts par le journal ne sont pas relus).
+        Les lignes non reconnues ne sont pas indexées : leur nombre est signalé par fichier.
+        Retourne le nombre d'incidents importés.
+        """
+        from utils.archivage import NOM_ARCHIVE, lire_archive
+
+        if not os.path.isdir(dossier_logs):
+            return 0
+        deja_indexes = set(self.connexion.execute("SELECT DISTINCT date, zone FROM resume"))
+        fichiers_indexes = {(date, nom_fichier_zone(zone)) for date, zone in deja_indexes}
+
+        total = 0
+        for date in sorted(os.listdir(dossier_logs)):
+            dossier_jour = os.path.join(dossier_logs, date)
+            if not os.path.isdir(dossier_jour):
+                continue
+            try:
+                minuit = datetime.strptime(date, "%Y-%m-%d")
+            except ValueError:
+                continue
+
+            noms = sorted(os.listdir(dossier_jour))
+            if NOM_ARCHIVE in noms:
+                # Jour compacté : seules les zones absentes de l'index sont relues
+                try:
+                    archivees = [entree for entree in lire_archive(os.path.join(dossier_jour, NOM_ARCHIVE))
+                                 if (date, entree[1]) not in deja_indexes]
+                except ImportError:
+                    print(f"[ERREUR] pyarrow est requis pour relire l'archive du {date}")
+                    archivees = []
+                if archivees:
+                    self.ajouter_lot(archivees)
+                    total += len(archivees)
+
+            for nom in noms:
+                if not nom.endswith(".log") or (date, nom) in fichiers_indexes:
+                    continue
+                entrees = []
+                non_reconnues = 0
+                with open(os.path.join(dossier_jour, nom), "r", encoding="utf-8", errors="replace") as f:
+                    for ligne in f:
+                        entree = lire_ligne(ligne, minuit)
+                        if entree is not None:
+                            entrees.append(entree)
+                        elif ligne.strip():
+                            non_reconnues += 1
+                if non_reconnues:
+                    print(f"[ATTENTION] {date}/{nom} : {non_reconnues} ligne(s) non reconnue(s), non indexée(s)")
+                if entrees:
+                    self.ajouter_lot(entrees)
+                    total += len(entrees)
+        return total
+
+    # --- Lecture ---
+
+    def dates(self):
+        """
+        [(date, nombre d'incidents)], la plus récente en premier.
+        """
+        return self.connexion.execute(
+            "SELECT date, SUM(nombre) FROM resume GROUP BY date ORDER BY date DESC").fetchall()
+
+    def zones(self, date):
+        """
+        [(zone, nombre d'incidents)] pour une date.
+        """
+        return self.connexion.execute(
+            "SELECT zone, SUM(nombre) FROM resume WHERE date = ? GROUP BY zone ORDER BY zone", (date,)).fetchall()
+
+    def statistiques(self, date, zone):
+        """
+        {niveau: nombre} pour une zone et une date.
+        """
+        return dict(self.connexion.execute(
+            "SELECT niveau, nombre FROM resume WHERE date = ? AND zone = ?", (date, zone)))
+
+    def derniers(self, date, zone, nombre=5):
+        """
+        Les derniers incidents d'une zone pour une date, dans l'ordre chronologique.
+        """
+        lignes = self.connexion.execute(
+            f"SELECT {_COLONNES} FROM incidents WHERE date = ? AND zone = ? "
+            f"ORDER BY debut DESC, id DESC LIMIT ?", (date, zone, nombre)).fetchall()
+        return [_incident(ligne) for ligne in reversed(lignes)]
+
+    def rechercher(self, zone=None, niveau=None, objet=None, depuis=None, jusqua=None, limite=50):
+        """
+        Incidents toutes dates confondues, du plus récent au plus ancien.
+        :param objet: Type d'objet impliqué (ex: 'person', 'truck')
+        :param depuis: Timestamp minimal du début de l'incident, ou None
+        :param jusqua: Timestamp maximal (exclu), ou None
+        Retourne (nombre total de résultats, au plus limite incidents).
+        """
+        conditions, parametres = [], []
+        if zone:
+            conditions.append("zone = ?")
+            parametres.append(zone)
+        if niveau:
+            conditions.append("niveau = ?")
+            parametres.append(niveau)
+        if objet:
+            conditions.append("id IN (SELECT incident_id FROM incidents_objets WHERE objet = ?)")
+            parametres.append(objet)
+        if depuis is not None:
+            conditions.append("debut >= ?")
+            parametres.append(depuis)
+        if jusqua is not None:
+            conditions.append("debut < ?")
+            parametres.append(jusqua)
+        filtre = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        total = self.connexion.execute(f"SELECT COUNT(*) FROM incidents{filtre}", parametres).fetchone()[0]
+        lignes = self.connexion.execute(
+            f"SELECT {_COLONNES} FROM incidents{filtre} ORDER BY debut DESC, id DESC LIMIT ?",
+            (*parametres, limite)).fetchall()
+        return total, [_incident(ligne) for ligne in lignes]
+
+    def fermer(self):
+        self.connexion.close()
+
+
+def _incident(ligne):
+    """
+    Ligne SQL -> entrée au format du journal (horodatage, zone, objets, score, niveau, fin, preuve).
+    """
+    debut, fin, zone, niveau, score, objets, preuve = ligne
+    # Colonne REAL : un score entier (sans facteur de zone) est rendu tel qu'il a été journalisé
+    if float(score).is_integer():
+        score = int(score)
+    return debut, zone, json.loads(objets), score, niveau, fin, preuve
+
+
+def lire_ligne(ligne, minuit):
+    """
+    Relit une ligne de log (entrée au format du journal) ou None si elle n'est pas reconnue.
+    :param minuit: datetime du début du jour du fichier
+    """
+    correspondance = _MOTIF_LIGNE.match(ligne)
+    if correspondance is None:
+        return None
+    heure, zone, niveau, score, objets, duree, preuve = correspondance.groups()
+    heures, minutes, secondes = map(int, heure.split(":"))
+    debut = minuit.replace(hour=heures, minute=minutes, second=secondes).timestamp()
+    try:
+        objets = ast.literal_eval(objets)
+    except (ValueError, SyntaxError):
+        objets = []
+    fin = debut + float(duree) if duree is not None else None
+    # Score entier sans zones, décimal quand des facteurs de zone s'appliquent (CalculRisque)
+    score = float(score) if "." in score else int(score)
+    return debut, zone, objets, score, niveau, fin, preuve
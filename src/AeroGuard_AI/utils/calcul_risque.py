@@ -3,6 +3,9 @@
 # Calcule le niveau de risque en fonction des objets détectés.
 # -------------------------------------------------------------
 
+import numpy as np
+
+
 class CalculRisque:
     def __init__(self):
         # dictionnaire du niveau de danger des objets
@@ -19,6 +22,33 @@ class CalculRisque:
             "handbag": 1
         }
 
+        # Tables indexées par id de classe du modèle (voir indexer_classes)
+        self.poids_classes = None
+        self.classes_dangereuses = None
+
+    def indexer_classes(self, noms_classes):
+        """
+        Construit les tables de poids indexées par id de classe YOLO.
+        :param noms_classes: dict {id_classe: nom} (modele.names)
+        """
+        taille = max(noms_classes) + 1 if noms_classes else 0
+        self.poids_classes = np.zeros(taille, dtype=np.int64)
+        self.classes_dangereuses = np.zeros(taille, dtype=bool)
+
+        for id_classe, nom in noms_classes.items():
+            if nom in self.risque_objet:
+                self.poids_classes[id_classe] = self.risque_objet[nom]
+                self.classes_dangereuses[id_classe] = True
+
+    @staticmethod
+    def niveau_depuis_score(score):
+        if score >= 6:
+            return "ÉLEVÉ"
+        elif score >= 3:
+            return "MOYEN"
+        else:
+            return "FAIBLE"
+
     def calculer_risque(self, objets):
         """
         Retourne score total + niveau : FAIBLE, MOYEN, ÉLEVÉ
@@ -27,12 +57,24 @@ class CalculRisque:
         for obj in objets:
             score += self.risque_objet.get(obj, 0)
 
-        if score >= 6:
-            return score, "ÉLEVÉ"
-        elif score >= 3:
-            return score, "MOYEN"
+        return score, self.niveau_depuis_score(score)
+
+    def calculer_risque_classes(self, classes, facteurs_zones=None):
+        """
+        Version vectorisée : une seule somme sur le tableau des ids de classe.
+        :param facteurs_zones: Multiplicateur par détection selon sa zone (voir utils/zones.py)
+        """
+        if facteurs_zones is None:
+            score = int(self.poids_classes[classes].sum())
         else:
-            return score, "FAIBLE"
+            score = round(float((self.poids_classes[classes] * facteurs_zones).sum()), 1)
+        return score, self.niveau_depuis_score(score)
+
+    def masque_dangereux(self, classes):
+        """
+        Masque booléen des détections dont la classe est dangereuse.
+        """
+        return self.classes_dangereuses[classes]
 
     def est_dangereux(self, objet):
         """"
@@ -0,0 +1,139 @@
+# utils/configuration.py
+# -------------------------------------------------------------
+# Configuration globale d'AeroGuard, partagée par le menu (main.py)
+# et la ré-analyse d'archives (analyse_archives.py)
+# Module léger : la pile vision n'est importée que par parametres_detecteur()
+# -------------------------------------------------------------
+
+import os
+import platform
+
+from detection.backends import preparer_modele
+
+DOSSIER_VIDEOS = "videos"
+DOSSIER_LOGS = "logs"
+CHEMIN_MODELE = "models/yolov8s.pt"
+PERIPHERIQUE_IA = "cpu"
+
+# Moteur d'inférence : 'pytorch' (.pt), 'onnx' (ONNX Runtime) ou 'openvino'
+# L'export est créé automatiquement à côté des poids au premier lancement
+BACKEND_IA = "pytorch"
+INT8_IA = False               # variante quantifiée int8 (onnx/openvino uniquement)
+TAILLE_IMAGE_IA = 640         # taille d'entrée du modèle (imgsz) par défaut
+TAILLES_IMAGE_CAMERAS = {}    # par caméra, ex: {"CAM_piste_decolage": 960}
+
+# Chargement de la pile vision et du modèle en arrière-plan dès l'affichage du menu
+# (False : chargement au lancement de la première surveillance)
+PRECHARGEMENT_IA = True
+
+# Inférence tuilée pour les caméras haute résolution (objets lointains de quelques pixels)
+# Par caméra : tuiles de taille_tuile px, limitées aux régions (rectangles normalisés 0-1)
+# Exemple : {"CAM_piste_decolage": {"regions": [[0.0, 0.3, 1.0, 0.6]], "taille_tuile": 640,
+#                                   "recouvrement": 0.2, "vue_globale": True}}
+TUILAGE_CAMERAS = {}
+
+# Flux réseau supplémentaires pour la supervision multi-caméras
+# (nom de zone -> URL RTSP/HTTP ou index de caméra USB)
+# Exemple : {"Piste_Nord": "rtsp://10.0.0.12/stream1", "Parking_Avion": "0"}
+FLUX_CAMERAS = {}
+
+# Lecture des sources : 'auto' = fichiers image par image (aucune perdue),
+# flux RTSP/USB par un thread de capture qui garde les images les plus récentes
+# ('direct' / 'fichier' pour forcer un mode)
+MODE_LECTURE = "auto"
+TAILLE_FILE_CAPTURE = 2       # images en attente au maximum en mode direct
+
+# Inférence par lots en supervision multi-caméras
+# (1 = désactivé ; la latence ajoutée est bornée par ATTENTE_LOT_MS)
+TAILLE_LOT_MAX = 8
+ATTENTE_LOT_MS = 15
+
+# Supervision répartie sur plusieurs processus (machines multi-cœurs) :
+# 1 = un seul processus (threads + lots) ; N > 1 = caméras réparties sur N processus,
+# images transmises par mémoire partagée, sans aperçu vidéo
+PROCESSUS_SUPERVISION = 1
+
+# Pré-filtre de mouvement : YOLO n'est lancé que si l'image change
+# (None pour analyser toutes les images)
+FILTRE_MOUVEMENT = {
+    "seuil_mouvement": 0.01,      # 1 % des pixels modifiés
+    "intervalle_keepalive": 2.0,  # au moins une analyse IA toutes les 2 s
+}
+
+
+# Zones par caméra (piste, taxiway, voies autorisées) pondérant le risque
+# Voir config/zones.exemple.json pour le format (coordonnées normalisées 0-1)
+FICHIER_ZONES = "config/zones.json"
+
+# Regroupement des images à risque en incidents (suivi des objets entre images)
+CONFIG_INCIDENTS = {
+    "delai_fermeture": 3.0,   # secondes sans risque avant de clore un incident
+    "duree_max": 300.0,       # un incident plus long est émis puis relancé
+}
+
+# Index SQLite des incidents (écrit avec les logs) : archives, comptages et recherche avancée
+BASE_INCIDENTS = os.path.join(DOSSIER_LOGS, "incidents.db")
+
+# Cycle de vie des logs (au lancement) : jours passés compactés en Parquet (pyarrow),
+# jours expirés supprimés avec leurs clips — None pour désactiver
+CONFIG_ARCHIVAGE = {
+    "jours_texte": 7,             # jours gardés en fichiers .log lisibles
+    "jours_retention": 365,       # None : aucune suppression
+}
+
+# Écriture des incidents (thread dédié, fichiers gardés ouverts par zone/jour)
+CONFIG_JOURNAL = {
+    "asynchrone": True,
+    "taille_file": 10000,         # lignes en attente au maximum
+    "politique_flush": "lot",     # 'ligne', 'lot' ou 'intervalle'
+    "intervalle_flush": 1.0,      # secondes (politique 'intervalle')
+    "fsync": False,               # True : écriture physique garantie à chaque flush
+    "base_incidents": BASE_INCIDENTS,
+}
+
+# Clips MP4 de preuve pour les incidents ÉLEVÉ (écrits dans logs/<date>/)
+# (None pour désactiver ; mémoire par caméra ≈ (avant + après) × fps × image réduite)
+CONFIG_PREUVES = {
+    "secondes_avant": 5.0,
+    "secondes_apres": 5.0,
+    "fps": 10,
+    "largeur_max": 960,
+}
+
+# Métriques Prometheus (texte) sur http://hote:port/metrics — None pour désactiver
+# 127.0.0.1 : accessible uniquement depuis la machine de supervision
+CONFIG_METRIQUES = {
+    "hote": "127.0.0.1",
+    "port": 9108,
+}
+
+# Mode serveur : sans écran (Linux sans DISPLAY), aucune fenêtre ni dessin
+AFFICHAGE_ACTIF = platform.system() != "Linux" or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+FPS_APERCU = 15  # cadence maximale de l'aperçu vidéo (rendu dans un thread séparé)
+
+
+def chemin_modele_actif():
+    """
+    Modèle correspondant au moteur configuré (export ONNX/OpenVINO créé si besoin).
+    """
+    return preparer_modele(CHEMIN_MODELE, BACKEND_IA, INT8_IA)
+
+
+def parametres_detecteur():
+    """
+    Paramètres de DetecteurVideo issus de la configuration globale (hors risque, journal, preuves).
+    Picklables : transmis tels quels aux processus de détection.
+    """
+    from detection.tuilage import configurer_tuilage
+    from utils.zones import charger_zones
+
+    return {
+        "chemin_modele": chemin_modele_actif(),
+        "peripherique": PERIPHERIQUE_IA,
+        "filtre_mouvement": FILTRE_MOUVEMENT,
+        "config_incidents": CONFIG_INCIDENTS,
+        "zones": charger_zones(FICHIER_ZONES),
+        "taille_image": TAILLE_IMAGE_IA,
+        "tailles_cameras": TAILLES_IMAGE_CAMERAS,
+        "tuilage": configurer_tuilage(TUILAGE_CAMERAS),
+    }
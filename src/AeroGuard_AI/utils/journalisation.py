@@ -1,67 +1,314 @@
 # utils/journalisation.py
 # -------------------------------------------------------------
 # Gestion des logs : Structure hiérarchique (Date -> Zone)
+# Écriture asynchrone par lots (thread dédié, fichiers gardés ouverts)
 # -------------------------------------------------------------
 
+import atexit
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Marqueur de fin envoyé au thread d'écriture
+_FIN = object()
 
 
 class Journalisation:
-    def __init__(self, dossier_racine="logs"):
+    POLITIQUES_FLUSH = ("ligne", "lot", "intervalle")
+
+    def __init__(self, dossier_racine="logs", asynchrone=True, taille_file=10000, taille_lot=256,
+                 politique_flush="lot", intervalle_flush=1.0, fsync=False, base_incidents=None):
         """
         Initialise le gestionnaire de logs.
         :param dossier_racine: Le dossier principal (ex: 'logs')
+        :param asynchrone: True pour écrire depuis un thread dédié (la détection ne bloque plus sur le disque)
+        :param taille_file: Nombre maximum de lignes en attente (au-delà, enregistrer() patiente)
+        :param taille_lot: Nombre maximum de lignes écrites en une fois
+        :param politique_flush: 'ligne' (après chaque ligne), 'lot' (après chaque lot)
+                                ou 'intervalle' (toutes les intervalle_flush secondes)
+        :param fsync: True pour forcer l'écriture physique (os.fsync) à chaque flush
+        :param base_incidents: Fichier SQLite où indexer aussi les incidents (ex: 'logs/incidents.db'), ou None
         """
+        if politique_flush not in self.POLITIQUES_FLUSH:
+            raise ValueError(f"Politique de flush inconnue : {politique_flush}")
+
         self.dossier_racine = dossier_racine
+        self.asynchrone = asynchrone
+        self.taille_lot = max(1, taille_lot)
+        self.politique_flush = politique_flush
+        self.intervalle_flush = intervalle_flush
+        self.fsync = fsync
 
         # On s'assure que le dossier principal existe
         if not os.path.exists(self.dossier_racine):
             os.makedirs(self.dossier_racine)
 
-    def _preparer_dossier_du_jour(self):
+        # Fichiers ouverts par zone pour le jour courant, et bornes de ce jour
+        self._fichiers = {}
+        self._noms_fichiers = {}
+        self._date_jour = None
+        self._dossier_jour = None
+        self._debut_jour = 0.0
+        self._fin_jour = 0.0
+        self._dernier_flush = time.monotonic()
+        self._verrou = threading.Lock()
+
+        self.nb_lignes = 0
+        self.nb_lots = 0
+
+        # Index des incidents, écrit par le même thread que les fichiers (un lot = une transaction)
+        self.base = None
+        if base_incidents is not None:
+            from utils.base_incidents import BaseIncidents
+
+            self.base = BaseIncidents(base_incidents, synchrone=fsync)
+
+        # Test de fermeture et dépôt atomiques vis-à-vis de fermer() : aucune entrée après _FIN
+        self._verrou_depot = threading.Lock()
+        self._ferme = False
+        self._thread = None
+        if asynchrone:
+            self._file = queue.Queue(maxsize=taille_file)
+            self._thread = threading.Thread(target=self._boucle_ecriture, name="journalisation", daemon=True)
+            self._thread.start()
+
+        # Vidage propre de la file à la sortie du programme
+        atexit.register(self.fermer)
+
+    def _preparer_dossier_du_jour(self, horodatage):
         """
-        Crée et retourne le chemin du dossier pour la date actuelle.
+        Crée le dossier du jour de l'horodatage et calcule les bornes du jour.
         Exemple : logs/2025-12-09/
+        Appelé uniquement au changement de date (rotation à minuit).
         """
-        date_jour = datetime.now().strftime("%Y-%m-%d")
-        chemin_dossier_jour = os.path.join(self.dossier_racine, date_jour)
+        moment = datetime.fromtimestamp(horodatage)
+        minuit = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        self._date_jour = minuit.strftime("%Y-%m-%d")
+        self._debut_jour = minuit.timestamp()
+        self._fin_jour = (minuit + timedelta(days=1)).timestamp()
+        self._dossier_jour = os.path.join(self.dossier_racine, self._date_jour)
+
+        # exist_ok : plusieurs journaux peuvent partager la même racine
+        os.makedirs(self._dossier_jour, exist_ok=True)
 
-        if not os.path.exists(chemin_dossier_jour):
-            os.makedirs(chemin_dossier_jour)
+        # Rotation : les fichiers de l'ancien jour sont fermés
+        for fichier in self._fichiers.values():
+            fichier.close()
+        self._fichiers = {}
 
-        return chemin_dossier_jour
+        return self._dossier_jour
+
+    def _fichier_zone(self, nom_zone):
+        """
+        Retourne le fichier (ouvert en ajout) de la zone pour le jour courant.
+        """
+        fichier = self._fichiers.get(nom_zone)
+        if fichier is None:
+            nom_fichier_propre = self._noms_fichiers.get(nom_zone)
+            if nom_fichier_propre is None:
+                nom_fichier_propre = nom_fichier_zone(nom_zone)
+                self._noms_fichiers[nom_zone] = nom_fichier_propre
+
+            chemin_fichier = os.path.join(self._dossier_jour, nom_fichier_propre)
+            fichier = open(chemin_fichier, "a", encoding="utf-8")
+            self._fichiers[nom_zone] = fichier
+        return fichier
+
+    def _ecrire_lot(self, lot):
+        """
+        Formate et écrit un lot d'entrées (horodatage, zone, objets, score, niveau, fin, preuve).
+        fin vaut None pour une alerte ponctuelle, l'horodatage de fin pour un incident ;
+        preuve est le nom du clip vidéo éventuel.
+        """
+        with self._verrou:
+            for entree in lot:
+                horodatage, nom_zone = entree[0], entree[1]
+                if not self._debut_jour <= horodatage < self._fin_jour:
+                    self._preparer_dossier_du_jour(horodatage)
+
+                fichier = self._fichier_zone(nom_zone)
+                fichier.write(formater_ligne(entree) + "\n")
+
+                if self.politique_flush == "ligne":
+                    self._flush(fichier)
+
+            self.nb_lignes += len(lot)
+            self.nb_lots += 1
+
+            if self.politique_flush == "lot":
+                self._flush_tous()
+            elif self.politique_flush == "intervalle":
+                self._flush_si_echeance()
+
+            if self.base is not None:
+                # Le fichier texte reste la référence : un échec de l'index ne perd pas l'incident
+                try:
+                    self.base.ajouter_lot(lot)
+                except Exception as e:
+                    print(f"[ERREUR LOGS] Indexation impossible : {e}")
+
+    def _flush(self, fichier):
+        fichier.flush()
+        if self.fsync:
+            os.fsync(fichier.fileno())
+
+    def _flush_tous(self):
+        for fichier in self._fichiers.values():
+            self._flush(fichier)
+        self._dernier_flush = time.monotonic()
+
+    def _flush_si_echeance(self):
+        if time.monotonic() - self._dernier_flush >= self.intervalle_flush:
+            self._flush_tous()
+
+    def _boucle_ecriture(self):
+        """
+        Thread d'écriture : regroupe les lignes en attente et les écrit en un seul passage.
+        """
+        while True:
+            try:
+                entree = self._file.get(timeout=self.intervalle_flush)
+            except queue.Empty:
+                # File vide : on en profite pour vider les tampons (politique 'intervalle')
+                if self.politique_flush == "intervalle":
+                    with self._verrou:
+                        self._flush_tous()
+                continue
+
+            fin = entree is _FIN
+            lot = [] if fin else [entree]
+
+            while not fin and len(lot) < self.taille_lot:
+                try:
+                    entree = self._file.get_nowait()
+                except queue.Empty:
+                    break
+                if entree is _FIN:
+                    fin = True
+                else:
+                    lot.append(entree)
+
+            if lot:
+                try:
+                    self._ecrire_lot(lot)
+                except Exception as e:
+                    print(f"[ERREUR LOGS] Impossible d'écrire : {e}")
+
+            if fin:
+                break
 
     def enregistrer(self, nom_zone, objets, score, niveau):
         """
         Enregistre une alerte dans le fichier spécifique de la zone (caméra).
         Le fichier est automatiquement placé dans le dossier du jour.
+        En mode asynchrone, l'appel se limite à déposer l'entrée dans la file.
         """
-        try:
-            dossier_jour = self._preparer_dossier_du_jour()
+        self._deposer((time.time(), nom_zone, objets, score, niveau, None, None))
 
-            # Nettoyage du nom de la zone pour éviter les erreurs de système de fichiers
-            # Ex: "Caméra Nord" devient "Camera_Nord.log"
-            nom_fichier_propre = nom_zone.replace(" ", "_").replace("/", "-") + ".log"
-            chemin_fichier = os.path.join(dossier_jour, nom_fichier_propre)
-
-            heure_actuelle = datetime.now().strftime("%H:%M:%S")
+    def enregistrer_incident(self, nom_zone, incident):
+        """
+        Enregistre un incident agrégé (une ligne pour toute sa durée) :
+        heure de début, score maximal, niveau maximal, un objet par piste suivie.
+        """
+        self._deposer((incident.debut, nom_zone, incident.objets, incident.score_max,
+                       incident.niveau_max, incident.fin, incident.preuve))
 
-            # Format lisible et facile à parser
-            ligne_log = (
-                f"[{heure_actuelle}] "
-                f"ZONE={nom_zone} | "
-                f"NIVEAU={niveau} | "
-                f"SCORE={score} | "
-                f"OBJETS={objets}\n"
-            )
+    def _deposer(self, entree):
+        with self._verrou_depot:
+            if not self._ferme:
+                try:
+                    if self.asynchrone:
+                        # File bornée : si le disque ne suit plus, la détection patiente plutôt que de perdre un incident
+                        self._file.put(entree)
+                    else:
+                        self._ecrire_lot([entree])
+                except Exception as e:
+                    print(f"[ERREUR LOGS] Impossible d'écrire : {e}")
+                return
 
-            with open(chemin_fichier, "a", encoding="utf-8") as f:
-                f.write(ligne_log)
+        self._ecrire_apres_fermeture(entree)
 
+    def _ecrire_apres_fermeture(self, entree):
+        """
+        Entrée arrivée après fermer() : écrite dans le fichier texte de la zone (ouvert puis refermé),
+        sans l'index des incidents, déjà fermé.
+        """
+        try:
+            with self._verrou:
+                self._preparer_dossier_du_jour(entree[0])
+                chemin_fichier = os.path.join(self._dossier_jour, nom_fichier_zone(entree[1]))
+                with open(chemin_fichier, "a", encoding="utf-8") as fichier:
+                    fichier.write(formater_ligne(entree) + "\n")
+            print(f"[ERREUR LOGS] Journal fermé : incident de {entree[1]} écrit sans indexation")
         except Exception as e:
             print(f"[ERREUR LOGS] Impossible d'écrire : {e}")
 
+    def profondeur_file(self):
+        """
+        Entrées en attente d'écriture (0 en mode synchrone).
+        """
+        return self._file.qsize() if self.asynchrone else 0
+
+    def fermer(self):
+        """
+        Vide la file d'attente, écrit les dernières lignes et ferme les fichiers.
+        """
+        with self._verrou_depot:
+            if self._ferme:
+                return
+            self._ferme = True
+        # Plus rien ne retient l'objet jusqu'à la fin du processus (un journal par session)
+        atexit.unregister(self.fermer)
+
+        if self._thread is not None:
+            self._file.put(_FIN)
+            self._thread.join()
+
+        with self._verrou:
+            for fichier in self._fichiers.values():
+                try:
+                    self._flush(fichier)
+                    fichier.close()
+                except Exception as e:
+                    print(f"[ERREUR LOGS] Fermeture impossible : {e}")
+            self._fichiers = {}
+            if self.base is not None:
+                self.base.fermer()
+
     def afficher_console(self, nom_zone, objets, score, niveau):
         """Affiche l'alerte dans la console pour le debug."""
-        print(f" >> [LOG] {nom_zone} : {objets} (Niveau {niveau})")
\ No newline at end of file
+        print(f" >> [LOG] {nom_zone} : {objets} (Niveau {niveau})")
+
+
+def nom_fichier_zone(nom_zone):
+    """
+    Nettoyage du nom de la zone pour éviter les erreurs de système de fichiers.
+    Ex: "Caméra Nord" devient "Caméra_Nord.log"
+    """
+    return nom_zone.replace(" ", "_").replace("/", "-") + ".log"
+
+
+def formater_ligne(entree):
+    """
+    Ligne de log d'une entrée (horodatage, zone, objets, score, niveau, fin, preuve),
+    sans retour à la ligne. Format lisible et facile à parser.
+    """
+    horodatage, nom_zone, objets, score, niveau, fin, preuve = entree
+    heure = time.strftime("%H:%M:%S", time.localtime(horodatage))
+
+    ligne_log = (
+        f"[{heure}] "
+        f"ZONE={nom_zone} | "
+        f"NIVEAU={niveau} | "
+        f"SCORE={score} | "
+        f"OBJETS={objets}"
+    )
+    if fin is not None:
+        heure_fin = time.strftime("%H:%M:%S", time.localtime(fin))
+        ligne_log += f" | FIN={heure_fin} | DUREE={fin - horodatage:.1f}s"
+    if preuve is not None:
+        ligne_log += f" | PREUVE={preuve}"
+    return ligne_log
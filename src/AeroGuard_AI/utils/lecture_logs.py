@@ -0,0 +1,142 @@
+# utils/lecture_logs.py
+# -------------------------------------------------------------
+# Lecture des fichiers logs/<date>/<zone>.log sans les charger :
+# résumé incrémental (fichier annexe), fin de fichier lue à rebours,
+# affichage page par page d'un fichier projeté en mémoire (mmap)
+# -------------------------------------------------------------
+
+import json
+import mmap
+import os
+import re
+
+# Fichier annexe d'un log : Piste_Nord.log -> Piste_Nord.log.resume.json
+SUFFIXE_RESUME = ".resume.json"
+
+_MOTIF_NIVEAU = re.compile(rb"NIVEAU=([^ |\r\n]+)")
+
+
+def resumer_fichier(chemin):
+    """
+    Comptes par NIVEAU d'un fichier de log. Le résumé et l'octet jusqu'où il a été calculé
+    sont gardés dans un fichier annexe : seuls les octets ajoutés depuis sont lus.
+    Retourne {"total": n, "niveaux": {niveau: n}, "octets": position}.
+    """
+    chemin_resume = chemin + SUFFIXE_RESUME
+    etat = os.stat(chemin)
+
+    resume = None
+    try:
+        with open(chemin_resume, "r", encoding="utf-8") as f:
+            resume = json.load(f)
+        # Fichier remplacé ou tronqué : le résumé ne correspond plus
+        if resume.get("inode") != etat.st_ino or resume.get("octets", 0) > etat.st_size:
+            resume = None
+    except (OSError, ValueError):
+        resume = None
+    if resume is None:
+        resume = {"inode": etat.st_ino, "octets": 0, "total": 0, "niveaux": {}}
+
+    if etat.st_size > resume["octets"]:
+        niveaux = resume["niveaux"]
+        with open(chemin, "rb") as f:
+            f.seek(resume["octets"])
+            for ligne in f:
+                if not ligne.endswith(b"\n"):
+                    # Ligne en cours d'écriture par le journal : reprise au prochain résumé
+                    break
+                resume["octets"] += len(ligne)
+                if not ligne.strip():
+                    continue
+                correspondance = _MOTIF_NIVEAU.search(ligne)
+                niveau = correspondance.group(1).decode("utf-8", "replace") if correspondance else "INCONNU"
+                niveaux[niveau] = niveaux.get(niveau, 0) + 1
+                resume["total"] += 1
+
+        # Écriture atomique : un résumé interrompu ne laisse pas de fichier corrompu
+        try:
+            temporaire = chemin_resume + ".tmp"
+            with open(temporaire, "w", encoding="utf-8") as f:
+                json.dump(resume, f, ensure_ascii=False)
+            os.replace(temporaire, chemin_resume)
+        except OSError:
+            pass
+
+    return resume
+
+
+def dernieres_lignes(chemin, nombre=5, taille_bloc=8192):
+    """
+    Les dernières lignes d'un fichier, lues par blocs depuis la fin.
+    """
+    with open(chemin, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        donnees = b""
+        # nombre + 1 sauts de ligne : la première ligne gardée est alors complète
+        while position > 0 and donnees.count(b"\n") <= nombre:
+            lecture = min(taille_bloc, position)
+            position -= lecture
+            f.seek(position)
+            donnees = f.read(lecture) + donnees
+
+    lignes = donnees.decode("utf-8", "replace").splitlines()
+    return [ligne for ligne in lignes if ligne.strip()][-nombre:]
+
+
+class PagesFichier:
+    def __init__(self, chemin, lignes_par_page=40):
+        """
+        Parcourt un fichier page par page sans le charger : le fichier est projeté
+        en mémoire et seules les lignes de la page affichée sont décodées.
+        """
+        self.chemin = chemin
+        self.lignes_par_page = max(1, lignes_par_page)
+        self._fichier = open(chemin, "rb")
+        self.taille = os.fstat(self._fichier.fileno()).st_size
+        # mmap refuse un fichier vide
+        self._carte = mmap.mmap(self._fichier.fileno(), 0, access=mmap.ACCESS_READ) if self.taille else None
+        self.position = 0
+
+    def page_suivante(self):
+        """
+        Lignes de la page suivante ([] en fin de fichier).
+        """
+        lignes = []
+        while self._carte is not None and self.position < self.taille and len(lignes) < self.lignes_par_page:
+            fin = self._carte.find(b"\n", self.position)
+            if fin == -1:
+                fin = self.taille
+            lignes.append(self._carte[self.position:fin].decode("utf-8", "replace").rstrip("\r"))
+            self.position = fin + 1
+        return lignes
+
+    def avancement(self):
+        return self.position / self.taille if self.taille else 1.0
+
+    def fermer(self):
+        if self._carte is not None:
+            self._carte.close()
+        self._fichier.close()
+
+
+class PagesListe:
+    """
+    Même parcours page par page pour des lignes déjà en mémoire (jour compacté relu depuis son archive).
+    """
+
+    def __init__(self, lignes, lignes_par_page=40):
+        self.lignes = lignes
+        self.lignes_par_page = max(1, lignes_par_page)
+        self.position = 0
+
+    def page_suivante(self):
+        page = self.lignes[self.position:self.position + self.lignes_par_page]
+        self.position += len(page)
+        return page
+
+    def avancement(self):
+        return self.position / len(self.lignes) if self.lignes else 1.0
+
+    def fermer(self):
+        pass
@@ -0,0 +1,239 @@
+# utils/metriques.py
+# -------------------------------------------------------------
+# Métriques de fonctionnement par caméra (compteurs, histogrammes)
+# exposées au format texte Prometheus sur un port HTTP local
+# -------------------------------------------------------------
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bornes (secondes) des histogrammes de latence
+BORNES_LATENCE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Compteurs par caméra : nom -> description (exposés avec le suffixe _total)
+COMPTEURS = {
+    "images_decodees": "Images reçues par la chaîne de détection",
+    "images_inferees": "Images passées au modèle YOLO",
+    "images_ignorees": "Images statiques écartées par le filtre de mouvement",
+    "images_abandonnees": "Images perdues avant traitement (retard sur le flux)",
+    "incidents_journalises": "Incidents transmis au journal",
+}
+
+
+class Histogramme:
+    """
+    Histogramme à bornes fixes : un ajout = une recherche dichotomique + deux additions.
+    """
+
+    def __init__(self, bornes=BORNES_LATENCE):
+        self.bornes = tuple(bornes)
+        self.comptes = [0] * (len(self.bornes) + 1)  # dernière case : au-delà de la dernière borne
+        self.somme = 0.0
+        self.nombre = 0
+
+    def observer(self, valeur):
+        self.comptes[bisect.bisect_left(self.bornes, valeur)] += 1
+        self.somme += valeur
+        self.nombre += 1
+
+    def quantile(self, q):
+        """
+        Estimation d'un quantile : borne supérieure du seau qui le contient.
+        """
+        if self.nombre == 0:
+            return 0.0
+        rang = q * self.nombre
+        cumul = 0
+        for borne, compte in zip(self.bornes, self.comptes):
+            cumul += compte
+            if cumul >= rang:
+                return borne
+        return float("inf")
+
+    def moyenne(self):
+        return self.somme / self.nombre if self.nombre else 0.0
+
+
+class MetriquesCamera:
+    """
+    Métriques d'une caméra. Chaque compteur n'a qu'un thread écrivain (celui de la caméra,
+    ou celui de capture pour images_abandonnees) : aucun verrou sur le chemin chaud,
+    la lecture tolère un léger décalage.
+    """
+
+    def __init__(self, nom):
+        self.nom = nom
+        self.compteurs = dict.fromkeys(COMPTEURS, 0)
+        self.latence_inference = Histogramme()
+        self.latence_traitement = Histogramme()
+        # Âge de l'image au moment de la décision : capture -> fin de traiter_frame
+        self.age_capture = Histogramme()
+
+        # Débit de traitement (moyenne glissante) comparé à la cadence de la source
+        self.fps_traitement = 0.0
+        self.fps_source = 0.0
+        self._derniere_image = None
+        self.derniere_activite = None
+
+    def incrementer(self, compteur, valeur=1):
+        self.compteurs[compteur] += valeur
+
+    def observer_image(self, durees, inferee, age=None):
+        """
+        Enregistre une image traitée à partir des durées d'étapes de traiter_frame.
+        :param age: Secondes écoulées depuis la capture de l'image, si connues
+        """
+        maintenant = time.perf_counter()
+        self.compteurs["images_decodees"] += 1
+        if inferee:
+            self.compteurs["images_inferees"] += 1
+            self.latence_inference.observer(durees["inference"])
+        else:
+            self.compteurs["images_ignorees"] += 1
+        self.latence_traitement.observer(sum(durees.values()))
+        if age is not None:
+            self.age_capture.observer(age)
+
+        if self._derniere_image is not None:
+            ecart = maintenant - self._derniere_image
+            if ecart > 0:
+                self.fps_traitement += 0.05 * (1.0 / ecart - self.fps_traitement)
+        self._derniere_image = maintenant
+        self.derniere_activite = time.time()
+
+    def en_retard(self):
+        """
+        True si la caméra traite moins d'images par seconde que sa source n'en produit.
+        """
+        return self.fps_source > 0 and self.fps_traitement < 0.95 * self.fps_source
+
+
+class RegistreMetriques:
+    def __init__(self, prefixe="aeroguard"):
+        self.prefixe = prefixe
+        self.cameras = {}
+        self._jauges = {}
+        self._verrou = threading.Lock()
+
+    def camera(self, nom):
+        """
+        Retourne (en les créant si besoin) les métriques d'une caméra.
+        Les compteurs sont cumulés sur toute la vie du processus, comme attendu par Prometheus.
+        """
+        with self._verrou:
+            metriques = self.cameras.get(nom)
+            if metriques is None:
+                metriques = MetriquesCamera(nom)
+                self.cameras[nom] = metriques
+            return metriques
+
+    def definir_jauge(self, nom, aide, fonction):
+        """
+        Jauge globale lue au moment de l'export (ex: profondeur d'une file).
+        Une nouvelle définition du même nom remplace la précédente (session suivante).
+        """
+        with self._verrou:
+            self._jauges[nom] = (aide, fonction)
+
+    def exposition_prometheus(self):
+        """
+        Texte au format d'exposition Prometheus (version 0.0.4).
+        """
+        with self._verrou:
+            cameras = list(self.cameras.values())
+            jauges = list(self._jauges.items())
+
+        lignes = []
+        p = self.prefixe
+
+        for compteur, aide in COMPTEURS.items():
+            nom = f"{p}_{compteur}_total"
+            lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} counter"]
+            for cam in cameras:
+                lignes.append(f"{nom}{{camera=\"{_echapper(cam.nom)}\"}} {cam.compteurs[compteur]}")
+
+        for attribut, aide in (("latence_inference", "Durée de l'inférence YOLO par image (secondes)"),
+                               ("latence_traitement", "Durée de traiter_frame par image (secondes)"),
+                               ("age_capture", "Âge de l'image entre sa capture et la décision (secondes)")):
+            nom = f"{p}_{attribut}_secondes"
+            lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} histogram"]
+            for cam in cameras:
+                histo = getattr(cam, attribut)
+                etiquette = f"camera=\"{_echapper(cam.nom)}\""
+                cumul = 0
+                for borne, compte in zip(histo.bornes, histo.comptes):
+                    cumul += compte
+                    lignes.append(f"{nom}_bucket{{{etiquette},le=\"{borne}\"}} {cumul}")
+                lignes.append(f"{nom}_bucket{{{etiquette},le=\"+Inf\"}} {histo.nombre}")
+                lignes.append(f"{nom}_sum{{{etiquette}}} {histo.somme}")
+                lignes.append(f"{nom}_count{{{etiquette}}} {histo.nombre}")
+
+        for attribut, aide in (("fps_traitement", "Images traitées par seconde (moyenne glissante)"),
+                               ("fps_source", "Cadence annoncée par la source (0 si inconnue)")):
+            nom = f"{p}_{attribut}"
+            lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} gauge"]
+            for cam in cameras:
+                lignes.append(f"{nom}{{camera=\"{_echapper(cam.nom)}\"}} {getattr(cam, attribut):.3f}")
+
+        for nom_jauge, (aide, fonction) in jauges:
+            nom = f"{p}_{nom_jauge}"
+            try:
+                valeur = fonction()
+            except Exception:
+                continue
+            lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} gauge", f"{nom} {valeur}"]
+
+        return "\n".join(lignes) + "\n"
+
+
+def _echapper(valeur):
+    return str(valeur).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# Registre unique du processus : les compteurs survivent aux sessions de surveillance
+_registre = RegistreMetriques()
+
+
+def registre_metriques():
+    return _registre
+
+
+class ServeurMetriques:
+    def __init__(self, registre=None, hote="127.0.0.1", port=9108):
+        """
+        Point d'accès HTTP local (GET /metrics) lu par Prometheus ou un simple curl.
+        :param hote: 127.0.0.1 par défaut : les métriques ne sortent pas de la machine
+        """
+        registre = registre if registre is not None else registre_metriques()
+
+        class _Gestionnaire(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                corps = registre.exposition_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, *args):
+                # Pas de ligne par requête dans la console de l'opérateur
+                pass
+
+        self.serveur = ThreadingHTTPServer((hote, port), _Gestionnaire)
+        self.serveur.daemon_threads = True
+        self.adresse = f"http://{hote}:{self.serveur.server_address[1]}/metrics"
+        self._thread = threading.Thread(target=self.serveur.serve_forever, name="serveur-metriques", daemon=True)
+
+    def demarrer(self):
+        self._thread.start()
+        print(f"[INIT] Métriques exposées sur {self.adresse}")
+        return self
+
+    def fermer(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
@@ -0,0 +1,271 @@
+# utils/preuves.py
+# -------------------------------------------------------------
+# Clips vidéo de preuve : images avant/après un incident ÉLEVÉ,
+# encodés en MP4 par un processus séparé (la détection n'attend jamais)
+# -------------------------------------------------------------
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from utils.tampon_circulaire import TamponCirculaire, attacher_memoire
+
+
+def _boucle_encodeur(file_taches, file_retours):
+    """
+    Processus d'encodage : reçoit (chemin, fps, segment, forme, position, nb_images),
+    lit les images directement dans le segment de mémoire partagée, écrit le MP4
+    puis rend le segment au processus de détection.
+    """
+    memoires = {}
+    while True:
+        tache = file_taches.get()
+        if tache is None:
+            break
+
+        chemin, fps, nom_memoire, forme, position, nb_images = tache
+        try:
+            memoire = memoires.get(nom_memoire)
+            if memoire is None:
+                memoire = memoires[nom_memoire] = attacher_memoire(nom_memoire)
+            images = np.ndarray(forme, dtype=np.uint8, buffer=memoire.buf)
+            capacite, hauteur, largeur = forme[:3]
+            # Tampon plein : la plus ancienne image est à la position d'écriture
+            debut = position if nb_images == capacite else 0
+
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            video = cv2.VideoWriter(chemin, cv2.VideoWriter_fourcc(*"mp4v"), fps, (largeur, hauteur))
+            for i in range(nb_images):
+                video.write(images[(debut + i) % capacite])
+            video.release()
+            del images
+            print(f"[PREUVE] Clip enregistré : {chemin}")
+        except Exception as e:
+            print(f"[ERREUR PREUVE] Encodage impossible ({chemin}) : {e}")
+        file_retours.put(nom_memoire)
+
+    for memoire in memoires.values():
+        memoire.close()
+
+
+class EncodeurPreuves:
+    def __init__(self, dossier_racine="logs", secondes_avant=5.0, secondes_apres=5.0, fps=10, largeur_max=960,
+                 clips_en_attente_max=4):
+        """
+        Prépare l'encodage des preuves.
+        :param dossier_racine: Racine des logs (les clips vont dans logs/<date>/)
+        :param secondes_avant: Durée conservée avant le déclenchement
+        :param secondes_apres: Durée enregistrée après le déclenchement
+        :param fps: Cadence des clips (les images intermédiaires ne sont pas conservées)
+        :param largeur_max: Largeur maximale des images stockées (borne la mémoire)
+        :param clips_en_attente_max: Au-delà, un nouveau clip est abandonné plutôt que de bloquer
+        """
+        self.dossier_racine = dossier_racine
+        self.secondes_avant = secondes_avant
+        self.secondes_apres = secondes_apres
+        self.fps = fps
+        self.largeur_max = largeur_max
+        self.clips_en_attente_max = max(1, int(clips_en_attente_max))
+
+        self.nb_clips = 0
+        self.nb_abandonnes = 0
+
+        # Tampons des caméras en mémoire partagée : au déclenchement, le tampon plein part
+        # tel quel vers l'encodeur (ni copie ni pickle des images) et la caméra continue
+        # dans un segment de réserve, rendu par l'encodeur une fois le clip écrit
+        self._segments = {}
+        self._libres = []
+        self._en_attente = 0
+        self._verrou = threading.Lock()
+
+        # spawn : le processus ne doit pas hériter des threads (caméras, journal) du parent
+        contexte = multiprocessing.get_context("spawn")
+        self._file = contexte.Queue()
+        self._retours = contexte.Queue()
+        self._processus = contexte.Process(target=_boucle_encodeur, args=(self._file, self._retours),
+                                           name="encodeur-preuves", daemon=True)
+        self._processus.start()
+
+    def nouvelle_capture(self):
+        """
+        Capture propre à une caméra (tampon alloué à la première image).
+        """
+        return CapturePreuve(self)
+
+    def chemin_clip(self, nom_zone, horodatage):
+        """
+        Chemin du clip d'un incident, à côté du log de la zone : logs/<date>/<zone>_<HHMMSS>.mp4
+        """
+        date_jour = time.strftime("%Y-%m-%d", time.localtime(horodatage))
+        heure = time.strftime("%H%M%S", time.localtime(horodatage))
+        nom_fichier = nom_zone.replace(" ", "_").replace("/", "-") + f"_{heure}.mp4"
+        return os.path.join(self.dossier_racine, date_jour, nom_fichier)
+
+    def allouer(self, taille):
+        """
+        Segment de mémoire partagée pour le tampon d'une caméra.
+        """
+        with self._verrou:
+            memoire = shared_memory.SharedMemory(create=True, size=taille)
+            self._segments[memoire.name] = memoire
+            return memoire
+
+    def reserver(self, taille):
+        """
+        Réserve sans bloquer le segment qui remplacera le tampon d'une caméra à l'envoi de son clip.
+        Retourne None si clips_en_attente_max clips sont déjà en attente (clip abandonné).
+        """
+        with self._verrou:
+            while True:
+                try:
+                    self._libres.append(self._retours.get_nowait())
+                    self._en_attente -= 1
+                except queue.Empty:
+                    break
+
+            if self._en_attente >= self.clips_en_attente_max:
+                self.nb_abandonnes += 1
+                return None
+            self._en_attente += 1
+
+            for i, nom in enumerate(self._libres):
+                if self._segments[nom].size >= taille:
+                    return self._segments[self._libres.pop(i)]
+
+            # Aucun segment libre assez grand : les libres restants (autre résolution) sont détruits
+            for nom in self._libres:
+                self._detruire(self._segments.pop(nom))
+            self._libres = []
+            memoire = shared_memory.SharedMemory(create=True, size=taille)
+            self._segments[memoire.name] = memoire
+            return memoire
+
+    def soumettre(self, chemin, memoire, forme, position, nb_images):
+        """
+        Confie un clip (segment réservé au déclenchement) au processus d'encodage.
+        Seuls le nom du segment et la position des images transitent par la file.
+        """
+        self._file.put((chemin, self.fps, memoire.name, forme, position, nb_images))
+        self.nb_clips += 1
+
+    @staticmethod
+    def _detruire(memoire):
+        try:
+            memoire.close()
+        except BufferError:
+            # Vue numpy encore référencée : le segment est détruit, le mapping libéré avec elle
+            pass
+        memoire.unlink()
+
+    def fermer(self):
+        """
+        Attend l'encodage des clips en file, arrête le processus et détruit les segments.
+        """
+        if self._processus.is_alive():
+            self._file.put(None)
+            self._processus.join()
+        with self._verrou:
+            for memoire in self._segments.values():
+                self._detruire(memoire)
+            self._segments = {}
+            self._libres = []
+
+
+class CapturePreuve:
+    """
+    Tampon circulaire d'une caméra couvrant secondes_avant + secondes_apres.
+    Au déclenchement, on attend secondes_apres puis on extrait tout le tampon.
+    """
+
+    def __init__(self, encodeur):
+        self.encodeur = encodeur
+        self.capacite = max(1, int(round((encodeur.secondes_avant + encodeur.secondes_apres) * encodeur.fps)))
+        self.nb_apres = int(round(encodeur.secondes_apres * encodeur.fps))
+        self.periode = 1.0 / encodeur.fps
+
+        self.tampon = None
+        self.memoire = None
+        self.forme = None
+        self._dernier_ajout = None
+
+        # Déclenchement en cours : images encore attendues, incident concerné
+        # et segment réservé qui remplacera le tampon à l'envoi
+        self.restantes = None
+        self.incident = None
+        self.chemin = None
+        self.reserve = None
+
+    @property
+    def nbytes(self):
+        return self.tampon.nbytes if self.tampon is not None else 0
+
+    def _allouer(self, frame):
+        hauteur, largeur = frame.shape[:2]
+        if largeur > self.encodeur.largeur_max:
+            hauteur = int(hauteur * self.encodeur.largeur_max / largeur)
+            largeur = self.encodeur.largeur_max
+        # Dimensions paires : exigées par la plupart des encodeurs MP4
+        self.forme = (self.capacite, hauteur - hauteur % 2, largeur - largeur % 2, 3)
+        self.memoire = self.encodeur.allouer(int(np.prod(self.forme)))
+        self.tampon = TamponCirculaire(*self.forme[:3], tampon=self.memoire.buf)
+
+    def ajouter(self, frame, horodatage):
+        """
+        À appeler à chaque image : conserve une image par période de clip
+        et envoie le clip quand les secondes après déclenchement sont écoulées.
+        """
+        if self._dernier_ajout is not None and horodatage - self._dernier_ajout < self.periode:
+            return
+
+        if self.tampon is None:
+            self._allouer(frame)
+        self.tampon.ajouter(frame, horodatage)
+        self._dernier_ajout = horodatage
+
+        if self.restantes is not None:
+            self.restantes -= 1
+            if self.restantes <= 0:
+                self._envoyer()
+
+    def declencher(self, nom_zone, incident):
+        """
+        Programme un clip pour l'incident (un seul clip par incident).
+        Si l'encodeur est saturé, le clip est abandonné tout de suite et l'incident reste sans preuve.
+        """
+        if self.restantes is not None or incident is self.incident or self.tampon is None:
+            return
+        self.incident = incident
+        self.chemin = self.encodeur.chemin_clip(nom_zone, incident.debut)
+        self.reserve = self.encodeur.reserver(int(np.prod(self.forme)))
+        if self.reserve is None:
+            print(f"[ERREUR PREUVE] Encodeur saturé : clip {os.path.basename(self.chemin)} abandonné")
+            return
+
+        # Le clip est assuré d'être confié à l'encodeur : son nom figurera sur la ligne de l'incident
+        incident.preuve = os.path.basename(self.chemin)
+        self.restantes = self.nb_apres
+        if self.restantes <= 0:
+            self._envoyer()
+
+    def _envoyer(self):
+        """
+        Le tampon part tel quel vers l'encodeur ; la caméra continue dans le segment réservé
+        (le clip suivant n'a d'images « avant » que depuis cet envoi).
+        """
+        self.restantes = None
+        self.encodeur.soumettre(self.chemin, self.memoire, self.forme, self.tampon.position, self.tampon.nb_images)
+        self.memoire, self.reserve = self.reserve, None
+        self.tampon = TamponCirculaire(*self.forme[:3], tampon=self.memoire.buf)
+
+    def terminer(self):
+        """
+        Fin de flux : envoie le clip en cours même s'il est incomplet.
+        """
+        if self.restantes is not None:
+            self._envoyer()
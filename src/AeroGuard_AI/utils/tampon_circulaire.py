@@ -0,0 +1,56 @@
+# utils/tampon_circulaire.py
+# -------------------------------------------------------------
+# Tampon circulaire d'images préalloué (aucune allocation par image)
+# -------------------------------------------------------------
+
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+
+def attacher_memoire(nom):
+    """
+    Ouvre un segment de mémoire partagée créé par un autre processus (qui seul le détruit).
+    """
+    try:
+        return shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:
+        # Python < 3.13 : l'enregistrement se fait auprès du resource_tracker hérité
+        # du créateur, qui connaît déjà le segment (aucune destruction à la sortie)
+        return shared_memory.SharedMemory(name=nom)
+
+
+class TamponCirculaire:
+    def __init__(self, capacite, hauteur, largeur, canaux=3, tampon=None):
+        """
+        Alloue une fois pour toutes capacite images (hauteur, largeur, canaux).
+        :param tampon: Zone mémoire existante pour les images (ex: SharedMemory.buf), ou None
+        """
+        self.capacite = capacite
+        self.images = np.ndarray((capacite, hauteur, largeur, canaux), dtype=np.uint8, buffer=tampon)
+        self.horodatages = np.zeros(capacite, dtype=np.float64)
+        self.position = 0  # prochain emplacement à écrire
+        self.nb_images = 0
+
+    @property
+    def nbytes(self):
+        """
+        Mémoire occupée par le tampon (octets).
+        """
+        return self.images.nbytes + self.horodatages.nbytes
+
+    def ajouter(self, frame, horodatage):
+        """
+        Copie l'image dans l'emplacement suivant, redimensionnée directement dans le tampon.
+        """
+        emplacement = self.images[self.position]
+        if frame.shape == emplacement.shape:
+            np.copyto(emplacement, frame)
+        else:
+            cv2.resize(frame, (emplacement.shape[1], emplacement.shape[0]), dst=emplacement,
+                       interpolation=cv2.INTER_AREA)
+
+        self.horodatages[self.position] = horodatage
+        self.position = (self.position + 1) % self.capacite
+        self.nb_images = min(self.nb_images + 1, self.capacite)
@@ -0,0 +1,105 @@
+# utils/zones.py
+# -------------------------------------------------------------
+# Zones par caméra (piste, taxiway, voies autorisées) :
+# polygones rastérisés une fois en masque de correspondance
+# -------------------------------------------------------------
+
+import json
+import os
+
+import cv2
+import numpy as np
+
+
+class Zone:
+    def __init__(self, nom, polygone, poids=1.0, type_zone=""):
+        """
+        :param polygone: Liste de points [x, y] normalisés (0-1) par rapport à l'image
+        :param poids: Multiplicateur appliqué au risque des objets dont le pied est dans la zone
+        """
+        self.nom = nom
+        self.polygone = polygone
+        self.poids = poids
+        self.type_zone = type_zone
+
+
+class ZonesCamera:
+    def __init__(self, zones, poids_hors_zone=1.0, recadrer=False):
+        """
+        :param zones: Liste de Zone (en cas de recouvrement, la dernière zone l'emporte)
+        :param poids_hors_zone: Multiplicateur pour les objets situés hors de toute zone
+        :param recadrer: True pour limiter l'inférence au rectangle englobant les zones
+        """
+        self.zones = zones
+        self.poids_hors_zone = poids_hors_zone
+        self.recadrer = recadrer
+
+        # Construits par rasteriser() au démarrage du flux
+        self.masque = None
+        self.poids = np.array([poids_hors_zone] + [zone.poids for zone in zones], dtype=np.float32)
+        self.rectangle_inference = None
+
+    def rasteriser(self, largeur, hauteur):
+        """
+        Dessine une fois les polygones dans un masque (H, W) d'index de zone (0 = hors zone).
+        """
+        self.masque = np.zeros((hauteur, largeur), dtype=np.uint8)
+        echelle = np.array([largeur, hauteur], dtype=np.float32)
+
+        points_zones = []
+        for index, zone in enumerate(self.zones, start=1):
+            points = np.round(np.asarray(zone.polygone, dtype=np.float32) * echelle).astype(np.int32)
+            cv2.fillPoly(self.masque, [points], index)
+            points_zones.append(points)
+
+        self.rectangle_inference = None
+        if self.recadrer and points_zones:
+            tous = np.concatenate(points_zones)
+            x1, y1 = np.clip(tous.min(axis=0), 0, [largeur, hauteur])
+            x2, y2 = np.clip(tous.max(axis=0) + 1, 0, [largeur, hauteur])
+            self.rectangle_inference = (int(x1), int(y1), int(x2), int(y2))
+
+        return self.masque
+
+    def est_rasterise_pour(self, largeur, hauteur):
+        return self.masque is not None and self.masque.shape == (hauteur, largeur)
+
+    def index_zones(self, boites):
+        """
+        Index de zone du point au sol (milieu du bord bas) de chaque boîte : simple lecture du masque.
+        """
+        hauteur, largeur = self.masque.shape
+        x = np.clip((boites[:, 0] + boites[:, 2]) // 2, 0, largeur - 1)
+        y = np.clip(boites[:, 3] - 1, 0, hauteur - 1)
+        return self.masque[y, x]
+
+    def facteurs(self, boites):
+        """
+        Multiplicateur de risque de chaque boîte selon sa zone.
+        """
+        return self.poids[self.index_zones(boites)]
+
+
+def charger_zones(chemin_fichier):
+    """
+    Lit la configuration JSON des zones : {nom_camera: {"zones": [...], ...}}.
+    Retourne un dict {nom_camera: ZonesCamera} (vide si le fichier n'existe pas).
+    """
+    if not os.path.exists(chemin_fichier):
+        return {}
+
+    with open(chemin_fichier, "r", encoding="utf-8") as f:
+        configuration = json.load(f)
+
+    zones_par_camera = {}
+    for nom_camera, config_camera in configuration.items():
+        zones = [
+            Zone(z["nom"], z["polygone"], z.get("poids", 1.0), z.get("type", ""))
+            for z in config_camera.get("zones", [])
+        ]
+        zones_par_camera[nom_camera] = ZonesCamera(
+            zones,
+            poids_hors_zone=config_camera.get("poids_hors_zone", 1.0),
+            recadrer=config_camera.get("recadrer", False),
+        )
+    return zones_par_camera
@@ -7,6 +7,8 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score #
 import pandas as pd
 import joblib
 import numpy as np
+import os
+from modele_compact import ModeleCompact, exporter_modele
 
 # 1. Chargement des données
 try:
@@ -97,6 +99,21 @@ elif r2 > 0.6:
 else:
     print("Performance : À AMÉLIORER (Vérifiez vos données ou hyperparamètres)")
 
-# Sauvegarde du modèle entraîné
-joblib.dump(pipeline, "modele_fatigue.pkl")
-print("\nModèle sauvegardé sous 'modele_fatigue.pkl'")
\ No newline at end of file
+# Sauvegarde du modèle entraîné (dossier lu par application_CLI.py)
+os.makedirs("models", exist_ok=True)
+chemin_modele = os.path.join("models", "modele_fatigue.pkl")
+joblib.dump(pipeline, chemin_modele)
+print(f"\nModèle sauvegardé sous '{chemin_modele}'")
+
+# Format compact projeté en mémoire, chargé par application_CLI.py
+chemin_compact = os.path.join("models", "modele_fatigue.joblib")
+exporter_modele(pipeline, chemin_compact)
+print(f"Modèle compact sauvegardé sous '{chemin_compact}'")
+
+# Vérification du prédicteur vectorisé contre le Pipeline (même préprocesseur, mêmes arbres)
+y_compact = ModeleCompact(chemin_compact).predict_vectorise(X_test)
+ecart = np.max(np.abs(y_compact - y_pred)) if len(y_pred) else 0.0
+if np.allclose(y_compact, y_pred, rtol=1e-9, atol=1e-12):
+    print(f"Prédicteur vectorisé conforme au Pipeline (écart maximal : {ecart:.2e})")
+else:
+    print(f"ATTENTION : le prédicteur vectorisé s'écarte du Pipeline (écart maximal : {ecart:.2e})")
\ No newline at end of file
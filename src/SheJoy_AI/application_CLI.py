@@ -1,23 +1,35 @@
 import pandas as pd
-import joblib
 import os
 import datetime
+import itertools
 from colorama import Fore, Style, init
+from journal_audit import JournalAudit, lire_journal_recent, migrer_csv, verifier_journal
+from modele_compact import charger_modele
 
 #initialisation de colorama pour les sorties de couleurs
 init(autoreset=True)
 
 #Les paramètres à prendre en compte
 SEUIL_APTITUDE_PCT = 60
-JOURNAL_FILE = "journal.csv"
-
-
-#Initialisation du modele RandomForest entrainé
-try:
-    modele = joblib.load("models\modele_fatigue.pkl")
-except Exception as e:
-    print(f"Erreur lors du chargement du modèle : {e}")
-    exit()
+JOURNAL_FILE = "journal.csv"  #ancien journal, repris dans JOURNAL_DIR au premier lancement
+JOURNAL_DIR = "journal"
+JOURNAL_TAILLE_MAX = 5_000_000  #octets par fichier avant d'en ouvrir un nouveau dans la journée
+JOURNAL_CHAINAGE = True  #empreintes SHA-256 chaînées (journal infalsifiable)
+JOURNAL_LIGNES_PAGE = 20
+TYPES_ACTIONS = ["Import CSV", "Analyse fatigue", "Remplacement pilote", "Remplacement équipage"]
+MODELE_FILE = os.path.join("models", "modele_fatigue.pkl")
+MODELE_COMPACT_FILE = os.path.join("models", "modele_fatigue.joblib")  #créé depuis MODELE_FILE si besoin
+#Prédicteur optionnel : tous les arbres évalués ensemble, compilé par numba ; sans numba, repli
+#sur predict() (le parcours NumPy pur est plus lent que scikit-learn au-delà d'environ 1k lignes).
+#False (référence) : predict(), mêmes résultats que Pipeline.predict
+PREDICTION_VECTORISEE = False
+
+
+#Modele RandomForest entrainé, chargé à la première analyse (voir obtenir_modele)
+modele = None
+
+#Journal d'audit en ajout seul (un fichier par jour), ouvert au lancement (voir ouvrir_journal)
+journal = None
 
 #Donnees à charger pour chaque options
 donnees_jour = pd.DataFrame()
@@ -26,32 +38,106 @@ donnees_j7 = pd.DataFrame()
 
 
 
+def ouvrir_journal():
+    """Fonction pour ouvrir le journal d'audit et y reprendre l'ancien journal.csv (au lancement du programme)"""
+    global journal
+    if journal is None:
+        #Chaque action est écrite aussitôt (taille_lot=1) : rien ne se perd si le terminal est fermé
+        journal = JournalAudit(JOURNAL_DIR, taille_max=JOURNAL_TAILLE_MAX, chainage=JOURNAL_CHAINAGE)
+        nb_migrees = migrer_csv(JOURNAL_FILE, journal)
+        if nb_migrees:
+            print(f"Ancien journal repris : {nb_migrees} entrées ({JOURNAL_FILE} -> {JOURNAL_DIR}/)")
+    return journal
+
+
 def log_action(type_action, details=""):
     """Fonction mise en place pour répertorier les logs de tout ce qui sera fait dans le programme"""
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    entry = {"date": now, "action": type_action, "details": details}
-    
-    if os.path.exists(JOURNAL_FILE):
-        df_journal = pd.read_csv(JOURNAL_FILE)
-        df_journal = pd.concat([df_journal, pd.DataFrame([entry])], ignore_index=True)
+    #Ajout d'une ligne à la fin du fichier du jour : coût constant quelle que soit la taille du journal
+    ouvrir_journal().ajouter(type_action, details)
+
+
+def afficher_journal(depuis=None, jusqua=None, action=None, texte=None):
+    """Fonction pour afficher le journal page par page, du plus récent au plus ancien (lu en flux)"""
+    ouvrir_journal().vider()
+    entrees = lire_journal_recent(JOURNAL_DIR, depuis, jusqua, action, texte)
+    page = 1
+    while True:
+        lignes = list(itertools.islice(entrees, JOURNAL_LIGNES_PAGE))
+        if not lignes:
+            print("Aucune entrée trouvée." if page == 1 else "--- Fin du journal ---")
+            return
+        print(f"\n--- Page {page} (du plus récent au plus ancien) ---")
+        for entree in lignes:
+            print(f"[{entree['date']}] {entree['action']} -> {entree['details']}")
+        if len(lignes) < JOURNAL_LIGNES_PAGE:
+            print("--- Fin du journal ---")
+            return
+        if input("Entrée : page suivante | q : quitter > ").strip().lower() == "q":
+            return
+        page += 1
+
+
+def saisir_date(message):
+    """Fonction pour saisir une date AAAA-MM-JJ (None si vide ou invalide)"""
+    date = input(message).strip()
+    if not date:
+        return None
+    try:
+        return datetime.datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        print(f"Date invalide ignorée : {date}")
+        return None
+
+
+def rechercher_journal():
+    """Fonction pour filtrer le journal par période, type d'action et texte"""
+    print("\n(laisser vide pour ne pas filtrer)")
+    depuis = saisir_date("Depuis le (AAAA-MM-JJ) : ")
+    jusqua = saisir_date("Jusqu'au (AAAA-MM-JJ) : ")
+    for i, type_action in enumerate(TYPES_ACTIONS, 1):
+        print(f"{i}. {type_action}")
+    choix = input("Type d'action (numéro) : ").strip()
+    action = TYPES_ACTIONS[int(choix) - 1] if choix.isdigit() and 1 <= int(choix) <= len(TYPES_ACTIONS) else None
+    texte = input("Texte recherché (pilote, vol, fichier...) : ").strip() or None
+    afficher_journal(depuis, jusqua, action, texte)
+
+
+def verifier_integrite():
+    """Fonction pour vérifier la chaîne d'empreintes du journal"""
+    ouvrir_journal().vider()
+    total, non_chainees, tronquees, invalide = verifier_journal(JOURNAL_DIR)
+    for ligne in tronquees:
+        print(Fore.YELLOW + f"Entrée tronquée (arrêt brutal pendant l'écriture) ignorée : {ligne}" + Style.RESET_ALL)
+    if total == 0:
+        print("Aucun journal disponible.")
+    elif invalide is not None:
+        print(Fore.RED + f"⚠️ Journal altéré : chaîne d'empreintes rompue à {invalide}" + Style.RESET_ALL)
+    elif non_chainees:
+        print(Fore.YELLOW + f"Intégrité : {total - non_chainees} entrées vérifiées, {non_chainees} sans empreinte"
+              + Style.RESET_ALL)
     else:
-        df_journal = pd.DataFrame([entry])
-    
-    df_journal.to_csv(JOURNAL_FILE, index=False)
+        print(Fore.GREEN + f"✅ Intégrité vérifiée : {total} entrées" + Style.RESET_ALL)
 
 
 def menu_journal():
-    """Fonction pour le journal"""
-    if os.path.exists(JOURNAL_FILE):
-        df_journal = pd.read_csv(JOURNAL_FILE)
-        if df_journal.empty:
-            print("Aucun journal disponible.")
-            return
+    """Fonction pour afficher le sous-menu du journal"""
+    while True:
         print("\n=== Journaux & Historique ===")
-        for _, row in df_journal.iterrows():
-            print(f"[{row['date']}] {row['action']} -> {row['details']}")
-    else:
-        print("Aucun journal disponible.")
+        print("1. Dernières actions")
+        print("2. Rechercher (période, type d'action, texte)")
+        print("3. Vérifier l'intégrité du journal")
+        print("4. Retour")
+        choix = input("Choix : ")
+        if choix=="1":
+            afficher_journal()
+        elif choix=="2":
+            rechercher_journal()
+        elif choix=="3":
+            verifier_integrite()
+        elif choix=="4":
+            break
+        else:
+            print("Choix invalide.")
 
 
 def importer_csv_horizon(horizon_jours):
@@ -123,6 +209,17 @@ def get_donnees_selon_horizon(horizon_jours):
 
 
 
+def obtenir_modele():
+    """Fonction pour charger le modèle à la première analyse (format compact projeté en mémoire)"""
+    global modele
+    if modele is None:
+        try:
+            modele = charger_modele(MODELE_FILE, MODELE_COMPACT_FILE)
+        except Exception as e:
+            print(f"Erreur lors du chargement du modèle : {e}")
+    return modele
+
+
 def afficher_tableau(df):
     """Fonction pour afficher un tableau avec des couleurs via la bibliothèque colorama"""
     print("\n{:<10} {:<20} {:<10} {:<15} {:<10}".format(
@@ -145,7 +242,13 @@ def analyse_fatigue(horizon_jours):
     df = get_donnees_selon_horizon(horizon_jours)
     if df is None or df.empty:
         return
-    df['score_fatigue'] = modele.predict(df) * 100
+    modele_fatigue = obtenir_modele()
+    if modele_fatigue is None:
+        return
+    if PREDICTION_VECTORISEE:
+        df['score_fatigue'] = modele_fatigue.predict_vectorise(df) * 100
+    else:
+        df['score_fatigue'] = modele_fatigue.predict(df) * 100
     df['aptitude'] = df['score_fatigue'].apply(lambda x: "Apt" if x < SEUIL_APTITUDE_PCT else "Non apt")
     afficher_tableau(df)
     log_action("Analyse fatigue", f"Horizon {horizon_jours} jours, {len(df)} pilotes analysés")
@@ -267,6 +370,7 @@ def menu_principal():
         elif choix=="5":
             menu_journal()
         elif choix=="6":
+            ouvrir_journal().fermer()
             print("Au revoir !")
             break
         else:
@@ -275,4 +379,5 @@ def menu_principal():
 
 #Fonction pour lancer le programme
 if __name__ == "__main__":
+    ouvrir_journal()
     menu_principal()
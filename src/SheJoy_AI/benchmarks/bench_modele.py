@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+#Benchmark du chargement du modèle de fatigue : Pipeline joblib (.pkl) contre format compact
+#projeté en mémoire (modele_compact.py). Durée et mémoire (RSS) mesurées dans des interpréteurs
+#neufs (Prédiction : meilleur de 3 appels suivants, à chaud), prédictions comparées bit à bit.
+#Lancement : cd src/SheJoy_AI && python benchmarks/bench_modele.py --entrainer 20000
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from modele_compact import ModeleCompact, exporter_modele  # noqa: E402
+
+#Exécuté dans un interpréteur neuf (bibliothèques importées avant la première mesure)
+SONDE = """
+import json, os, sys, time, warnings
+warnings.filterwarnings("ignore")
+import joblib, pandas as pd, sklearn.ensemble, sklearn.compose, sklearn.pipeline, sklearn.preprocessing
+sys.path.insert(0, {racine!r})
+from modele_compact import ModeleCompact
+def rss():
+    #Mémoire résidente (Linux) ; 0 ailleurs
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+df = pd.read_csv({donnees!r})
+if {lignes}:
+    df = df.sample({lignes}, replace=True, random_state=0).reset_index(drop=True)
+rss_avant = rss()
+debut = time.perf_counter()
+modele = {chargement}
+chargement_s = time.perf_counter() - debut
+rss_charge = rss()
+debut = time.perf_counter()
+modele.predict(df)
+premiere_s = time.perf_counter() - debut
+rss_prediction = rss()
+prediction_s = float("inf")
+for _ in range(3):
+    debut = time.perf_counter()
+    modele.predict(df)
+    prediction_s = min(prediction_s, time.perf_counter() - debut)
+print(json.dumps({{"chargement_s": chargement_s, "premiere_prediction_s": premiere_s, "prediction_s": prediction_s,
+                  "rss_chargement": rss_charge - rss_avant, "rss_apres_prediction": rss_prediction - rss_avant}}))
+"""
+
+
+def entrainer_modele(chemin_pkl, nb_lignes, graine=0):
+    """
+    Réentraîne le Pipeline livré (mêmes hyperparamètres : 600 arbres, profondeur 30)
+    sur nb_lignes tirées de data/entrainement.csv avec du bruit : taille de modèle réaliste.
+    """
+    from sklearn.base import clone
+
+    pipeline = joblib.load(os.path.join(RACINE, "models", "modele_fatigue.pkl"))
+    base = pd.read_csv(os.path.join(RACINE, "data", "entrainement.csv"))
+    hasard = np.random.default_rng(graine)
+    df = base.sample(nb_lignes, replace=True, random_state=graine).reset_index(drop=True)
+    colonnes_numeriques = pipeline.named_steps["preprocessing"].transformers_[0][2]
+    for colonne in colonnes_numeriques:
+        df[colonne] = df[colonne] + hasard.normal(0, df[colonne].std() / 4 + 0.1, len(df))
+    df["score_fatigue"] = np.clip(df["score_fatigue"] + hasard.normal(0, 0.05, len(df)), 0, 1)
+
+    print(f"Entraînement de la forêt sur {nb_lignes} lignes...")
+    modele = clone(pipeline).fit(df.drop(columns="score_fatigue"), df["score_fatigue"])
+    joblib.dump(modele, chemin_pkl)
+    return modele
+
+
+def mesurer(chargement, donnees, repetitions, lignes=0):
+    """Meilleure mesure sur repetitions interpréteurs (lignes > 0 : données rééchantillonnées à lignes lignes)"""
+    mesures = []
+    for _ in range(repetitions):
+        sortie = subprocess.run(
+            [sys.executable, "-c", SONDE.format(racine=RACINE, donnees=donnees, chargement=chargement, lignes=lignes)],
+            cwd=RACINE, capture_output=True, text=True, check=True)
+        mesures.append(json.loads(sortie.stdout.strip().splitlines()[-1]))
+    return min(mesures, key=lambda mesure: mesure["chargement_s"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du chargement du modèle de fatigue SheJoy")
+    parser.add_argument("--modele", default=os.path.join(RACINE, "models", "modele_fatigue.pkl"))
+    parser.add_argument("--entrainer", type=int, default=0,
+                        help="Réentraîne une forêt de taille réaliste sur N lignes synthétiques (0 : modèle livré)")
+    parser.add_argument("--donnees", default=os.path.join(RACINE, "data", "test.csv"))
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--lignes", type=int, default=0,
+                        help="Prédictions chronométrées sur N lignes rééchantillonnées (0 : données telles quelles)")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="shejoy_modele_") as dossier:
+        chemin_pkl = args.modele
+        if args.entrainer:
+            chemin_pkl = os.path.join(dossier, "modele_fatigue.pkl")
+            pipeline = entrainer_modele(chemin_pkl, args.entrainer)
+        else:
+            pipeline = joblib.load(chemin_pkl)
+        chemin_compact = os.path.join(dossier, "modele_fatigue.joblib")
+        exporter_modele(pipeline, chemin_compact)
+
+        #Prédictions bit à bit : données de test et lignes rééchantillonnées
+        df = pd.read_csv(args.donnees)
+        lignes = pd.concat([df, df.sample(10000, replace=True, random_state=0)], ignore_index=True)
+        identiques = np.array_equal(pipeline.predict(lignes),
+                                    ModeleCompact(chemin_compact, chemin_pkl).predict(lignes))
+        nb_noeuds = sum(estimateur.tree_.node_count for estimateur in pipeline.named_steps["model"].estimators_)
+        del pipeline
+
+        resultats = {
+            "noeuds": nb_noeuds,
+            "octets_pkl": os.path.getsize(chemin_pkl),
+            "octets_compact": os.path.getsize(chemin_compact),
+            "identiques": identiques,
+            "pkl": mesurer(f"joblib.load({chemin_pkl!r})", args.donnees, args.repetitions, args.lignes),
+            "compact": mesurer(f"ModeleCompact({chemin_compact!r}, {chemin_pkl!r})", args.donnees,
+                               args.repetitions, args.lignes),
+        }
+
+    print(f"\nForêt : {resultats['noeuds']} nœuds")
+    print(f"{'':<22} {'Fichier':>10} {'Chargement':>11} {'RSS chargé':>11} {'1re prédiction':>15} "
+          f"{'RSS après':>10} {'Prédiction':>11}")
+    for nom, cle, octets in (("Pipeline .pkl", "pkl", "octets_pkl"), ("Compact (mmap)", "compact", "octets_compact")):
+        mesure = resultats[cle]
+        print(f"{nom:<22} {resultats[octets] / 1e6:>8.1f}Mo {mesure['chargement_s']:>10.3f}s "
+              f"{mesure['rss_chargement'] / 1e6:>9.1f}Mo {mesure['premiere_prediction_s']:>14.3f}s "
+              f"{mesure['rss_apres_prediction'] / 1e6:>8.1f}Mo {mesure['prediction_s']:>10.3f}s")
+    print(f"\nPrédictions identiques bit à bit : {'oui' if identiques else 'NON'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2, ensure_ascii=False)
+        print(f"Résultats enregistrés : {args.json}")
+    if not identiques:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
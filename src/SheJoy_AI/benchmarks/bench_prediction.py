@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+#Benchmark du scoring : Pipeline.predict (scikit-learn, arbre par arbre) contre le prédicteur
+#vectorisé du format compact (numba si installé, sinon parcours NumPy), à 1k / 100k / 1M lignes.
+#Les prédictions sont comparées à celles du Pipeline (tolérance flottante).
+#Lancement : cd src/SheJoy_AI && python benchmarks/bench_prediction.py --entrainer 20000
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from bench_modele import entrainer_modele  # noqa: E402
+from modele_compact import ModeleCompact, _noyau_compile, exporter_modele  # noqa: E402
+
+#Colonnes binaires ou d'heure entière : tirées telles quelles, sans bruit
+COLONNES_DISCRETES = {"est_service_nuit", "voyage_est", "debut_fenetre_sommeil", "fin_fenetre_sommeil",
+                      "equipage_augmente"}
+
+
+def generer_lignes(nb_lignes, graine=1):
+    """Équipages synthétiques : lignes de data/entrainement.csv tirées au hasard, variables continues bruitées"""
+    base = pd.read_csv(os.path.join(RACINE, "data", "entrainement.csv")).drop(columns="score_fatigue")
+    hasard = np.random.default_rng(graine)
+    df = base.sample(nb_lignes, replace=True, random_state=graine).reset_index(drop=True)
+    for colonne in df.select_dtypes("number").columns:
+        if colonne not in COLONNES_DISCRETES:
+            df[colonne] = df[colonne] + hasard.normal(0, df[colonne].std() / 4 + 0.1, nb_lignes)
+    return df
+
+
+def chronometrer(fonction, *args):
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return resultat, time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du prédicteur vectorisé de la forêt SheJoy")
+    parser.add_argument("--modele", default=os.path.join(RACINE, "models", "modele_fatigue.pkl"))
+    parser.add_argument("--entrainer", type=int, default=0,
+                        help="Réentraîne une forêt de taille réaliste sur N lignes synthétiques (0 : modèle livré)")
+    parser.add_argument("--lignes", default="1000,100000,1000000", help="Tailles de lot, séparées par des virgules")
+    parser.add_argument("--numpy", action="store_true", help="Mesure aussi le repli NumPy (sans numba)")
+    parser.add_argument("--json", help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="shejoy_prediction_") as dossier:
+        if args.entrainer:
+            pipeline = entrainer_modele(os.path.join(dossier, "modele_fatigue.pkl"), args.entrainer)
+        else:
+            pipeline = joblib.load(args.modele)
+        chemin_compact = os.path.join(dossier, "modele_fatigue.joblib")
+        exporter_modele(pipeline, chemin_compact)
+        modele = ModeleCompact(chemin_compact)
+
+        compile_disponible = _noyau_compile() is not None
+        if compile_disponible:
+            #Compilation (ou lecture du cache numba) hors mesure
+            _, duree_compilation = chronometrer(modele.predict_vectorise, generer_lignes(10))
+            print(f"Noyau numba prêt en {duree_compilation:.2f} s")
+        else:
+            print("numba absent : parcours NumPy seul (pip install numba pour la version compilée)")
+
+        moteurs = [("Pipeline.predict", pipeline.predict)]
+        if compile_disponible:
+            moteurs.append(("Vectorisé numba", modele.predict_vectorise))
+        if args.numpy or not compile_disponible:
+            moteurs.append(("Vectorisé NumPy", lambda df: modele.predict_vectorise(df, compile=False)))
+
+        resultats = []
+        print(f"\n{'Lignes':>9} {'Moteur':<20} {'Durée':>9} {'Lignes/s':>11} {'Écart max':>10} Identique")
+        for nb_lignes in [int(n) for n in args.lignes.split(",")]:
+            df = generer_lignes(nb_lignes)
+            reference = None
+            for nom, predire in moteurs:
+                prediction, duree = chronometrer(predire, df)
+                if reference is None:
+                    reference = prediction
+                ecart = float(np.max(np.abs(prediction - reference)))
+                conforme = np.allclose(prediction, reference, rtol=1e-9, atol=1e-12)
+                identique = bool(np.array_equal(prediction, reference))
+                print(f"{nb_lignes:>9} {nom:<20} {duree:>8.3f}s {nb_lignes / duree:>11.0f} {ecart:>10.1e} "
+                      f"{'oui' if identique else ('tolérance' if conforme else 'NON')}")
+                resultats.append({"lignes": nb_lignes, "moteur": nom, "duree_s": duree,
+                                  "ecart_max": ecart, "conforme": bool(conforme), "identique": identique})
+            del df, reference
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés : {args.json}")
+    if not all(resultat["conforme"] for resultat in resultats):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
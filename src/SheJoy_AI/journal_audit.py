@@ -0,0 +1,304 @@
+import csv
+import hashlib
+import io
+import os
+import re
+import atexit
+import datetime
+
+#Colonnes des fichiers du journal (empreinte vide si le chaînage est désactivé)
+COLONNES = ["date", "action", "details", "empreinte"]
+
+#Empreinte "précédente" de la toute première entrée
+EMPREINTE_INITIALE = "0" * 64
+
+PREFIXE = "journal_"
+
+#Entrées écrites ensemble lors d'une reprise en masse (migrer_csv)
+TAILLE_LOT_REPRISE = 1000
+
+_MOTIF_EMPREINTE = re.compile(r"[0-9a-f]{64}")
+
+
+def calculer_empreinte(precedente, date, action, details):
+    """Empreinte SHA-256 d'une entrée, liée à celle de l'entrée précédente (chaînage)"""
+    contenu = "\x1f".join([precedente, date, action, details])
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+def nom_fichier(jour, numero=0):
+    """journal_AAAA-MM-JJ.csv, puis journal_AAAA-MM-JJ_001.csv... quand le fichier du jour est plein"""
+    return f"{PREFIXE}{jour}.csv" if numero == 0 else f"{PREFIXE}{jour}_{numero:03d}.csv"
+
+
+def _ordre_fichier(nom):
+    """Clé de tri (jour, numéro) d'un nom de fichier du journal"""
+    jour, _, numero = nom[len(PREFIXE):-len(".csv")].partition("_")
+    return jour, int(numero) if numero.isdigit() else 0
+
+
+def lister_fichiers(dossier):
+    """Fichiers du journal dans l'ordre chronologique"""
+    if not os.path.isdir(dossier):
+        return []
+    noms = [f for f in os.listdir(dossier) if f.startswith(PREFIXE) and f.endswith(".csv")]
+    return [os.path.join(dossier, f) for f in sorted(noms, key=_ordre_fichier)]
+
+
+def _lire_entree(ligne):
+    """Ligne CSV -> dict (colonnes du journal) ou None"""
+    valeurs = next(csv.reader([ligne]), [])
+    if len(valeurs) != len(COLONNES) or valeurs == COLONNES:
+        return None
+    return dict(zip(COLONNES, valeurs))
+
+
+def _entree_complete(ligne):
+    """
+    Ligne CSV -> dict, ou None pour une ligne illisible ou tronquée par un arrêt brutal
+    (nombre de colonnes incorrect, empreinte incomplète). Une entrée tient toujours sur une ligne.
+    """
+    entree = _lire_entree(ligne)
+    if entree is None or (entree["empreinte"] and not _MOTIF_EMPREINTE.fullmatch(entree["empreinte"])):
+        return None
+    return entree
+
+
+def _termine_par_saut(chemin):
+    """False si la dernière ligne du fichier a été interrompue (pas de retour à la ligne final)"""
+    with open(chemin, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _derniere_entree(dossier):
+    """
+    Dernière entrée complète du journal, lue depuis la fin : la ligne interrompue par un arrêt
+    brutal et les en-têtes sont ignorés (coût indépendant de la taille du journal).
+    """
+    for chemin in reversed(lister_fichiers(dossier)):
+        lignes = _lignes_inverses(chemin)
+        if not _termine_par_saut(chemin):
+            next(lignes, None)
+        for ligne in lignes:
+            entree = _entree_complete(ligne)
+            if entree is not None:
+                return entree
+    return None
+
+
+class JournalAudit:
+    """
+    Journal d'audit en ajout seul : une ligne CSV par action, jamais de réécriture.
+    Un fichier par jour (journal_AAAA-MM-JJ.csv), découpé au-delà de taille_max octets.
+    Chaque entrée peut porter l'empreinte SHA-256 de son contenu et de l'entrée précédente :
+    toute modification ou suppression d'une ligne casse la chaîne (voir verifier_journal).
+    """
+
+    def __init__(self, dossier, taille_max=5_000_000, taille_lot=1, chainage=True, fsync=False):
+        """
+        dossier    : dossier des fichiers du journal
+        taille_max : taille (octets) au-delà de laquelle un nouveau fichier est ouvert pour le même jour
+        taille_lot : entrées gardées en mémoire avant écriture (1 = écriture à chaque action, sans perte
+                     possible à l'arrêt brutal ; plus pour les reprises en masse, voir migrer_csv)
+        chainage   : calcule l'empreinte chaînée de chaque entrée
+        fsync      : force l'écriture physique à chaque vidage
+        """
+        self.dossier = dossier
+        self.taille_max = taille_max
+        self.taille_lot = max(1, taille_lot)
+        self.chainage = chainage
+        self.fsync = fsync
+        self.tampon = []
+        self.fichier = None
+        self.jour = None
+        self.numero = 0
+        self.taille = 0
+        os.makedirs(dossier, exist_ok=True)
+
+        #Reprise de la chaîne depuis la dernière entrée complète : une ligne tronquée par un arrêt
+        #brutal ne fait pas partie de la chaîne (comme dans verifier_journal) ;
+        #après une entrée non chaînée, la chaîne repart de zéro
+        self.derniere_empreinte = EMPREINTE_INITIALE
+        entree = _derniere_entree(dossier)
+        if entree is not None and entree["empreinte"]:
+            self.derniere_empreinte = entree["empreinte"]
+
+        atexit.register(self.fermer)
+
+    def ajouter(self, action, details="", date=None):
+        """Ajoute une entrée (date : "AAAA-MM-JJ HH:MM:SS", maintenant par défaut)"""
+        if date is None:
+            date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        #Une entrée = une ligne : les retours à la ligne casseraient la lecture depuis la fin
+        action = " ".join(str(action).splitlines())
+        details = " ".join(str(details).splitlines())
+
+        empreinte = ""
+        if self.chainage:
+            empreinte = calculer_empreinte(self.derniere_empreinte, date, action, details)
+            self.derniere_empreinte = empreinte
+
+        self.tampon.append((date, action, details, empreinte))
+        if len(self.tampon) >= self.taille_lot:
+            self.vider()
+
+    def vider(self):
+        """Écrit les entrées en attente (chaque ligne d'un seul bloc, à la fin du fichier)"""
+        for date, action, details, empreinte in self.tampon:
+            self._preparer_fichier(date[:10])
+            sortie = io.StringIO()
+            csv.writer(sortie, lineterminator="\n").writerow([date, action, details, empreinte])
+            ligne = sortie.getvalue().encode("utf-8")
+            self.fichier.write(ligne)
+            self.taille += len(ligne)
+        self.tampon = []
+        if self.fichier is not None:
+            self.fichier.flush()
+            if self.fsync:
+                os.fsync(self.fichier.fileno())
+
+    def _preparer_fichier(self, jour):
+        """Ouvre le fichier du jour, ou le suivant si le fichier courant a atteint taille_max"""
+        if self.fichier is not None and self.jour == jour and self.taille < self.taille_max:
+            return
+        if self.fichier is not None:
+            self.fichier.close()
+
+        #Même jour : fichier suivant ; nouveau jour : premier fichier non plein
+        self.numero = self.numero + 1 if self.fichier is not None and self.jour == jour else 0
+        self.jour = jour
+        chemin = os.path.join(self.dossier, nom_fichier(jour, self.numero))
+        while os.path.exists(chemin) and os.path.getsize(chemin) >= self.taille_max:
+            self.numero += 1
+            chemin = os.path.join(self.dossier, nom_fichier(jour, self.numero))
+
+        self.fichier = open(chemin, "ab")
+        self.taille = self.fichier.tell()
+        if self.taille == 0:
+            self.fichier.write((",".join(COLONNES) + "\n").encode("utf-8"))
+            self.taille = self.fichier.tell()
+        else:
+            #Ligne interrompue par un arrêt brutal : elle reste isolée (et signalée par la vérification)
+            if not _termine_par_saut(chemin):
+                self.fichier.write(b"\n")
+                self.taille += 1
+
+    def fermer(self):
+        """Écrit les entrées en attente et ferme le fichier courant"""
+        self.vider()
+        if self.fichier is not None:
+            self.fichier.close()
+            self.fichier = None
+
+
+def _lignes_inverses(chemin, taille_bloc=65536):
+    """Lignes d'un fichier de la dernière à la première, lues par blocs depuis la fin"""
+    with open(chemin, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        reste = b""
+        while position > 0:
+            lecture = min(taille_bloc, position)
+            position -= lecture
+            f.seek(position)
+            lignes = (f.read(lecture) + reste).split(b"\n")
+            #La première ligne du bloc peut commencer dans le bloc précédent
+            reste = lignes.pop(0)
+            for ligne in reversed(lignes):
+                if ligne.strip():
+                    yield ligne.decode("utf-8", "replace")
+        if reste.strip():
+            yield reste.decode("utf-8", "replace")
+
+
+def lire_journal_recent(dossier, depuis=None, jusqua=None, action=None, texte=None):
+    """
+    Générateur des entrées du journal de la plus récente à la plus ancienne, en flux :
+    seuls les blocs lus à rebours sont en mémoire, jamais l'historique complet.
+    depuis, jusqua : dates "AAAA-MM-JJ" incluses (les fichiers des autres jours ne sont pas ouverts)
+    action         : type d'action exact (ex: "Import CSV")
+    texte          : texte recherché dans l'action et les détails, sans tenir compte de la casse
+    """
+    texte = texte.lower() if texte else None
+    #Rejet sur la ligne brute avant le décodage CSV (la plupart des lignes lors d'une recherche),
+    #sauf pour un texte contenant " : le CSV le double dans la ligne brute
+    texte_brut = texte if texte and '"' not in texte else None
+    action_brute = action if action and '"' not in action else None
+    for chemin in reversed(lister_fichiers(dossier)):
+        jour = _ordre_fichier(os.path.basename(chemin))[0]
+        if (depuis and jour < depuis) or (jusqua and jour > jusqua):
+            continue
+        for ligne in _lignes_inverses(chemin):
+            if (texte_brut and texte_brut not in ligne.lower()) or (action_brute and action_brute not in ligne):
+                continue
+            entree = _entree_complete(ligne)
+            if entree is None:
+                continue
+            if action and entree["action"] != action:
+                continue
+            if texte and texte not in entree["action"].lower() and texte not in entree["details"].lower():
+                continue
+            yield entree
+
+
+def verifier_journal(dossier):
+    """
+    Recalcule la chaîne d'empreintes de tout le journal.
+    Une ligne tronquée par un arrêt brutal (illisible ou empreinte incomplète) est signalée puis ignorée :
+    l'entrée suivante doit prolonger la chaîne de la dernière entrée complète, la vérification continue.
+    Retourne (nombre d'entrées, entrées non chaînées, lignes tronquées, première entrée invalide ou None).
+    """
+    precedente = EMPREINTE_INITIALE
+    total = 0
+    non_chainees = 0
+    tronquees = []
+    for chemin in lister_fichiers(dossier):
+        with open(chemin, "r", encoding="utf-8", errors="replace", newline="") as f:
+            for numero, ligne in enumerate(f, 1):
+                if not ligne.strip() or next(csv.reader([ligne]), []) == COLONNES:
+                    continue
+                entree = _entree_complete(ligne)
+                if entree is None:
+                    tronquees.append(f"{os.path.basename(chemin)}, ligne {numero}")
+                    continue
+                total += 1
+                date, action, details, empreinte = (entree[colonne] for colonne in COLONNES)
+                if not empreinte:
+                    #Entrée écrite sans chaînage : la chaîne repart de zéro après elle
+                    non_chainees += 1
+                    precedente = EMPREINTE_INITIALE
+                    continue
+                if empreinte != calculer_empreinte(precedente, date, action, details):
+                    return (total, non_chainees, tronquees,
+                            f"{os.path.basename(chemin)}, ligne {numero} ([{date}] {action})")
+                precedente = empreinte
+    return total, non_chainees, tronquees, None
+
+
+def migrer_csv(ancien_fichier, journal):
+    """
+    Reprend un ancien journal.csv (date, action, details) dans le journal d'audit, en flux,
+    puis le renomme en .migre. Retourne le nombre d'entrées reprises.
+    La reprise n'a lieu que dans un journal encore vide : les anciennes entrées sont les premières de la chaîne.
+    """
+    if not os.path.exists(ancien_fichier) or lister_fichiers(journal.dossier):
+        return 0
+    nombre = 0
+    #Reprise en masse : écriture par lots, puis retour au réglage du journal
+    taille_lot, journal.taille_lot = journal.taille_lot, max(journal.taille_lot, TAILLE_LOT_REPRISE)
+    try:
+        with open(ancien_fichier, "r", encoding="utf-8", errors="replace", newline="") as f:
+            for ligne in csv.DictReader(f):
+                if not ligne.get("date") or not ligne.get("action"):
+                    continue
+                journal.ajouter(ligne["action"], ligne.get("details") or "", date=ligne["date"])
+                nombre += 1
+    finally:
+        journal.taille_lot = taille_lot
+        journal.vider()
+    os.replace(ancien_fichier, ancien_fichier + ".migre")
+    return nombre
@@ -0,0 +1,238 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+
+#Format compact du modèle de fatigue : le préprocesseur (ColumnTransformer) et la forêt
+#aplatie en tableaux NumPy contigus, enregistrés sans compression par joblib pour être
+#projetés en mémoire (mmap_mode="r") : le chargement ne lit que l'en-tête, les pages
+#des arbres sont lues par le système à la première prédiction
+VERSION_FORMAT = 1
+
+
+def _type_entier(valeur_max):
+    """Plus petit type entier signé pouvant contenir valeur_max"""
+    for dtype in (np.int16, np.int32):
+        if valeur_max <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _seuils_float32(seuils):
+    """
+    Seuils float64 -> float32 arrondis vers le bas.
+    scikit-learn compare des variables float32 à des seuils float64 : pour x float32,
+    x <= s équivaut à x <= (plus grand float32 <= s), les décisions restent identiques.
+    """
+    seuils32 = seuils.astype(np.float32)
+    trop_grands = seuils32.astype(np.float64) > seuils
+    seuils32[trop_grands] = np.nextafter(seuils32[trop_grands], np.float32(-np.inf))
+    return seuils32
+
+
+def aplatir_foret(foret):
+    """
+    RandomForestRegressor entraîné -> dict de tableaux (nœuds de tous les arbres bout à bout).
+    Les indices des enfants sont globaux (-1 pour une feuille), racines[i] est la racine de l'arbre i.
+    """
+    arbres = [estimateur.tree_ for estimateur in foret.estimators_]
+    if any(arbre.n_outputs != 1 for arbre in arbres):
+        raise ValueError("Seuls les modèles à une sortie (score de fatigue) sont pris en charge.")
+
+    tailles = np.array([arbre.node_count for arbre in arbres], dtype=np.int64)
+    racines = np.concatenate([[0], np.cumsum(tailles)[:-1]])
+    type_noeud = _type_entier(int(tailles.sum()))
+
+    gauche, droite, variable, seuil, valeur, nan_gauche = [], [], [], [], [], []
+    for racine, arbre in zip(racines, arbres):
+        feuille = arbre.children_left == -1
+        gauche.append(np.where(feuille, -1, arbre.children_left + racine))
+        droite.append(np.where(feuille, -1, arbre.children_right + racine))
+        #Feuilles : variable 0 et seuil 0, jamais utilisés
+        variable.append(np.where(feuille, 0, arbre.feature))
+        seuil.append(np.where(feuille, 0.0, arbre.threshold))
+        valeur.append(arbre.value[:, 0, 0])
+        #Valeurs manquantes (scikit-learn >= 1.3) : direction apprise pour NaN
+        manquants = getattr(arbre, "missing_go_to_left", None)
+        nan_gauche.append(np.zeros(arbre.node_count, dtype=bool) if manquants is None
+                          else np.asarray(manquants, dtype=bool) & ~feuille)
+
+    return {
+        "version": VERSION_FORMAT,
+        "nb_variables": int(foret.n_features_in_),
+        "racines": racines.astype(type_noeud),
+        "profondeurs": np.array([arbre.max_depth for arbre in arbres], dtype=np.int16),
+        "gauche": np.concatenate(gauche).astype(type_noeud),
+        "droite": np.concatenate(droite).astype(type_noeud),
+        "variable": np.concatenate(variable).astype(_type_entier(int(foret.n_features_in_))),
+        "seuil": _seuils_float32(np.concatenate(seuil)),
+        #Valeurs des feuilles gardées en float64 : les moyennes restent celles de scikit-learn
+        "valeur": np.concatenate(valeur).astype(np.float64),
+        "nan_gauche": np.concatenate(nan_gauche),
+    }
+
+
+def exporter_modele(pipeline, chemin):
+    """Enregistre un Pipeline (préprocesseur + RandomForestRegressor) au format compact"""
+    etapes = list(pipeline.named_steps.values())
+    contenu = {"preprocesseur": pipeline[:-1] if len(etapes) > 1 else None,
+               "foret": aplatir_foret(etapes[-1])}
+    temporaire = chemin + ".tmp"
+    #Sans compression : condition pour la projection en mémoire au chargement
+    joblib.dump(contenu, temporaire)
+    os.replace(temporaire, chemin)
+
+
+def _noyau_compile():
+    """Parcours compilé de noyau_foret.py, ou None si numba n'est pas installé"""
+    try:
+        from noyau_foret import parcourir_foret
+    except ImportError:
+        return None
+    return parcourir_foret
+
+
+class ModeleCompact:
+    """Modèle de fatigue au format compact : même interface predict(df) que le Pipeline d'origine"""
+
+    def __init__(self, chemin, chemin_reference=None):
+        """
+        chemin           : fichier compact (exporter_modele)
+        chemin_reference : Pipeline joblib (.pkl) d'origine, chargé à la première prédiction
+                           seulement si numba est absent (voir predict)
+        """
+        contenu = joblib.load(chemin, mmap_mode="r")
+        foret = contenu["foret"]
+        if foret.get("version") != VERSION_FORMAT:
+            raise ValueError(f"Format de modèle compact non pris en charge : {chemin}")
+        self.chemin = chemin
+        self.preprocesseur = contenu["preprocesseur"]
+        self.nb_variables = foret["nb_variables"]
+        self.racines = foret["racines"]
+        self.profondeurs = foret["profondeurs"]
+        self.gauche = foret["gauche"]
+        self.droite = foret["droite"]
+        self.variable = foret["variable"]
+        self.seuil = foret["seuil"]
+        self.valeur = foret["valeur"]
+        self.nan_gauche = foret["nan_gauche"]
+        self.nb_arbres = len(self.racines)
+        self.chemin_reference = chemin_reference
+        self._reference = None
+
+    def transformer(self, df):
+        """Préprocessing du Pipeline d'origine, converti en float32 comme le fait scikit-learn"""
+        X = self.preprocesseur.transform(df) if self.preprocesseur is not None else df
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predict(self, df):
+        """
+        Mêmes prédictions que Pipeline.predict, bit à bit, par le moteur le plus rapide disponible :
+        parcours compilé (numba), sinon le Pipeline d'origine (chargé une fois depuis chemin_reference),
+        sinon le parcours NumPy arbre par arbre (plus lent que scikit-learn).
+        """
+        if _noyau_compile() is not None:
+            return self.predict_vectorise(df)
+        if self.chemin_reference is not None and os.path.exists(self.chemin_reference):
+            if self._reference is None:
+                self._reference = joblib.load(self.chemin_reference)
+            return self._reference.predict(df)
+        return self.predict_arbres(df)
+
+    def predict_arbres(self, df):
+        """Moyenne des arbres, accumulée dans l'ordre des arbres comme RandomForestRegressor.predict"""
+        X = self.transformer(df)
+        lignes = np.arange(X.shape[0])
+        somme = np.zeros(X.shape[0], dtype=np.float64)
+        for racine, profondeur in zip(self.racines, self.profondeurs):
+            noeuds = np.full(X.shape[0], racine, dtype=np.int64)
+            for _ in range(profondeur):
+                x = X[lignes, self.variable[noeuds]]
+                a_gauche = (x <= self.seuil[noeuds]) | (np.isnan(x) & self.nan_gauche[noeuds])
+                suivant = np.where(a_gauche, self.gauche[noeuds], self.droite[noeuds])
+                #Les lignes déjà arrivées sur une feuille y restent
+                noeuds = np.where(suivant >= 0, suivant, noeuds)
+            somme += self.valeur[noeuds]
+        return somme / self.nb_arbres
+
+    def predict_vectorise(self, df, lignes_par_lot=2048, compile=True):
+        """
+        Même prédiction, tous les arbres évalués ensemble par lots de lignes, sans l'appel
+        predict() arbre par arbre de scikit-learn.
+        Avec numba (compile=True et numba installé) : parcours compilé, lignes réparties entre
+        les cœurs (au moins lignes_par_lot lignes par thread). numba absent : repli sur predict().
+        compile=False : parcours NumPy, plus lent que scikit-learn au-delà d'environ 1k lignes ;
+        à chaque niveau, un seul passage NumPy pour toutes les paires (arbre, ligne)
+        encore sur un nœud interne, retirées dès qu'elles atteignent une feuille
+        (mémoire de travail ≈ 40 octets x arbres x lignes_par_lot).
+        """
+        parcourir_foret = _noyau_compile() if compile else None
+        if compile and parcourir_foret is None:
+            return self.predict(df)
+        X = self.transformer(df)
+        sortie = np.empty(X.shape[0], dtype=np.float64)
+        if parcourir_foret is not None:
+            #np.asarray : vues sur les pages projetées, sans copie
+            foret = [np.asarray(tableau) for tableau in (self.racines, self.gauche, self.droite, self.variable,
+                                                          self.seuil, self.valeur, self.nan_gauche)]
+            nb_parts = min(os.cpu_count() or 1, -(-X.shape[0] // lignes_par_lot))
+            if nb_parts <= 1:
+                parcourir_foret(X, *foret, sortie)
+                return sortie
+            #Le noyau relâche le GIL : une part contiguë de lignes par thread
+            bornes = np.linspace(0, X.shape[0], nb_parts + 1).astype(int)
+            with ThreadPoolExecutor(max_workers=nb_parts) as executeur:
+                parts = [executeur.submit(parcourir_foret, X[debut:fin], *foret, sortie[debut:fin])
+                         for debut, fin in zip(bornes[:-1], bornes[1:])]
+                for part in parts:
+                    part.result()
+            return sortie
+        for debut in range(0, X.shape[0], lignes_par_lot):
+            sortie[debut:debut + lignes_par_lot] = self._predire_lot(X[debut:debut + lignes_par_lot])
+        return sortie
+
+    def _predire_lot(self, X):
+        nb_lignes = X.shape[0]
+        valeurs_x = X.ravel()
+        #Paires rangées arbre par arbre : noeuds[t * nb_lignes + i] = nœud courant de la ligne i dans l'arbre t
+        noeuds = np.repeat(np.asarray(self.racines, dtype=np.int64), nb_lignes)
+        decalage_lignes = np.tile(np.arange(nb_lignes, dtype=np.int64) * self.nb_variables, self.nb_arbres)
+        actives = np.arange(noeuds.size, dtype=np.int64)
+        while actives.size:
+            courants = noeuds[actives]
+            enfants_gauche = self.gauche[courants]
+            internes = enfants_gauche >= 0
+            if not internes.all():
+                actives, courants, enfants_gauche = actives[internes], courants[internes], enfants_gauche[internes]
+            x = valeurs_x[decalage_lignes[actives] + self.variable[courants]]
+            a_gauche = (x <= self.seuil[courants]) | (np.isnan(x) & self.nan_gauche[courants])
+            noeuds[actives] = np.where(a_gauche, enfants_gauche, self.droite[courants])
+
+        #Somme arbre par arbre, dans l'ordre : même arrondi que RandomForestRegressor.predict
+        valeurs = self.valeur[noeuds].reshape(self.nb_arbres, nb_lignes)
+        somme = np.zeros(nb_lignes, dtype=np.float64)
+        for valeurs_arbre in valeurs:
+            somme += valeurs_arbre
+        return somme / self.nb_arbres
+
+
+def charger_modele(chemin_pkl, chemin_compact):
+    """
+    Charge le modèle au format compact, en le créant depuis le Pipeline joblib
+    s'il n'existe pas encore ou si le .pkl a été réentraîné depuis.
+    """
+    if not os.path.exists(chemin_compact) or (
+            os.path.exists(chemin_pkl) and os.path.getmtime(chemin_pkl) > os.path.getmtime(chemin_compact)):
+        print(f"Conversion du modèle au format compact : {chemin_compact}")
+        exporter_modele(joblib.load(chemin_pkl), chemin_compact)
+    return ModeleCompact(chemin_compact, chemin_pkl)
+
+
+#Conversion manuelle : python modele_compact.py
+if __name__ == "__main__":
+    chemin_pkl = os.path.join("models", "modele_fatigue.pkl")
+    chemin_compact = os.path.join("models", "modele_fatigue.joblib")
+    exporter_modele(joblib.load(chemin_pkl), chemin_compact)
+    print(f"Modèle compact enregistré sous '{chemin_compact}'")
@@ -0,0 +1,33 @@
+import numba
+import numpy as np
+
+#Parcours de la forêt compilé par numba (optionnel : pip install numba).
+#Importé à la demande par modele_compact.py, qui se replie sur le Pipeline
+#scikit-learn (ou le parcours NumPy) si numba est absent.
+#Compilé au premier appel puis gardé en cache dans __pycache__. Sans parallel=True : le code
+#parallèle relu depuis ce cache est nettement plus lent que fraîchement compilé ; nogil=True
+#laisse modele_compact.py répartir les lignes entre plusieurs threads.
+
+
+@numba.njit(nogil=True, cache=True)
+def parcourir_foret(X, racines, gauche, droite, variable, seuil, valeur, nan_gauche, sortie):
+    """
+    sortie[i] = moyenne des feuilles atteintes par la ligne i dans chaque arbre.
+    Chaque ligne parcourt les arbres dans l'ordre (même arrondi que RandomForestRegressor.predict).
+    Choix de l'enfant sans branchement : la comparaison au seuil est imprévisible,
+    un saut conditionnel y serait souvent mal prédit.
+    """
+    nb_arbres = racines.shape[0]
+    for i in range(X.shape[0]):
+        somme = 0.0
+        for t in range(nb_arbres):
+            noeud = np.int64(racines[t])
+            enfant_gauche = np.int64(gauche[noeud])
+            while enfant_gauche >= 0:
+                x = X[i, variable[noeud]]
+                #x != x : NaN
+                a_gauche = (x <= seuil[noeud]) | ((x != x) & nan_gauche[noeud])
+                noeud = enfant_gauche if a_gauche else np.int64(droite[noeud])
+                enfant_gauche = np.int64(gauche[noeud])
+            somme += valeur[noeud]
+        sortie[i] = somme / nb_arbres